@@ -0,0 +1,65 @@
+"""
+Microbenchmark: repeated get_hash() on frozen configs/geometries vs. the
+uncached stable_hash_from_dict(model_dump(...)) path.
+
+    python benchmarks/bench_hashing.py [--ndof 32] [--n-removed 20000] [--repeat 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from mypkg.geometry.configs import SquareGeometryConfig
+from mypkg.physics.configs import TBPhysics
+from mypkg.utils.core import stable_hash_from_dict
+
+
+def make_physics(ndof: int) -> TBPhysics:
+    def mat(scale: float) -> list[list[tuple[float, float]]]:
+        return [[(scale if i == j else 0.01 * (i - j), 0.0) for j in range(ndof)] for i in range(ndof)]
+
+    return TBPhysics.model_validate({
+        "model": "tb",
+        "basis": {"n_orb": ndof, "n_spin": 1},
+        "params": {"onsite": mat(0.0), "hopping": {k: mat(1.0) for k in ("nn1x", "nn1y", "nn2")}},
+    })
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--ndof", type=int, default=32)
+    p.add_argument("--n-removed", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=2000)
+    ns = p.parse_args()
+
+    phys = make_physics(ns.ndof)
+    geo = SquareGeometryConfig(lattice="square", nx=1000, ny=1000, boundary_x="open", boundary_y="open").build(
+        removed_sites={(k % 1000, k // 1000) for k in range(0, 50 * ns.n_removed, 50)}
+    )
+    geo.freeze()
+
+    def phys_uncached() -> str:
+        return stable_hash_from_dict(phys.hash_state())
+
+    def geo_uncached() -> str:
+        state = {
+            "config": geo.config.model_dump(mode="json"),
+            "removed_sites": [list(xy) for xy in sorted(geo.removed_sites)],
+        }
+        return stable_hash_from_dict(state)
+
+    assert phys_uncached() == phys.get_hash() and geo_uncached() == geo.get_hash()
+
+    n_geo = max(1, ns.repeat // 100)
+    rows = [
+        ("physics uncached", timeit.timeit(phys_uncached, number=ns.repeat) / ns.repeat),
+        ("physics cached", timeit.timeit(phys.get_hash, number=ns.repeat) / ns.repeat),
+        ("geometry uncached", timeit.timeit(geo_uncached, number=n_geo) / n_geo),
+        ("geometry cached", timeit.timeit(geo.get_hash, number=ns.repeat) / ns.repeat),
+    ]
+    for name, sec in rows:
+        print(f"{name:<20s} {sec * 1e6:12.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
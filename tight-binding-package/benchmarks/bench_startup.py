@@ -0,0 +1,77 @@
+"""
+Start-up budget for the simulation entry point.
+
+Runs `python -X importtime` on the CLI import path in fresh interpreters,
+reports the slowest modules, and exits non-zero when the cumulative import
+time exceeds the budget or a heavy dependency is imported eagerly.
+
+    python benchmarks/bench_startup.py [--budget-ms 500] [--runs 5] [--top 10]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+ENTRY_MODULES = ("mypkg.simulation.cli", "mypkg.simulation.run")
+# Must only be imported at their point of use, never by the entry modules.
+LAZY_MODULES = ("pandas", "scipy", "numba", "matplotlib")
+
+
+def importtime(modules: tuple[str, ...]) -> dict[str, tuple[int, int]]:
+    """module -> (self_us, cumulative_us) from one fresh interpreter."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=os.environ.copy(), check=True,
+    )
+    out: dict[str, tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        out[name] = (int(self_us), int(cum_us))
+    return out
+
+
+def eager_heavy_modules(modules: tuple[str, ...]) -> list[str]:
+    code = (
+        "import sys; " + "; ".join(f"import {m}" for m in modules)
+        + f"; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def main() -> int:
+    p = argparse.ArgumentParser()
+    p.add_argument("--budget-ms", type=float, default=500.0)
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=10)
+    ns = p.parse_args()
+
+    samples = [importtime(ENTRY_MODULES) for _ in range(ns.runs)]
+    best = min(samples, key=lambda s: sum(s[m][1] for m in ENTRY_MODULES if m in s))
+    total_ms = sum(best[m][1] for m in ENTRY_MODULES if m in best) / 1e3
+
+    print(f"cumulative import time of {', '.join(ENTRY_MODULES)}: {total_ms:.1f} ms (best of {ns.runs})")
+    print(f"top {ns.top} modules by self time:")
+    for name, (self_us, cum_us) in sorted(best.items(), key=lambda kv: -kv[1][0])[: ns.top]:
+        print(f"  {self_us / 1e3:8.1f} ms self  {cum_us / 1e3:8.1f} ms cum  {name}")
+
+    status = 0
+    heavy = eager_heavy_modules(ENTRY_MODULES)
+    if heavy:
+        print(f"FAIL: eagerly imported heavy modules: {heavy}")
+        status = 1
+    if total_ms > ns.budget_ms:
+        print(f"FAIL: {total_ms:.1f} ms exceeds budget of {ns.budget_ms:.1f} ms")
+        status = 1
+    if status == 0:
+        print("OK")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Accuracy check for selected inversion against a dense inverse.
+
+On square lattices of several sizes (two orbitals, open x, periodic y, so
+the pattern has wrap-around fill-in) diag(G(w + i eta)) from
+SelectedInverse must match diag((z - H)^-1); entries() is checked on
+random pairs, most of them outside the factor pattern. Exits non-zero
+when any check fails.
+
+    python benchmarks/check_selected.py [--tol 1e-10]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from mypkg.builder.tb_builder import TBBuilder
+from mypkg.geometry.configs import SquareGeometryConfig
+from mypkg.physics.configs import TBPhysics
+from mypkg.solver.configs import SolverConfig
+from mypkg.solver.selected import SelectedInversionSolver
+
+SIZES = ((4, 3), (9, 7), (16, 12), (24, 20))
+ENERGIES = (-2.5, 0.0, 0.7)
+ETA = 1e-2
+
+
+def physics() -> TBPhysics:
+    hop = [[[1.0, 0.0], [0.2, 0.1]], [[0.2, -0.1], [0.6, 0.0]]]
+    return TBPhysics.model_validate({
+        "model": "tb",
+        "seed": 0,
+        "basis": {"n_orb": 2, "n_spin": 1, "order": ["orb", "spin"]},
+        "params": {"onsite": [[[0.3, 0.0], [0.1, 0.0]], [[0.1, 0.0], [-0.4, 0.0]]], "hopping": {"nn1x": hop, "nn1y": hop}},
+    })
+
+
+def check_size(nx: int, ny: int, phys: TBPhysics, rng: np.random.Generator) -> float:
+    geo = SquareGeometryConfig(lattice="square", nx=nx, ny=ny, boundary_x="open", boundary_y="periodic").build()
+    solver = SelectedInversionSolver.from_builder(TBBuilder(geo, phys), SolverConfig(eta=ETA, w_min=-3.0, w_max=3.0, n_w=2))
+    ham = solver.ham.toarray()
+    rows = rng.integers(0, solver.dim, 200)
+    cols = rng.integers(0, solver.dim, 200)
+    worst = 0.0
+    for w in ENERGIES:
+        dense = np.linalg.inv((w + 1j * ETA) * np.eye(solver.dim) - ham)
+        selected = solver.factorize(w)
+        scale = np.abs(dense).max()
+        worst = max(
+            worst,
+            float(np.abs(selected.diagonal() - np.diag(dense)).max() / scale),
+            float(np.abs(selected.entries(rows, cols) - dense[rows, cols]).max() / scale),
+        )
+    return worst
+
+
+def main() -> int:
+    p = argparse.ArgumentParser()
+    p.add_argument("--tol", type=float, default=1e-10)
+    ns = p.parse_args()
+    phys = physics()
+    rng = np.random.default_rng(0)
+    ok = True
+    for nx, ny in SIZES:
+        t0 = time.perf_counter()
+        worst = check_size(nx, ny, phys, rng)
+        passed = worst <= ns.tol
+        ok &= passed
+        print(f"{nx}x{ny} square, {2 * nx * ny} dofs: max rel. error {worst:.2e} over {len(ENERGIES)} energies "
+              f"({time.perf_counter() - t0:.2f} s) {'ok' if passed else 'FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
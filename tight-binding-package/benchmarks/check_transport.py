@@ -0,0 +1,91 @@
+"""
+Accuracy checks for the lead and transport solvers against closed forms.
+
+Surface Green's function of the 1D chain (onsite 0, hopping -t),
+    g_s(z) = (z - sqrt(z^2 - 4 t^2)) / (2 t^2)   on the branch with |g_s| < 1/t,
+on a grid that includes the band edges and w = 0, where h0 has its level
+and plain decimation used to lose every digit at small eta; and the
+transmission of a clean square strip (nearest-neighbour hopping t, width W),
+which must equal the number of open channels, #{k : |w - 2t cos(k pi/(W+1))| < 2t}.
+Exits non-zero when any check fails.
+
+    python benchmarks/check_transport.py [--tol 1e-8] [--strip-tol 1e-4]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+import numpy as np
+
+from mypkg.builder.tb_builder import TBBuilder
+from mypkg.geometry.configs import SquareGeometryConfig
+from mypkg.physics.configs import TBPhysics
+from mypkg.solver.configs import SolverConfig
+from mypkg.solver.leads import Lead, SanchoRubio
+from mypkg.solver.transport import LandauerTransport
+
+ETAS = (1e-2, 1e-4, 1e-6, 1e-8)
+# eta also absorbs inside the device, T falls short of the channel count by O(eta / velocity)
+STRIP_ETAS = (1e-6, 1e-8)
+
+
+def chain_surface_green(z: complex, t: float) -> complex:
+    root = np.sqrt(z * z - 4.0 * t * t + 0j)
+    g = (z - root) / (2.0 * t * t)
+    return g if abs(g) < 1.0 / t else (z + root) / (2.0 * t * t)
+
+
+def check_chain(tol: float, t: float = 1.0) -> bool:
+    lead = Lead(h0=np.zeros((1, 1), dtype=np.complex128), h1=np.full((1, 1), -t, dtype=np.complex128))
+    energies = np.unique(np.concatenate([np.linspace(-3.0 * t, 3.0 * t, 121), [0.0, -2.0 * t, 2.0 * t]]))
+    decimator = SanchoRubio()
+    worst = 0.0
+    for eta in ETAS:
+        for w in energies:
+            exact = chain_surface_green(complex(w, eta), t)
+            for side in ("left", "right"):
+                g = decimator.surface_green(lead, float(w), eta, side)[0, 0]
+                worst = max(worst, abs(g - exact) / max(1.0, abs(exact)))
+    ok = worst <= tol
+    print(f"1D chain g_s: max rel. error {worst:.2e} over {energies.size} energies x {len(ETAS)} etas "
+          f"({decimator.stats.mode_fallbacks} Bloch-mode fallbacks) {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def check_clean_strip(tol: float, nx: int = 6, width: int = 3, t: float = 1.0) -> bool:
+    geo = SquareGeometryConfig(lattice="square", nx=nx, ny=width, boundary_x="open", boundary_y="open").build()
+    hop = [[[t, 0.0]]]
+    phys = TBPhysics.model_validate({
+        "model": "tb",
+        "seed": 0,
+        "basis": {"n_orb": 1, "n_spin": 1, "order": ["orb", "spin"]},
+        "params": {"onsite": [[[0.0, 0.0]]], "hopping": {"nn1x": hop, "nn1y": hop}},
+    })
+    levels = 2.0 * t * np.cos(np.arange(1, width + 1) * np.pi / (width + 1))
+    # stay clear of the channel thresholds, where T is a step
+    energies = np.linspace(-4.5 * t, 4.5 * t, 181)
+    energies = energies[np.abs(np.abs(energies[:, None] - levels) - 2.0 * t).min(axis=1) > 1e-3]
+    worst = 0.0
+    for eta in STRIP_ETAS:
+        config = SolverConfig(eta=eta, w_min=-4.5 * t, w_max=4.5 * t, n_w=2)
+        transport = LandauerTransport.from_builder(TBBuilder(geo, phys), config)
+        channels = (np.abs(energies[:, None] - levels) < 2.0 * t).sum(axis=1)
+        worst = max(worst, float(np.abs(transport.transmission_grid(energies) - channels).max()))
+    ok = worst <= tol
+    print(f"clean {nx}x{width} strip T: max |T - open channels| {worst:.2e} over {energies.size} energies "
+          f"x {len(STRIP_ETAS)} etas {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def main() -> int:
+    p = argparse.ArgumentParser()
+    p.add_argument("--tol", type=float, default=1e-8)
+    p.add_argument("--strip-tol", type=float, default=1e-4)
+    ns = p.parse_args()
+    checks = [check_chain(ns.tol), check_clean_strip(ns.strip_tol)]
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
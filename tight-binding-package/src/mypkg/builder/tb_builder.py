@@ -1,26 +1,449 @@
 from __future__ import annotations
 
+import itertools
+from dataclasses import dataclass
+
 import numpy as np
+import scipy.sparse as sp
 from numpy.typing import NDArray
 
-from ..geometry.types import GeometryLike
+from ..geometry.types import BoundaryCondition, GeometryLike
 from ..physics.configs import TBPhysics
 
+PAULI: dict[str, NDArray[np.complex128]] = {
+    "x": np.array([[0, 1], [1, 0]], dtype=np.complex128),
+    "y": np.array([[0, -1j], [1j, 0]], dtype=np.complex128),
+    "z": np.array([[1, 0], [0, -1]], dtype=np.complex128),
+}
+
 def hermitian_part(mat: NDArray[np.complex128]) -> NDArray[np.complex128]:
-    return (mat + mat.conj().T) / 2.0
+    out = mat.conj().T + mat
+    out *= 0.5
+    return out
+
+def bond_arrays(geo: GeometryLike, kind: str) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """(i, j) active-index arrays for a bond kind; uses geo.bond_arrays when available."""
+    fast = getattr(geo, "bond_arrays", None)
+    if fast is not None:
+        return fast(kind)
+    flat = np.fromiter(itertools.chain.from_iterable(geo.iter_bonds(kind)), dtype=np.intp)
+    return flat[0::2], flat[1::2]
+
+def block_coo(
+    i: NDArray[np.intp], j: NDArray[np.intp], block: NDArray[np.complex128], ndof: int
+) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.complex128]]:
+    """
+    Expand one ndof x ndof block onto every site pair (i[b], j[b]).
+    Only the nonzero entries of `block` are emitted: O(len(i) * nnz(block)).
+    """
+    a, b = np.nonzero(block)
+    rows = (i[:, None] * ndof + a[None, :]).ravel()
+    cols = (j[:, None] * ndof + b[None, :]).ravel()
+    data = np.tile(block[a, b], i.size)
+    return rows, cols, data
+
+def site_dofs(sites: NDArray[np.intp], ndof: int) -> NDArray[np.intp]:
+    """Global dof indices of `sites` (site-major, local dofs contiguous)."""
+    return (np.asarray(sites, dtype=np.intp)[:, None] * ndof + np.arange(ndof, dtype=np.intp)).ravel()
+
+@dataclass(frozen=True)
+class BlockTridiagonalHamiltonian:
+    """
+    H in block-tridiagonal storage: block k holds active sites
+    [k*block_sites, (k+1)*block_sites), m = block_sites*ndof dofs, the last
+    block zero-padded. `upper[k]` = H[k, k+1] (the lower blocks are its
+    Hermitian conjugates). Entries outside the band (periodic wraps) are
+    kept as dof-level triplets `outer`.
+    """
+    diag: NDArray[np.complex128]    # (n_blocks, m, m)
+    upper: NDArray[np.complex128]   # (n_blocks - 1, m, m)
+    outer: tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.complex128]]
+    block_sites: int
+    n_sites: int
+    ndof: int
+
+    @property
+    def block_dim(self) -> int:
+        return self.block_sites * self.ndof
+
+    @property
+    def dim(self) -> int:
+        return self.n_sites * self.ndof
+
+    def to_sparse(self) -> sp.csr_matrix:
+        """CSR copy (cross-checks only; the banded solvers never need it)."""
+        nb, m = self.diag.shape[0], self.block_dim
+        n_pad = nb * m
+        k = np.arange(nb, dtype=np.intp)[:, None, None] * m
+        a = np.arange(m, dtype=np.intp)
+        r_d, c_d = (k + a[None, :, None]), (k + a[None, None, :])
+        r_d, c_d = np.broadcast_arrays(r_d, c_d)
+        r_u, c_u = r_d[:-1], c_d[:-1] + m
+        rows, cols, data = self.outer
+        mat = sp.coo_matrix(
+            (
+                np.concatenate([self.diag.ravel(), self.upper.ravel(), self.upper.conj().ravel(), data]),
+                (
+                    np.concatenate([r_d.ravel(), r_u.ravel(), c_u.ravel(), rows]),
+                    np.concatenate([c_d.ravel(), c_u.ravel(), r_u.ravel(), cols]),
+                ),
+            ),
+            shape=(n_pad, n_pad),
+        ).tocsr()
+        mat.eliminate_zeros()
+        return mat[: self.dim, : self.dim]
+
+@dataclass(frozen=True)
+class AffineHamiltonian:
+    """
+    H(c) = H0 + sum_a c_a * H_a with H0 and every term H_a stored as data
+    arrays on one shared CSR pattern (indices, indptr), so a new set of
+    coefficients costs a single vectorized combination of those arrays.
+
+    `terms` names the rows of `stack`; `defaults` are the coefficients that
+    reproduce TBBuilder.build_hamiltonian_sparse(). `spin` is the sigma_z
+    eigenvalue (+1/-1) of every dof, or None for spinless bases.
+    """
+    indices: NDArray[np.int32]
+    indptr: NDArray[np.int32]
+    base: NDArray[np.complex128]     # (nnz,)  H0
+    stack: NDArray[np.complex128]    # (n_terms, nnz)  H_a
+    terms: tuple[str, ...]
+    defaults: dict[str, float]
+    spin: NDArray[np.int8] | None
+    ndof: int
+
+    @property
+    def dim(self) -> int:
+        return self.indptr.size - 1
+
+    def coefficients(self, **coeffs: float) -> NDArray[np.float64]:
+        """Coefficient vector aligned with `terms`: defaults overridden by `coeffs`."""
+        unknown = set(coeffs) - set(self.terms)
+        if unknown:
+            raise ValueError(f"Unknown affine terms {sorted(unknown)}; available: {list(self.terms)}")
+        merged = {**self.defaults, **coeffs}
+        return np.array([merged[name] for name in self.terms], dtype=np.float64)
+
+    def data(self, **coeffs: float) -> NDArray[np.complex128]:
+        """CSR data of H(c)."""
+        return self.base + self.coefficients(**coeffs) @ self.stack
+
+    def matrix(self, **coeffs: float) -> sp.csr_matrix:
+        return sp.csr_matrix((self.data(**coeffs), self.indices, self.indptr), shape=(self.dim, self.dim))
+
+    def term(self, name: str) -> sp.csr_matrix:
+        """H_a alone, e.g. for cross-checks."""
+        data = self.stack[self.terms.index(name)]
+        return sp.csr_matrix((data.copy(), self.indices, self.indptr), shape=(self.dim, self.dim))
 
 class TBBuilder:
     """
     Builder layer: GeometryLike + TBPhysics -> Hamiltonian.
-    For now: placeholder dense Hermitian matrix (debug).
-    Later: COO->CSR using iter_bonds(kind) and PairMatrix blocks.
+
+    Index convention: global dof = active_site * ndof + local, where the local
+    index follows basis.order (the layout the onsite/hopping PairMatrix blocks
+    are written in). Each bond (i, j) of kind k contributes -t_k (i <- j) plus
+    its Hermitian conjugate.
     """
     def __init__(self, geo: GeometryLike, phys: TBPhysics) -> None:
         self.geo = geo
         self.phys = phys
 
+    @property
+    def ndof(self) -> int:
+        return self.phys.basis.ndof
+
+    @property
+    def dim(self) -> int:
+        return self.geo.n_active * self.ndof
+
+    def hopping_kinds(self) -> list[str]:
+        provided = set(self.geo.provided_bond_keys)
+        return [k for k in self.phys.params.hopping if k in provided]
+
+    def zeeman_terms(self) -> dict[str, NDArray[np.complex128]]:
+        """
+        Local Zeeman operators per unit field, {"zeeman_x": scale * sigma_x, ...}
+        lifted to the ndof basis; empty for spinless bases.
+        """
+        if self.phys.basis.n_spin != 2:
+            return {}
+        fields = self.phys.fields
+        zeeman = fields.zeeman if fields is not None else None
+        scale = 0.5 if zeeman is None or zeeman.convention == "half" else 1.0
+        return {f"zeeman_{a}": scale * self.phys.basis.embed_spin(PAULI[a]) for a in "xyz"}
+
+    def zeeman_block(self) -> NDArray[np.complex128] | None:
+        fields = self.phys.fields
+        if fields is None or fields.zeeman is None:
+            return None
+        terms = self.zeeman_terms()
+        if not terms:
+            raise ValueError(f"Zeeman field needs n_spin=2, got n_spin={self.phys.basis.n_spin}")
+        return sum(
+            (b * terms[f"zeeman_{a}"] for a, b in zip("xyz", fields.zeeman.B)),
+            np.zeros((self.ndof, self.ndof), dtype=np.complex128),
+        )
+
+    def onsite_block(self) -> NDArray[np.complex128]:
+        block = self.phys.params.onsite.to_complex()
+        zeeman = self.zeeman_block()
+        if zeeman is not None:
+            block = block + zeeman
+        return block
+
+    def disordered_kinds(self) -> list[str]:
+        d = self.phys.disorder
+        if d is None or d.kind != "bond":
+            return []
+        kinds = self.hopping_kinds()
+        return kinds if d.bond_kinds is None else [k for k in kinds if k in d.bond_kinds]
+
+    def n_disorder_values(self) -> int:
+        """Length of one disorder realization: sites (onsite) or bonds of disordered kinds (bond)."""
+        d = self.phys.disorder
+        if d is None:
+            return 0
+        if d.kind == "onsite":
+            return self.geo.n_active
+        return sum(bond_arrays(self.geo, k)[0].size for k in self.disordered_kinds())
+
+    def flux_quanta(self) -> float:
+        """phi/phi0 of fields.ab_flux (0 when unset)."""
+        fields = self.phys.fields
+        if fields is None or fields.ab_flux is None:
+            return 0.0
+        return float(fields.ab_flux.phi_over_phi0)
+
+    def bond_phases(self, kind: str, phi_over_phi0: float | None = None) -> NDArray[np.complex128] | None:
+        """
+        Peierls factors exp(2*pi*i * phi/phi0 * winding) per bond of `kind`
+        (aligned with bond_arrays), or None when no bond carries flux.
+        """
+        windings = getattr(self.geo, "bond_windings", None)
+        phi = self.flux_quanta() if phi_over_phi0 is None else phi_over_phi0
+        if windings is None or phi == 0.0:
+            return None
+        w = windings(kind)
+        if not w.any():
+            return None
+        return np.exp(2j * np.pi * phi * w)
+
+    def disorder_sample(self, seed: int | None) -> NDArray[np.float64] | None:
+        disorder = self.phys.disorder
+        if disorder is None:
+            return None
+        return disorder.sample(int(self.phys.seed if seed is None else seed), self.n_disorder_values())
+
+    def build_hamiltonian_sparse(self, *, seed: int | None = None) -> sp.csr_matrix:
+        """
+        Assemble H as CSR: COO triplets per block, Hermitian conjugate of the
+        hopping triplets appended directly (no dense intermediate).
+        Disorder (phys.disorder) uses realization `seed` (default phys.seed);
+        fields.ab_flux enters as Peierls phases on the geometry's winding bonds.
+        """
+        ndof = self.ndof
+        n_act = self.geo.n_active
+        sites = np.arange(n_act, dtype=np.intp)
+
+        disorder = self.phys.disorder
+        delta = self.disorder_sample(seed)
+
+        rows, cols, data = [], [], []
+        r, c, v = block_coo(sites, sites, self.onsite_block(), ndof)
+        rows.append(r); cols.append(c); data.append(v)
+        if disorder is not None and delta is not None and disorder.kind == "onsite":
+            diag = site_dofs(sites, ndof)
+            rows.append(diag); cols.append(diag); data.append(np.repeat(delta, ndof).astype(np.complex128))
+
+        offset = 0
+        disordered = set(self.disordered_kinds())
+        for kind in self.hopping_kinds():
+            t = self.phys.params.hopping[kind].to_complex()
+            i, j = bond_arrays(self.geo, kind)
+            r, c, v = block_coo(i, j, -t, ndof)
+            if delta is not None and kind in disordered:
+                scale = 1.0 + delta[offset : offset + i.size]
+                v = (v.reshape(i.size, -1) * scale[:, None]).ravel()
+                offset += i.size
+            phases = self.bond_phases(kind)
+            if phases is not None:
+                v = (v.reshape(i.size, -1) * phases[:, None]).ravel()
+            rows += [r, c]; cols += [c, r]; data += [v, v.conj()]
+
+        n = n_act * ndof
+        coo = sp.coo_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n, n),
+        )
+        return coo.tocsr()
+
+    def build_hamiltonian_affine(self, *, seed: int | None = None) -> AffineHamiltonian:
+        """
+        H split into its field-independent part H0 and the terms that enter
+        linearly with a scalar field:
+            zeeman_x/y/z  sum over sites of zeeman_terms() (coefficient B_a),
+            mu            -identity (coefficient mu; H - mu).
+        All pieces share one pattern. The defaults (fields.zeeman.B, mu = 0)
+        give build_hamiltonian_sparse(seed=seed); disorder and flux are in H0.
+        """
+        fields = self.phys.fields
+        if fields is not None and fields.zeeman is not None:
+            phys = self.phys.model_copy(update={"fields": fields.model_copy(update={"zeeman": None})})
+        else:
+            phys = self.phys
+        h0 = type(self)(self.geo, phys).build_hamiltonian_sparse(seed=seed).tocoo()
+
+        ndof, n = self.ndof, self.dim
+        sites = np.arange(self.geo.n_active, dtype=np.intp)
+        pieces = {name: block_coo(sites, sites, block, ndof) for name, block in self.zeeman_terms().items()}
+        diag = np.arange(n, dtype=np.intp)
+        pieces["mu"] = (diag, diag, np.full(n, -1.0, dtype=np.complex128))
+
+        # shared pattern: sorted unique (row, col) keys over H0 and all terms
+        parts = [(h0.row.astype(np.intp), h0.col.astype(np.intp), h0.data)] + list(pieces.values())
+        keys = [r * n + c for r, c, _ in parts]
+        pattern = np.unique(np.concatenate(keys))
+        nnz = pattern.size
+        arrays = []
+        for k, (_, _, v) in zip(keys, parts):
+            pos = np.searchsorted(pattern, k)
+            arrays.append(
+                np.bincount(pos, weights=v.real, minlength=nnz) + 1j * np.bincount(pos, weights=v.imag, minlength=nnz)
+            )
+        rows = pattern // n
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))]).astype(np.int32)
+
+        spin = None
+        if "zeeman_z" in pieces:
+            local = np.diagonal(self.phys.basis.embed_spin(PAULI["z"])).real
+            spin = np.tile(np.rint(local).astype(np.int8), self.geo.n_active)
+
+        defaults = {name: 0.0 for name in pieces}
+        if fields is not None and fields.zeeman is not None:
+            defaults.update({f"zeeman_{a}": float(b) for a, b in zip("xyz", fields.zeeman.B)})
+        return AffineHamiltonian(
+            indices=(pattern % n).astype(np.int32),
+            indptr=indptr,
+            base=arrays[0],
+            stack=np.stack(arrays[1:]),
+            terms=tuple(pieces),
+            defaults=defaults,
+            spin=spin,
+            ndof=ndof,
+        )
+
+    def supports_banded(self) -> bool:
+        """Geometry reports a site bandwidth (e.g. chains): block-tridiagonal storage applies."""
+        return hasattr(self.geo, "band_sites")
+
+    def build_hamiltonian_block_tridiagonal(
+        self, *, block_sites: int | None = None, seed: int | None = None
+    ) -> BlockTridiagonalHamiltonian:
+        """
+        Assemble H straight into block-tridiagonal storage, with no COO/CSR
+        intermediate. `block_sites` defaults to geo.band_sites(hopping kinds);
+        bonds that do not fit the band (periodic wraps) go to `outer`.
+        Same disorder convention and realization as build_hamiltonian_sparse.
+        """
+        if block_sites is None:
+            band_sites = getattr(self.geo, "band_sites", None)
+            if band_sites is None:
+                raise ValueError(f"{type(self.geo).__name__} does not report a bandwidth; pass block_sites")
+            block_sites = band_sites(self.hopping_kinds())
+        ndof, b = self.ndof, block_sites
+        n_act = self.geo.n_active
+        nb = max(1, -(-n_act // b))
+
+        # site-level views: [block, site in block, dof, site in block, dof]
+        diag = np.zeros((nb, b, ndof, b, ndof), dtype=np.complex128)
+        upper = np.zeros((max(nb - 1, 0), b, ndof, b, ndof), dtype=np.complex128)
+
+        disorder = self.phys.disorder
+        delta = self.disorder_sample(seed)
+
+        sites = np.arange(n_act, dtype=np.intp)
+        k, s = np.divmod(sites, b)
+        diag[k, s, :, s, :] += self.onsite_block()
+        if disorder is not None and delta is not None and disorder.kind == "onsite":
+            diag[k, s, :, s, :] += delta[:, None, None] * np.eye(ndof)
+
+        outer_r, outer_c, outer_v = [], [], []
+        offset = 0
+        disordered = set(self.disordered_kinds())
+        for kind in self.hopping_kinds():
+            t = -self.phys.params.hopping[kind].to_complex()
+            i, j = bond_arrays(self.geo, kind)
+            blocks = np.broadcast_to(t, (i.size, ndof, ndof))
+            if delta is not None and kind in disordered:
+                blocks = blocks * (1.0 + delta[offset : offset + i.size])[:, None, None]
+                offset += i.size
+            phases = self.bond_phases(kind)
+            if phases is not None:
+                blocks = blocks * phases[:, None, None]
+            (ki, si), (kj, sj) = np.divmod(i, b), np.divmod(j, b)
+            same, up, down = ki == kj, kj == ki + 1, kj == ki - 1
+            # within a kind every (i, j) is distinct, so fancy-index += does not drop duplicates
+            diag[ki[same], si[same], :, sj[same], :] += blocks[same]
+            diag[kj[same], sj[same], :, si[same], :] += blocks[same].conj().transpose(0, 2, 1)
+            upper[ki[up], si[up], :, sj[up], :] += blocks[up]
+            upper[kj[down], sj[down], :, si[down], :] += blocks[down].conj().transpose(0, 2, 1)
+            far = ~(same | up | down)
+            if far.any():
+                r, c = site_dofs(i[far], ndof).reshape(-1, ndof), site_dofs(j[far], ndof).reshape(-1, ndof)
+                rr = np.broadcast_to(r[:, :, None], blocks[far].shape).ravel()
+                cc = np.broadcast_to(c[:, None, :], blocks[far].shape).ravel()
+                vv = blocks[far].ravel()
+                outer_r += [rr, cc]; outer_c += [cc, rr]; outer_v += [vv, vv.conj()]
+
+        m = b * ndof
+        outer = (
+            (np.concatenate(outer_r), np.concatenate(outer_c), np.concatenate(outer_v))
+            if outer_r
+            else (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0, dtype=np.complex128))
+        )
+        return BlockTridiagonalHamiltonian(
+            diag=diag.reshape(nb, m, m),
+            upper=upper.reshape(-1, m, m),
+            outer=outer,
+            block_sites=b,
+            n_sites=n_act,
+            ndof=ndof,
+        )
+
+    def supports_bloch(self) -> bool:
+        """Fully periodic, defect-free geometry with known bond displacements."""
+        cfg = getattr(self.geo, "config", None)
+        if cfg is None or not hasattr(self.geo, "bond_shifts"):
+            return False
+        boundaries = [getattr(cfg, name, None) for name in ("boundary_x", "boundary_y")]
+        periodic = all(b in (None, BoundaryCondition.PERIODIC) for b in boundaries)
+        return periodic and not getattr(self.geo, "removed_sites", None)
+
+    def bloch_hamiltonian(self, k: NDArray[np.float64]) -> NDArray[np.complex128]:
+        """
+        H(k) = onsite - sum_{kind, d} (t e^{i k.d} + t^H e^{-i k.d}) for k of
+        shape (nk, 2), in lattice units; returns (nk, ndof, ndof).
+        """
+        bond_shifts = getattr(self.geo, "bond_shifts", None)
+        if bond_shifts is None or not self.supports_bloch():
+            raise ValueError("Bloch Hamiltonian requires a fully periodic geometry without removed sites")
+        k = np.atleast_2d(np.asarray(k, dtype=np.float64))
+        hk = np.broadcast_to(self.onsite_block(), (k.shape[0], self.ndof, self.ndof)).copy()
+        for kind in self.hopping_kinds():
+            t = self.phys.params.hopping[kind].to_complex()
+            for d in bond_shifts(kind):
+                phase = np.exp(1j * (k @ np.asarray(d, dtype=np.float64)))[:, None, None]
+                hk -= t * phase + t.conj().T * phase.conj()
+        return hk
+
+    def build_hamiltonian_dense(self) -> NDArray[np.complex128]:
+        """Dense H for small systems and cross-checks."""
+        return self.build_hamiltonian_sparse().toarray()
+
     def build_hamiltonian_dense_debug(self) -> NDArray[np.complex128]:
         rng = np.random.default_rng(int(self.phys.seed))
-        n = self.geo.n_active * self.phys.basis.ndof
+        n = self.dim
         mat = rng.standard_normal((n, n)) + 1j * rng.standard_normal((n, n))
-        return hermitian_part(mat)
\ No newline at end of file
+        return hermitian_part(mat)
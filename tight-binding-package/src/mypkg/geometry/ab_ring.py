@@ -1,34 +1,37 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from collections.abc import Iterator
 
-from ..utils import stable_hash_from_dict, DEFAULT_HASH_LENGTH
-from .types import ActiveIndex, GeometryLike
+import numpy as np
+from numpy.typing import NDArray
+
+from .chain import ChainGeometry
+from .types import BoundaryCondition
 
 if TYPE_CHECKING:
     from .configs import ABRingGeometryConfig
 
 
-class ABRingGeometry(GeometryLike):
-    # Placeholder bond kinds for now (adjust when you define actual AB ring connectivity)
-    provided_bond_keys = {"nn1", "nn2"}
-
-    def __init__(self, config: ABRingGeometryConfig, *, removed_sites=None):
-        self.config = config
-        self.removed_sites = set(removed_sites or [])
-        self.n_global = config.nx
-
-    @property
-    def n_active(self) -> int:
-        return self.n_global - len(self.removed_sites)
-
-    def iter_bonds(self, kind: str) -> Iterator[tuple[ActiveIndex, ActiveIndex]]:
-        raise NotImplementedError
-
-    def get_geometry_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
-        state = {
-            "config": self.config.model_dump(mode="json"),
-            "removed_sites": [list(x) for x in sorted(self.removed_sites)],
-        }
-        return stable_hash_from_dict(state, length)
\ No newline at end of file
+class ABRingGeometry(ChainGeometry):
+    """
+    Ring of nx sites threaded by an Aharonov-Bohm flux: a chain (periodic by
+    default) whose bonds know how often they wind around the ring.
+
+    Gauge: the whole flux sits on the cut between x = nx-1 and x = 0, so only
+    bonds crossing it carry a Peierls phase (see bond_windings).
+    """
+
+    config: ABRingGeometryConfig
+
+    def bond_windings(self, kind: str) -> NDArray[np.intp]:
+        """
+        Times each bond (i, j) of `kind` crosses the cut going from i to j
+        (+x direction), aligned with bond_arrays(kind). H[i, j] picks up
+        exp(2*pi*i * phi/phi0 * winding).
+        """
+        i_arr, _ = self.bond_arrays(kind)
+        if self.config.boundary_x != BoundaryCondition.PERIODIC:
+            return np.zeros(i_arr.size, dtype=np.intp)
+        assert self._active_to_global_idx is not None
+        x = self._active_to_global_idx[i_arr]
+        return ((x + self.bond_span(kind)) // self.config.nx).astype(np.intp)
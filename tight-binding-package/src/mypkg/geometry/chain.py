@@ -1,30 +1,99 @@
 from __future__ import annotations
+
+import logging
+import numpy as np
+from numpy.typing import NDArray
 from typing import TYPE_CHECKING
-from collections.abc import Iterator
-from ..utils import stable_hash_from_dict, DEFAULT_HASH_LENGTH
-from .types import ActiveIndex, GeometryLike
+from collections.abc import Collection, Iterable, Iterator
+
+from .mask import MaskGeometry, _shift_axis
+from .types import ActiveIndex, Bond, BoundaryCondition
 
 if TYPE_CHECKING:
-    from .configs import ChainGeometryConfig
+    from .configs import ChainGeometryConfigBase
+
+log = logging.getLogger(__name__)
+
+# Site displacement x_j - x_i for every bond (i, j) of a kind.
+BOND_SPANS: dict[str, int] = {
+    "nn1": 1,
+    "nn2": 2,
+}
+
+
+class ChainGeometry(MaskGeometry):
+    """
+    1D chain of nx sites, global index = x. Active indices keep the chain
+    order, so a bond of span d never joins active sites more than d apart
+    (except across a periodic wrap): H is block banded, see band_sites().
+    """
+
+    config: ChainGeometryConfigBase
+    provided_bond_keys: Collection[str] = {"nn1", "nn2"}
+    MASK_AXES = (0,)
+    # band_sites() relies on the chain order
+    site_orderings = ("natural",)
+
+    def __init__(self, config: ChainGeometryConfigBase, *, removed_sites: set[tuple[int]] | None = None) -> None:
+        super().__init__(config, config.nx, removed_sites)
+
+    def ensure_coord_in_bounds(self, coord: tuple[int]) -> None:
+        (x,) = coord
+        if not 0 <= x < self.config.nx:
+            log.error(f"Out-of-bounds coordinate ({x},); valid range x:[0, {self.config.nx})")
+            raise ValueError(f"Coordinates out of bounds: ({x},)")
+
+    def _coord_shape(self) -> tuple[int]:
+        return (self.config.nx,)
+
+    def _periodic_axes(self) -> tuple[bool]:
+        return (self.config.boundary_x == BoundaryCondition.PERIODIC,)
+
+    def _check_coord(self, coord: tuple[int, ...]) -> None:
+        self.ensure_coord_in_bounds((coord[0],))
+
+    def _join_global(self, coords: tuple[NDArray[np.intp], ...]) -> NDArray[np.intp]:
+        return coords[0]
+
+    def _split_global(self, g: NDArray[np.intp]) -> tuple[NDArray[np.intp]]:
+        return (g,)
 
-class ChainGeometry(GeometryLike):
-    provided_bond_keys = {"nn1", "nn2"}
+    def bond_span(self, kind: str) -> int:
+        try:
+            return BOND_SPANS[kind]
+        except KeyError:
+            raise ValueError(f"Unknown bond kind: {kind}") from None
 
-    def __init__(self, config: ChainGeometryConfig, *, removed_sites=None):
-        self.config = config
-        self.removed_sites = set(removed_sites or [])
-        self.n_global = config.nx
+    def band_sites(self, kinds: Iterable[str]) -> int:
+        """
+        Active-index half bandwidth (in sites) of the bonds of `kinds`, wrap
+        bonds excluded: grouping that many consecutive sites per block makes
+        H block tridiagonal.
+        """
+        return max((self.bond_span(k) for k in kinds), default=1)
 
-    @property
-    def n_active(self) -> int:
-        return self.n_global - len(self.removed_sites)
+    def bond_arrays(self, kind: str) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """All bonds of `kind` as contiguous active-index arrays (i, j), sorted by i."""
+        span = self.bond_span(kind)
+        self._ensure_maps()
+        cached = self._bond_cache.get(kind)
+        if cached is not None:
+            return cached
+        assert self._active_to_global_idx is not None and self._global_to_active_idx is not None
 
-    def iter_bonds(self, kind: str) -> Iterator[tuple[ActiveIndex, ActiveIndex]]:
-        raise NotImplementedError
+        x = self._active_to_global_idx
+        xx, ok = _shift_axis(x, span, self.config.nx, self.config.boundary_x)
+        j = self._global_to_active_idx[xx[ok]]
+        alive = j >= 0
+        i_arr = np.arange(x.size, dtype=np.intp)[ok][alive]
+        out = np.ascontiguousarray(i_arr), np.ascontiguousarray(j[alive])
+        if self._frozen:
+            for arr in out:
+                arr.flags.writeable = False
+            self._bond_cache[kind] = out
+        return out
 
-    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
-        state = {
-            "config": self.config.model_dump(mode="json"),
-            "removed_sites": [list(x) for x in sorted(self.removed_sites)],
-        }
-        return stable_hash_from_dict(state, length)
\ No newline at end of file
+    def iter_bonds(self, kind: str) -> Iterator[Bond]:
+        i_arr, j_arr = self.bond_arrays(kind)
+        for i, j in zip(i_arr.tolist(), j_arr.tolist()):
+            yield ActiveIndex(i), ActiveIndex(j)
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from typing import Any, Literal
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..types.scalars import LatticeSide
-from ..utils.core import stable_hash_from_dict, DEFAULT_HASH_LENGTH
-from .types import BoundaryCondition, GeometryLike
+from ..utils.core import CachedHashModel
+from .types import BoundaryCondition, FreezableGeometryLike, GeometryLike
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -15,21 +15,62 @@ if TYPE_CHECKING:
     from .honeycomb import HoneycombGeometry
 
 
-class GeometryConfigBase(BaseModel):
+class GeometryConfigBase(CachedHashModel):
     model_config = ConfigDict(frozen=True)
-
-    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
-        return stable_hash_from_dict(self.model_dump(mode="json", exclude=None), length)
     
-    def build(self, *, removed_sites: Any = None) -> GeometryLike:
+    def build(self, *, removed_sites: Any = None) -> FreezableGeometryLike:
+        raise NotImplementedError
+
+    def geometry_class(self) -> type[GeometryLike]:
         raise NotImplementedError
+
+    @property
+    def provided_bond_keys(self) -> frozenset[str]:
+        """Bond kinds of the built geometry, without building it."""
+        return frozenset(self.geometry_class().provided_bond_keys)
     
     
-class ChainGeometryConfig(GeometryConfigBase):
-    lattice: Literal["chain"]
+class VacancyConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    concentration: float = Field(ge=0.0, lt=1.0)
+    seed: int = 0
+
+
+class DefectsConfig(BaseModel):
+    """
+    Sites to remove from the built geometry: an explicit coordinate list
+    and/or seeded random vacancies (applied after the explicit list).
+    """
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    removed_sites: list[tuple[int, ...]] = Field(default_factory=list)
+    vacancies: VacancyConfig | None = None
+
+    def apply(self, geo: GeometryLike) -> None:
+        remove_sites = getattr(geo, "remove_sites", None)
+        if remove_sites is None:
+            raise ValueError(f"{type(geo).__name__} does not support site removal")
+        if self.removed_sites:
+            import numpy as np
+            remove_sites(np.asarray(self.removed_sites, dtype=np.intp))
+        if self.vacancies is not None:
+            random_vacancies = getattr(geo, "random_vacancies", None)
+            if random_vacancies is None:
+                raise ValueError(f"{type(geo).__name__} does not support random vacancies")
+            random_vacancies(self.vacancies.concentration, seed=self.vacancies.seed)
+
+
+class ChainGeometryConfigBase(GeometryConfigBase):
+    """Fields ChainGeometry reads; shared by the plain chain and the AB ring."""
+    lattice: str
     nx: LatticeSide
     boundary_x: BoundaryCondition
 
+
+class ChainGeometryConfig(ChainGeometryConfigBase):
+    lattice: Literal["chain"]
+
     @property
     def dim(self) -> int: return 1
     
@@ -37,16 +78,23 @@ class ChainGeometryConfig(GeometryConfigBase):
         from .chain import ChainGeometry
         return ChainGeometry(self, removed_sites=removed_sites)
 
+    def geometry_class(self) -> type[ChainGeometry]:
+        from .chain import ChainGeometry
+        return ChainGeometry
+
 
-class ABRingGeometryConfig(GeometryConfigBase):
+class ABRingGeometryConfig(ChainGeometryConfigBase):
     lattice: Literal["ab_ring"]
-    nx: LatticeSide
     boundary_x: BoundaryCondition = BoundaryCondition.PERIODIC
     supports_ab_flux: bool = True
     
     def build(self, *, removed_sites: set[tuple[int]] | None = None) -> ABRingGeometry:
         from .ab_ring import ABRingGeometry
         return ABRingGeometry(self, removed_sites=removed_sites)
+
+    def geometry_class(self) -> type[ABRingGeometry]:
+        from .ab_ring import ABRingGeometry
+        return ABRingGeometry
     
 
 class SquareGeometryConfig(GeometryConfigBase):
@@ -64,6 +112,10 @@ class SquareGeometryConfig(GeometryConfigBase):
         from .square import SquareGeometry
         return SquareGeometry(self, removed_sites=removed_sites)
 
+    def geometry_class(self) -> type[SquareGeometry]:
+        from .square import SquareGeometry
+        return SquareGeometry
+
 class HoneycombGeometryConfig(GeometryConfigBase):
     lattice: Literal["honeycomb"]
     nx: LatticeSide
@@ -79,3 +131,7 @@ class HoneycombGeometryConfig(GeometryConfigBase):
         from .honeycomb import HoneycombGeometry
         return HoneycombGeometry(self, removed_sites=removed_sites)
 
+    def geometry_class(self) -> type[HoneycombGeometry]:
+        from .honeycomb import HoneycombGeometry
+        return HoneycombGeometry
+
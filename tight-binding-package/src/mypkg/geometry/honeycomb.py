@@ -1,35 +1,182 @@
 from __future__ import annotations
 
+import logging
+import numpy as np
+from numpy.typing import NDArray
 from typing import TYPE_CHECKING
-from collections.abc import Iterator
+from collections.abc import Collection, Iterator
 
-from ..utils import stable_hash_from_dict, DEFAULT_HASH_LENGTH
-from .types import ActiveIndex, GeometryLike
+from .mask import MaskGeometry, _shift_axis
+from .types import ActiveIndex, Bond, BoundaryCondition, GlobalIndex
 
 if TYPE_CHECKING:
     from .configs import HoneycombGeometryConfig
 
+log = logging.getLogger(__name__)
 
-class HoneycombGeometry(GeometryLike):
-    # Placeholder bond kinds for now (adjust when honeycomb neighbor logic is implemented)
-    provided_bond_keys = {"nn1", "nn2"}
+SUBLATTICE_A = 0
+SUBLATTICE_B = 1
 
-    def __init__(self, config: HoneycombGeometryConfig, *, removed_sites=None):
-        self.config = config
-        self.removed_sites = set(removed_sites or [])
-        # Your config has nx, ny; honeycomb will likely have an internal basis factor later.
-        self.n_global = config.nx * config.ny
+# Bonds as (sublattice_i, sublattice_j, dx, dy) in units of the primitive
+# vectors a1 (x) and a2 (y). Each A site (x, y) has its three B neighbours in
+# cells (x, y), (x-1, y), (x, y-1); nn2 lists three of the six same-sublattice
+# neighbours so every bond appears once.
+BOND_TABLE: dict[str, tuple[tuple[int, int, int, int], ...]] = {
+    "nn1": (
+        (SUBLATTICE_A, SUBLATTICE_B, 0, 0),
+        (SUBLATTICE_A, SUBLATTICE_B, -1, 0),
+        (SUBLATTICE_A, SUBLATTICE_B, 0, -1),
+    ),
+    "nn2": tuple(
+        (s, s, dx, dy)
+        for s in (SUBLATTICE_A, SUBLATTICE_B)
+        for dx, dy in ((+1, 0), (0, +1), (+1, -1))
+    ),
+}
 
-    @property
-    def n_active(self) -> int:
-        return self.n_global - len(self.removed_sites)
 
-    def iter_bonds(self, kind: str) -> Iterator[tuple[ActiveIndex, ActiveIndex]]:
-        raise NotImplementedError
+class HoneycombGeometry(MaskGeometry):
+    """
+    Honeycomb lattice of nx * ny two-site cells (sites labelled (x, y, s),
+    s = 0 for A and 1 for B).
 
-    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
-        state = {
-            "config": self.config.model_dump(mode="json"),
-            "removed_sites": [list(x) for x in sorted(self.removed_sites)],
-        }
-        return stable_hash_from_dict(state, length)
+    Global order is column-major with the sublattices blocked inside each
+    column: g = 2*ny*x + ny*s + y. Every bond then stays within one column
+    or couples neighbouring columns, so H is block tridiagonal in x (RGF
+    slices are the columns, bandwidth ~ 2*ny*ndof) and each column block
+    splits into A/B sub-blocks.
+    """
+
+    config: HoneycombGeometryConfig
+    provided_bond_keys: Collection[str] = {"nn1", "nn2"}
+    # removal masks are indexed [y, x, s]
+    MASK_AXES = (1, 0, 2)
+
+    def __init__(self, config: HoneycombGeometryConfig, *, removed_sites: set[tuple[int, int, int]] | None = None) -> None:
+        super().__init__(config, 2 * config.nx * config.ny, removed_sites)
+
+    def removed_xys(self) -> NDArray[np.intp]:
+        """Removed sites as an (n, 3) array sorted by (x, y, s)."""
+        return self.removed_coords()
+
+    def ensure_site_in_bounds(self, site: tuple[int, int, int]) -> None:
+        x, y, s = site
+        if not (0 <= x < self.config.nx and 0 <= y < self.config.ny and s in (SUBLATTICE_A, SUBLATTICE_B)):
+            log.error(
+                f"Out-of-bounds site ({x}, {y}, {s}); "
+                f"valid range x:[0, {self.config.nx}), y:[0, {self.config.ny}), s:{{0, 1}}"
+            )
+            raise ValueError(f"Site out of bounds: ({x}, {y}, {s})")
+
+    def _coord_shape(self) -> tuple[int, int, int]:
+        return self.config.nx, self.config.ny, 2
+
+    def _periodic_axes(self) -> tuple[bool, bool, bool]:
+        return (
+            self.config.boundary_x == BoundaryCondition.PERIODIC,
+            self.config.boundary_y == BoundaryCondition.PERIODIC,
+            False,
+        )
+
+    def _check_coord(self, coord: tuple[int, ...]) -> None:
+        self.ensure_site_in_bounds((coord[0], coord[1], coord[2]))
+
+    def _join_global(self, coords: tuple[NDArray[np.intp], ...]) -> NDArray[np.intp]:
+        x, y, s = coords
+        ny = self.config.ny
+        return (2 * ny) * x + ny * s + y
+
+    def _split_global(self, g: NDArray[np.intp]) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.intp]]:
+        ny = self.config.ny
+        x, rem = np.divmod(g, 2 * ny)
+        s, y = np.divmod(rem, ny)
+        return x, y, s
+
+    def xys_to_global(self, x: int, y: int, s: int) -> GlobalIndex:
+        self.ensure_site_in_bounds((x, y, s))
+        return GlobalIndex(2 * self.config.ny * x + self.config.ny * s + y)
+
+    def global_to_xys(self, global_idx: GlobalIndex) -> tuple[int, int, int]:
+        ny = self.config.ny
+        x, rem = divmod(int(global_idx), 2 * ny)
+        s, y = divmod(rem, ny)
+        return x, y, s
+
+    def positions(self) -> NDArray[np.float64]:
+        """
+        Cartesian positions of the active sites, shape (n_active, 2), for a
+        nearest-neighbour distance of 1 (a1 = (sqrt3, 0), a2 = (sqrt3/2, 3/2)).
+        """
+        self._ensure_maps()
+        assert self._active_to_global_idx is not None
+        x, y, s = self._split_global(self._active_to_global_idx)
+        r3 = np.sqrt(3.0)
+        px = r3 * x + 0.5 * r3 * y + 0.5 * r3 * s
+        py = 1.5 * y + 0.5 * s
+        return np.column_stack([px, py])
+
+    def sublattice(self) -> NDArray[np.intp]:
+        """Sublattice label (0 = A, 1 = B) of every active site."""
+        self._ensure_maps()
+        assert self._active_to_global_idx is not None
+        return self._split_global(self._active_to_global_idx)[2]
+
+    def column_sites(self) -> list[NDArray[np.intp]]:
+        """Active site indices grouped by x (one array per column: A sites, then B sites)."""
+        self._ensure_maps()
+        assert self._active_to_global_idx is not None
+        # The natural order is column-major (columns are contiguous runs); a
+        # site reordering needs the stable sort.
+        x = self._active_to_global_idx // (2 * self.config.ny)
+        counts = np.bincount(x, minlength=self.config.nx)
+        order = np.arange(x.size, dtype=np.intp) if self._site_perm is None else np.argsort(x, kind="stable").astype(np.intp)
+        return np.split(order, np.cumsum(counts)[:-1])
+
+    def bond_table(self, kind: str) -> tuple[tuple[int, int, int, int], ...]:
+        try:
+            return BOND_TABLE[kind]
+        except KeyError:
+            raise ValueError(f"Unknown bond kind: {kind}") from None
+
+    def bond_arrays(self, kind: str) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """
+        All bonds of `kind` as contiguous active-index arrays (i, j), sorted
+        by i and, for each i, in BOND_TABLE order. Same bonds as iter_bonds.
+        """
+        table = self.bond_table(kind)
+        self._ensure_maps()
+        cached = self._bond_cache.get(kind)
+        if cached is not None:
+            return cached
+        assert self._active_to_global_idx is not None and self._global_to_active_idx is not None
+
+        nx, ny = self.config.nx, self.config.ny
+        x, y, s = self._split_global(self._active_to_global_idx)
+        i_all = np.arange(x.size, dtype=np.intp)
+
+        i_parts: list[NDArray[np.intp]] = []
+        j_parts: list[NDArray[np.intp]] = []
+        for s_i, s_j, dx, dy in table:
+            on = s == s_i
+            xx, ok_x = _shift_axis(x[on], dx, nx, self.config.boundary_x)
+            yy, ok_y = _shift_axis(y[on], dy, ny, self.config.boundary_y)
+            ok = ok_x & ok_y
+            j = self._global_to_active_idx[self._join_global((xx[ok], yy[ok], np.full(xx[ok].shape, s_j, dtype=np.intp)))]
+            alive = j >= 0
+            i_parts.append(i_all[on][ok][alive])
+            j_parts.append(j[alive])
+
+        i_arr = np.concatenate(i_parts)
+        j_arr = np.concatenate(j_parts)
+        order = np.argsort(i_arr, kind="stable")
+        out = np.ascontiguousarray(i_arr[order]), np.ascontiguousarray(j_arr[order])
+        if self._frozen:
+            for arr in out:
+                arr.flags.writeable = False
+            self._bond_cache[kind] = out
+        return out
+
+    def iter_bonds(self, kind: str) -> Iterator[Bond]:
+        i_arr, j_arr = self.bond_arrays(kind)
+        for i, j in zip(i_arr.tolist(), j_arr.tolist()):
+            yield ActiveIndex(i), ActiveIndex(j)
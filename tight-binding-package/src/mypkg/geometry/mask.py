@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+from numpy.typing import NDArray
+from typing import Any, ClassVar
+
+from ..utils.core import check_hash_length, stable_digest_from_dict, DEFAULT_HASH_LENGTH
+from .ordering import SITE_ORDERINGS, SiteOrdering, check_site_ordering, site_graph, site_permutation
+from .types import ActiveIndex, BoundaryCondition, GeometryLike, GlobalIndex
+
+log = logging.getLogger(__name__)
+
+
+def _shift_axis(
+    coord: NDArray[np.intp], d: int, n: int, bc: BoundaryCondition
+) -> tuple[NDArray[np.intp], NDArray[np.bool_]]:
+    """Shift coordinates along one axis; returns (shifted, in_bounds)."""
+    shifted = coord + d
+    if bc == BoundaryCondition.PERIODIC:
+        return shifted % n, np.ones(shifted.shape, dtype=bool)
+    return shifted, (shifted >= 0) & (shifted < n)
+
+
+class MaskGeometry(GeometryLike, ABC):
+    """
+    Lattice whose removed sites are a boolean mask over global indices.
+
+    Holds what does not depend on the lattice: the mask, the active <-> global
+    index maps (rebuilt lazily, optionally permuted by a site ordering), the
+    table export/import for on-disk caches, the geometry hash, and vectorized
+    site removal. A lattice supplies its coordinates, i.e. how a site label
+    joins into a global index and splits back:
+
+      _coord_shape()     extent of each coordinate, e.g. (nx, ny)
+      _periodic_axes()   which coordinates wrap under remove_sites(wrap=True)
+      _join_global(c)    tuple of coordinate arrays -> global indices
+      _split_global(g)   global indices -> coordinate arrays
+      _check_coord(c)    raise ValueError for an out-of-bounds label
+      MASK_AXES          coordinate held by each axis of a shaped removal mask
+
+    plus bond_arrays() for its bond kinds.
+    """
+
+    MASK_AXES: ClassVar[tuple[int, ...]]
+    # Site orderings set_site_ordering accepts.
+    site_orderings: ClassVar[tuple[str, ...]] = SITE_ORDERINGS
+
+    def __init__(self, config: Any, n_global: int, removed_sites: Any = None) -> None:
+        self.config = config
+        self.n_global: int = n_global
+        self._removed_mask: NDArray[np.bool_] = np.zeros(self.n_global, dtype=bool)
+        self._n_removed: int = 0
+        self._maps_dirty: bool = True
+        self._frozen: bool = False
+        self._global_to_active_idx: NDArray[np.intp] | None = None
+        self._active_to_global_idx: NDArray[np.intp] | None = None
+        self._bond_cache: dict[str, tuple[NDArray[np.intp], NDArray[np.intp]]] = {}
+        self._digest: str | None = None
+        self._site_ordering: SiteOrdering = "natural"
+        self._site_perm: NDArray[np.intp] | None = None
+        if removed_sites:
+            ndim = len(self._coord_shape())
+            self.remove_sites(np.asarray(sorted(removed_sites), dtype=np.intp).reshape(-1, ndim))
+
+    # --- lattice coordinates -------------------------------------------------
+
+    @abstractmethod
+    def _coord_shape(self) -> tuple[int, ...]: ...
+
+    @abstractmethod
+    def _periodic_axes(self) -> tuple[bool, ...]: ...
+
+    @abstractmethod
+    def _join_global(self, coords: tuple[NDArray[np.intp], ...]) -> NDArray[np.intp]: ...
+
+    @abstractmethod
+    def _split_global(self, g: NDArray[np.intp]) -> tuple[NDArray[np.intp], ...]: ...
+
+    @abstractmethod
+    def _check_coord(self, coord: tuple[int, ...]) -> None: ...
+
+    @property
+    def mask_shape(self) -> tuple[int, ...]:
+        shape = self._coord_shape()
+        return tuple(shape[a] for a in self.MASK_AXES)
+
+    # --- removed sites -------------------------------------------------------
+
+    @property
+    def n_active(self) -> int:
+        return self.n_global - self._n_removed
+
+    @property
+    def removed_sites(self) -> frozenset[tuple[int, ...]]:
+        """Removed site labels, built from the mask; read-only, use remove_site(s) to modify."""
+        return frozenset(tuple(c) for c in self.removed_coords().tolist())
+
+    @property
+    def removed_mask(self) -> NDArray[np.bool_]:
+        out = self._removed_mask.view()
+        out.flags.writeable = False
+        return out
+
+    def removed_coords(self) -> NDArray[np.intp]:
+        """Removed site labels as an (n, ndim) array in lexicographic order."""
+        coords = self._split_global(np.flatnonzero(self._removed_mask))
+        order = np.lexsort(coords[::-1])
+        return np.column_stack([c[order] for c in coords]).astype(np.intp).reshape(-1, len(coords))
+
+    def _ensure_mutable(self) -> None:
+        if self._frozen:
+            msg = "Geometry is frozen; cannot modify removed_sites."
+            log.error(msg)
+            raise RuntimeError(msg)
+
+    def remove_site(self, coord: tuple[int, ...], *, wrap: bool = False) -> None:
+        self.remove_sites(np.asarray([coord], dtype=np.intp), wrap=wrap)
+
+    def remove_sites(self, sites: NDArray[np.integer] | NDArray[np.bool_], *, wrap: bool = False) -> int:
+        """
+        Remove many sites in one vectorized pass. `sites` is either an
+        (n, ndim) array of site labels or a boolean mask of shape mask_shape
+        or (n_global,). Returns the number of newly removed sites.
+        """
+        self._ensure_mutable()
+        arr = np.asarray(sites)
+        shape = self._coord_shape()
+
+        if arr.dtype == bool:
+            if arr.shape == (self.n_global,):
+                new = arr.reshape(-1)
+            elif arr.shape == self.mask_shape:
+                hit = np.nonzero(arr)
+                coords = [hit[self.MASK_AXES.index(a)] for a in range(len(shape))]
+                new = np.zeros(self.n_global, dtype=bool)
+                new[self._join_global(tuple(coords))] = True
+            else:
+                shapes = str(self.mask_shape)
+                if self.mask_shape != (self.n_global,):
+                    shapes += f" or ({self.n_global},)"
+                raise ValueError(f"Mask must have shape {shapes}, got {arr.shape}")
+        else:
+            labels = arr.astype(np.intp).reshape(-1, len(shape))
+            coords = [labels[:, a] for a in range(len(shape))]
+            if wrap:
+                coords = [c % n if periodic else c for c, n, periodic in zip(coords, shape, self._periodic_axes())]
+            bad = np.zeros(labels.shape[0], dtype=bool)
+            for c, n in zip(coords, shape):
+                bad |= (c < 0) | (c >= n)
+            if bad.any():
+                k = int(np.flatnonzero(bad)[0])
+                self._check_coord(tuple(int(c[k]) for c in coords))
+            new = np.zeros(self.n_global, dtype=bool)
+            new[self._join_global(tuple(coords))] = True
+
+        added = int(np.count_nonzero(new & ~self._removed_mask))
+        if added:
+            self._removed_mask |= new
+            self._n_removed += added
+            self._invalidate_maps()
+        return added
+
+    def random_vacancies(self, concentration: float, *, seed: int) -> int:
+        """
+        Remove round(concentration * n_global) currently active sites chosen
+        uniformly with a seeded generator. Returns the number removed.
+        """
+        if not 0.0 <= concentration < 1.0:
+            raise ValueError(f"Vacancy concentration must be in [0, 1), got {concentration}")
+        candidates = np.flatnonzero(~self._removed_mask)
+        k = min(int(round(concentration * self.n_global)), candidates.size)
+        rng = np.random.default_rng(seed)
+        mask = np.zeros(self.n_global, dtype=bool)
+        mask[rng.choice(candidates, size=k, replace=False)] = True
+        return self.remove_sites(mask)
+
+    # --- site ordering -------------------------------------------------------
+
+    @property
+    def site_ordering(self) -> SiteOrdering:
+        return self._site_ordering
+
+    def set_site_ordering(self, method: SiteOrdering) -> None:
+        """
+        Order of the active indices: "natural" (global order) or "rcm"
+        (bandwidth-reducing, see geometry.ordering). Part of the geometry
+        state; set it before freezing.
+        """
+        self._ensure_mutable()
+        check_site_ordering(method)
+        if method not in self.site_orderings:
+            raise ValueError(f"{type(self).__name__} does not support site ordering {method!r}")
+        if method != self._site_ordering:
+            self._site_ordering = method
+            self._invalidate_maps()
+
+    @property
+    def site_permutation(self) -> NDArray[np.intp] | None:
+        """Active index k holds natural active site site_permutation[k] (None if natural)."""
+        self._ensure_maps()
+        return self._site_perm
+
+    # --- index maps and tables -----------------------------------------------
+
+    def freeze(self) -> None:
+        self._frozen = True
+        self._ensure_maps()
+
+    def _invalidate_maps(self) -> None:
+        self._maps_dirty = True
+        self._bond_cache.clear()
+        self._digest = None
+
+    def export_tables(self) -> dict[str, NDArray[np.intp]]:
+        """Index maps and bond arrays, e.g. for an on-disk cache."""
+        self._ensure_maps()
+        assert self._active_to_global_idx is not None and self._global_to_active_idx is not None
+        tables = {
+            "active_to_global": self._active_to_global_idx,
+            "global_to_active": self._global_to_active_idx,
+        }
+        if self._site_perm is not None:
+            tables["site_permutation"] = self._site_perm
+        for kind in sorted(self.provided_bond_keys):
+            tables[f"bonds_{kind}_i"], tables[f"bonds_{kind}_j"] = self.bond_arrays(kind)
+        return tables
+
+    def load_tables(self, tables: dict[str, NDArray[np.intp]]) -> None:
+        """Install tables produced by export_tables() for this exact geometry state."""
+        a2g = np.asarray(tables["active_to_global"], dtype=np.intp)
+        g2a = np.asarray(tables["global_to_active"], dtype=np.intp)
+        if g2a.size != self.n_global or a2g.size != self.n_active:
+            raise ValueError("Geometry tables do not match this geometry")
+        self._active_to_global_idx, self._global_to_active_idx = a2g, g2a
+        perm = tables.get("site_permutation")
+        self._site_perm = None if perm is None else np.asarray(perm, dtype=np.intp)
+        self._maps_dirty = False
+        self._bond_cache = {
+            kind: (
+                np.asarray(tables[f"bonds_{kind}_i"], dtype=np.intp),
+                np.asarray(tables[f"bonds_{kind}_j"], dtype=np.intp),
+            )
+            for kind in self.provided_bond_keys
+            if f"bonds_{kind}_i" in tables
+        }
+
+    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
+        # Cached; site removal invalidates through _invalidate_maps().
+        check_hash_length(length)
+        if self._digest is None:
+            geometry_state: dict[str, Any] = {
+                "config": self.config.model_dump(mode="json"),
+                "removed_sites": self.removed_coords().tolist(),
+            }
+            if self._site_ordering != "natural":
+                geometry_state["site_ordering"] = self._site_ordering
+            self._digest = stable_digest_from_dict(geometry_state)
+        return self._digest[:length]
+
+    def _rebuild_index_maps(self) -> None:
+        global_to_active_idx = np.full(self.n_global, -1, dtype=np.intp)
+
+        self._active_to_global_idx = np.flatnonzero(~self._removed_mask).astype(np.intp)
+        global_to_active_idx[self._active_to_global_idx] = np.arange(self._active_to_global_idx.size, dtype=np.intp)
+
+        self._global_to_active_idx = global_to_active_idx
+        self._maps_dirty = False
+        self._site_perm = None
+        if self._site_ordering != "natural":
+            self._apply_site_ordering()
+
+    def _apply_site_ordering(self) -> None:
+        """Permute the natural maps into the configured order (bonds are recomputed after)."""
+        assert self._active_to_global_idx is not None and self._global_to_active_idx is not None
+        perm = site_permutation(site_graph(self), self._site_ordering)
+        self._bond_cache.clear()
+        if perm is None:
+            return
+        self._active_to_global_idx = self._active_to_global_idx[perm]
+        self._global_to_active_idx[self._active_to_global_idx] = np.arange(perm.size, dtype=np.intp)
+        self._site_perm = perm
+
+    def _ensure_maps(self) -> None:
+        if self._maps_dirty or self._global_to_active_idx is None or self._active_to_global_idx is None:
+            self._rebuild_index_maps()
+
+    def global_to_active(self, i_global: GlobalIndex) -> ActiveIndex | None:
+        self._ensure_maps()
+        assert self._global_to_active_idx is not None
+        i = int(self._global_to_active_idx[int(i_global)])
+        return None if i < 0 else ActiveIndex(i)
+
+    def active_to_global(self, i_active: ActiveIndex) -> GlobalIndex:
+        self._ensure_maps()
+        assert self._active_to_global_idx is not None
+        return GlobalIndex(int(self._active_to_global_idx[int(i_active)]))
+
+    @abstractmethod
+    def bond_arrays(self, kind: str) -> tuple[NDArray[np.intp], NDArray[np.intp]]: ...
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Literal
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .types import GeometryLike
+
+# scipy is imported where used: geometry modules sit on the CLI import path.
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+
+# "natural": active sites in global-index order; "rcm": reverse Cuthill-McKee
+# on the site graph of all provided bond kinds.
+SiteOrdering = Literal["natural", "rcm"]
+SITE_ORDERINGS: tuple[str, ...] = ("natural", "rcm")
+
+
+def check_site_ordering(method: str) -> None:
+    if method not in SITE_ORDERINGS:
+        raise ValueError(f"Unknown site ordering {method!r}; expected one of {SITE_ORDERINGS}")
+
+
+def site_graph(geo: GeometryLike, kinds: Iterable[str] | None = None) -> sp.csr_matrix:
+    """Symmetric active-site adjacency over the bonds of `kinds` (default: all provided)."""
+    import scipy.sparse as sp
+    kinds = sorted(geo.provided_bond_keys) if kinds is None else list(kinds)
+    n = geo.n_active
+    bond_arrays = getattr(geo, "bond_arrays", None)
+    if bond_arrays is None:
+        raise ValueError("Site graph requires a geometry with bond_arrays")
+    parts = [bond_arrays(k) for k in kinds]
+    i = np.concatenate([p[0] for p in parts] + [p[1] for p in parts]) if parts else np.empty(0, dtype=np.intp)
+    j = np.concatenate([p[1] for p in parts] + [p[0] for p in parts]) if parts else np.empty(0, dtype=np.intp)
+    adj = sp.csr_matrix((np.ones(i.size, dtype=np.int8), (i, j)), shape=(n, n))
+    adj.sum_duplicates()
+    return adj
+
+
+def site_permutation(adj: sp.csr_matrix, method: SiteOrdering) -> NDArray[np.intp] | None:
+    """New active order as indices into the current one (None for "natural")."""
+    check_site_ordering(method)
+    if method == "natural":
+        return None
+    from scipy.sparse.csgraph import reverse_cuthill_mckee
+    return reverse_cuthill_mckee(adj, symmetric_mode=True).astype(np.intp)
+
+
+def bandwidth_stats(adj: sp.csr_matrix) -> dict[str, int]:
+    """
+    Half bandwidth max|i - j| and envelope size sum_i (i - min_{j <= i} j)
+    of a symmetric pattern (self-loops ignored). The envelope bounds the
+    fill of a factorization in this order: L lies inside it.
+    """
+    coo = adj.tocoo()
+    n = adj.shape[0]
+    lower = coo.row >= coo.col
+    first = np.arange(n, dtype=np.intp)
+    np.minimum.at(first, coo.row[lower], coo.col[lower])
+    return {
+        "bandwidth": int(np.abs(coo.row - coo.col).max(initial=0)),
+        "envelope": int((np.arange(n) - first).sum()),
+    }
+
+
+def ordering_report(geo: GeometryLike) -> dict[str, dict[str, int]]:
+    """bandwidth_stats of the site graph in the natural order ("before") and the current one ("after")."""
+    import scipy.sparse as sp
+    adj = site_graph(geo)
+    perm = getattr(geo, "site_permutation", None)
+    before = adj
+    if perm is not None:
+        coo = adj.tocoo()
+        before = sp.csr_matrix((coo.data, (perm[coo.row], perm[coo.col])), shape=adj.shape)
+    return {"before": bandwidth_stats(before), "after": bandwidth_stats(adj)}
+
+
+def to_natural_order(values: NDArray, perm: NDArray[np.intp] | None, axis: int = -1) -> NDArray:
+    """Map a per-site array from a reordered active order back to the natural one."""
+    if perm is None:
+        return values
+    out = np.empty_like(values)
+    index: list[Any] = [slice(None)] * out.ndim
+    index[axis] = perm
+    out[tuple(index)] = values
+    return out
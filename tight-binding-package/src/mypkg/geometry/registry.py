@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Protocol
+
+from .types import FreezableGeometryLike
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+    from .configs import DefectsConfig, GeometryConfigBase
+    from .ordering import SiteOrdering
+
+log = logging.getLogger(__name__)
+
+
+class TableStore(Protocol):
+    """On-disk table cache (simulation.cache.ArtifactCache satisfies this)."""
+    def get_arrays(self, stage: str, *parts: str) -> dict[str, NDArray] | None: ...
+    def put_arrays(self, stage: str, parts: tuple[str, ...], arrays: dict[str, NDArray]) -> Any: ...
+
+
+class GeometryRegistry:
+    """
+    Process-wide cache of frozen geometries keyed by geometry hash
+    (config + removed sites, after any DefectsConfig is applied, + site
+    ordering). Entries come back with index maps and bond arrays already
+    computed; with a TableStore those tables are also read
+    from / written to disk, so repeated runs skip construction.
+    """
+
+    def __init__(self, maxsize: int = 8) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[str, FreezableGeometryLike] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def get(
+        self,
+        config: GeometryConfigBase,
+        removed_sites: Any = None,
+        *,
+        defects: DefectsConfig | None = None,
+        ordering: SiteOrdering = "natural",
+        store: TableStore | None = None,
+    ) -> FreezableGeometryLike:
+        geo = config.build(removed_sites=removed_sites)
+        if defects is not None:
+            defects.apply(geo)
+        if ordering != "natural":
+            apply_site_ordering(geo, ordering)
+        key = geo.get_hash(32)
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None:
+                self._items.move_to_end(key)
+                return hit
+
+        export_tables = getattr(geo, "export_tables", None)
+        load_tables = getattr(geo, "load_tables", None)
+        tables = None
+        if store is not None and export_tables is not None and load_tables is not None:
+            tables = store.get_arrays("geometry", geo.get_hash())
+            if tables is not None:
+                load_tables(tables)
+        geo.freeze()
+        if tables is None and export_tables is not None:
+            tables = export_tables()  # also memoizes bond arrays on the frozen geometry
+            if store is not None:
+                store.put_arrays("geometry", (geo.get_hash(),), tables)
+
+        with self._lock:
+            self._items[key] = geo
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return geo
+
+
+def apply_site_ordering(geo: FreezableGeometryLike, ordering: SiteOrdering) -> None:
+    set_ordering = getattr(geo, "set_site_ordering", None)
+    if set_ordering is None:
+        raise ValueError(f"{type(geo).__name__} does not support site reordering")
+    set_ordering(ordering)
+
+
+_REGISTRY = GeometryRegistry()
+
+
+def get_geometry(
+    config: GeometryConfigBase,
+    removed_sites: Any = None,
+    *,
+    defects: DefectsConfig | None = None,
+    ordering: SiteOrdering = "natural",
+    store: TableStore | None = None,
+) -> FreezableGeometryLike:
+    """Frozen, fully tabulated geometry from the process-wide registry."""
+    return _REGISTRY.get(config, removed_sites, defects=defects, ordering=ordering, store=store)
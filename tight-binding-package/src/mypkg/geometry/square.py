@@ -3,10 +3,10 @@ from __future__ import annotations
 import logging
 import numpy as np
 from numpy.typing import NDArray
-from collections.abc import Iterator
+from collections.abc import Collection, Iterator
 
-from ..utils.core import stable_hash_from_dict, DEFAULT_HASH_LENGTH
-from .types import GlobalIndex, ActiveIndex, BoundaryCondition, GeometryLike, Bond
+from .mask import MaskGeometry, _shift_axis
+from .types import GlobalIndex, ActiveIndex, BoundaryCondition, Bond
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -14,35 +14,26 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
-class SquareGeometry(GeometryLike):
-    provided_bond_keys = {"nn1x", "nn1y", "nn2"}
+# Lattice displacement (dx, dy) from site i to site j for every bond (i, j) of a kind.
+BOND_SHIFTS: dict[str, tuple[tuple[int, int], ...]] = {
+    "nn1x": ((+1, 0),),
+    "nn1y": ((0, +1),),
+    "nn2": ((+1, +1), (-1, +1)),
+}
 
-    def __init__(self, config: SquareGeometryConfig, *, removed_sites: set[tuple[int, int]] | None = None) -> None:
-        self.config = config
-        self.removed_sites: set[tuple[int, int]] = set(removed_sites or [])
-        self.n_global: int = config.nx * config.ny
-        self._maps_dirty: bool = True
-        self._frozen: bool = False
-        self._global_to_active_idx: NDArray[np.intp] | None = None
-        self._active_to_global_idx: NDArray[np.intp] | None = None
-
-    @property
-    def n_active(self) -> int:
-        return self.n_global - len(self.removed_sites)
-
-    def freeze(self) -> None:
-        self._frozen = True
-        self._ensure_maps()
+class SquareGeometry(MaskGeometry):
+    config: SquareGeometryConfig
+    provided_bond_keys: Collection[str] = {"nn1x", "nn1y", "nn2"}
+    # removal masks are indexed [y, x]
+    MASK_AXES = (1, 0)
 
-    def _invalidate_maps(self) -> None:
-        self._maps_dirty = True
+    def __init__(self, config: SquareGeometryConfig, *, removed_sites: set[tuple[int, int]] | None = None) -> None:
+        # Removed sites are stored as a mask over global indices (x + nx*y).
+        super().__init__(config, config.nx * config.ny, removed_sites)
 
-    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
-        geometry_state = {
-            "config": self.config.model_dump(mode="json"),
-            "removed_sites": [list(xy) for xy in sorted(self.removed_sites)],
-        }
-        return stable_hash_from_dict(geometry_state, length)
+    def removed_xy(self) -> NDArray[np.intp]:
+        """Removed coordinates as an (n, 2) array sorted by (x, y)."""
+        return self.removed_coords()
 
     def ensure_coord_in_bounds(self, coord: tuple[int, int]) -> None:
         x, y = coord
@@ -53,22 +44,24 @@ class SquareGeometry(GeometryLike):
             )
             raise ValueError(f"Coordinates out of bounds: ({x}, {y})")
 
-    def remove_site(self, coord: tuple[int, int], *, wrap: bool = False) -> None:
-        if self._frozen:
-            msg = "Geometry is frozen; cannot modify removed_sites."
-            log.error(msg)
-            raise RuntimeError(msg)
+    def _coord_shape(self) -> tuple[int, int]:
+        return self.config.nx, self.config.ny
 
-        x, y = coord
-        if wrap:
-            x, y = self.wrap_xy(x, y)
-        else:
-            self.ensure_coord_in_bounds((x, y))
+    def _periodic_axes(self) -> tuple[bool, bool]:
+        return (
+            self.config.boundary_x == BoundaryCondition.PERIODIC,
+            self.config.boundary_y == BoundaryCondition.PERIODIC,
+        )
+
+    def _check_coord(self, coord: tuple[int, ...]) -> None:
+        self.ensure_coord_in_bounds((coord[0], coord[1]))
+
+    def _join_global(self, coords: tuple[NDArray[np.intp], ...]) -> NDArray[np.intp]:
+        x, y = coords
+        return x + self.config.nx * y
 
-        coord_wrapped = (x, y)
-        if coord_wrapped not in self.removed_sites:
-            self.removed_sites.add(coord_wrapped)
-            self._invalidate_maps()
+    def _split_global(self, g: NDArray[np.intp]) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        return g % self.config.nx, g // self.config.nx
 
     def xy_to_global(self, x: int, y: int) -> GlobalIndex:
         self.ensure_coord_in_bounds((x, y))
@@ -87,37 +80,6 @@ class SquareGeometry(GeometryLike):
             y %= ny
         return x, y
 
-    def _rebuild_index_maps(self) -> None:
-        nx = self.config.nx
-        n_global = self.n_global
-
-        global_to_active_idx = np.full(n_global, -1, dtype=np.intp)
-
-        removed_mask = np.zeros(n_global, dtype=bool)
-        for (x, y) in self.removed_sites:
-            removed_mask[x + nx * y] = True
-
-        self._active_to_global_idx = np.flatnonzero(~removed_mask).astype(np.intp)
-        global_to_active_idx[self._active_to_global_idx] = np.arange(self._active_to_global_idx.size, dtype=np.intp)
-
-        self._global_to_active_idx = global_to_active_idx
-        self._maps_dirty = False
-
-    def _ensure_maps(self) -> None:
-        if self._maps_dirty or self._global_to_active_idx is None or self._active_to_global_idx is None:
-            self._rebuild_index_maps()
-
-    def global_to_active(self, i_global: GlobalIndex) -> ActiveIndex | None:
-        self._ensure_maps()
-        assert self._global_to_active_idx is not None
-        i = int(self._global_to_active_idx[int(i_global)])
-        return None if i < 0 else ActiveIndex(i)
-
-    def active_to_global(self, i_active: ActiveIndex) -> GlobalIndex:
-        self._ensure_maps()
-        assert self._active_to_global_idx is not None
-        return GlobalIndex(int(self._active_to_global_idx[int(i_active)]))
-
     def neighbor_xy(self, x: int, y: int, dx: int, dy: int) -> tuple[int, int] | None:
         nx, ny = self.config.nx, self.config.ny
         xx, yy = x + dx, y + dy
@@ -151,20 +113,65 @@ class SquareGeometry(GeometryLike):
             return None
         return self.global_to_active(j_global)
 
+    def column_sites(self) -> list[NDArray[np.intp]]:
+        """Active site indices grouped by x (one array per column, ascending y)."""
+        self._ensure_maps()
+        assert self._active_to_global_idx is not None
+        nx = self.config.nx
+        x = self._active_to_global_idx % nx
+        order = np.argsort(x, kind="stable").astype(np.intp)
+        counts = np.bincount(x, minlength=nx)
+        return np.split(order, np.cumsum(counts)[:-1])
+
+    def bond_shifts(self, kind: str) -> tuple[tuple[int, int], ...]:
+        try:
+            return BOND_SHIFTS[kind]
+        except KeyError:
+            raise ValueError(f"Unknown bond kind: {kind}") from None
+
+    def bond_arrays(self, kind: str) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """
+        All bonds of `kind` as contiguous active-index arrays (i, j).
+
+        Same bonds and same order as `iter_bonds`: sorted by i, and for each i
+        the shifts of `kind` in the order listed in BOND_SHIFTS.
+        """
+        shifts = self.bond_shifts(kind)
+        self._ensure_maps()
+        cached = self._bond_cache.get(kind)
+        if cached is not None:
+            return cached
+        assert self._active_to_global_idx is not None and self._global_to_active_idx is not None
+
+        nx, ny = self.config.nx, self.config.ny
+        src_global = self._active_to_global_idx
+        x, y = src_global % nx, src_global // nx
+        i_all = np.arange(src_global.size, dtype=np.intp)
+
+        i_parts: list[NDArray[np.intp]] = []
+        j_parts: list[NDArray[np.intp]] = []
+        for dx, dy in shifts:
+            xx, ok_x = _shift_axis(x, dx, nx, self.config.boundary_x)
+            yy, ok_y = _shift_axis(y, dy, ny, self.config.boundary_y)
+            ok = ok_x & ok_y
+            j = self._global_to_active_idx[xx[ok] + nx * yy[ok]]
+            alive = j >= 0
+            i_parts.append(i_all[ok][alive])
+            j_parts.append(j[alive])
+
+        i_arr = np.concatenate(i_parts)
+        j_arr = np.concatenate(j_parts)
+        if len(shifts) > 1:
+            order = np.argsort(i_arr, kind="stable")
+            i_arr, j_arr = i_arr[order], j_arr[order]
+        out = np.ascontiguousarray(i_arr), np.ascontiguousarray(j_arr)
+        if self._frozen:
+            for arr in out:
+                arr.flags.writeable = False
+            self._bond_cache[kind] = out
+        return out
+
     def iter_bonds(self, kind: str) -> Iterator[Bond]:
-        if kind == "nn1x":
-            shifts = [(+1, 0)]
-        elif kind == "nn1y":
-            shifts = [(0, +1)]
-        elif kind == "nn2":
-            shifts = [(+1, +1), (-1, +1)]
-        else:
-            raise ValueError(f"Unknown bond kind: {kind}")
-
-        for i in range(self.n_active):
-            i_act = ActiveIndex(i)
-            for dx, dy in shifts:
-                j_act = self.neighbor_active(i_act, dx, dy)
-                if j_act is None:
-                    continue
-                yield i_act, j_act
\ No newline at end of file
+        i_arr, j_arr = self.bond_arrays(kind)
+        for i, j in zip(i_arr.tolist(), j_arr.tolist()):
+            yield ActiveIndex(i), ActiveIndex(j)
@@ -1,25 +1,101 @@
 from __future__ import annotations
 
+import hashlib
+from collections.abc import Mapping
+from typing import Annotated, Any
+
 import numpy as np
 from numpy.typing import NDArray
-from typing import List
 
-from pydantic import RootModel, model_validator
+from pydantic import PlainSerializer, PlainValidator, RootModel
 from .types import PairMatrixData
 
-class PairMatrix(RootModel[PairMatrixData]):
-    @model_validator(mode="after")
-    def _check_square_and_pairs(self):
-        mat = self.root
-        n = len(mat)
-        if n == 0:
+
+def _sparse_to_dense(value: Mapping[Any, Any]) -> NDArray[np.complex128]:
+    """
+    Sparse input: {"n": n, "entries": [[i, j, re(, im)], ...]} (YAML friendly)
+    or {(i, j): value} with value complex or (re, im); n = max index + 1.
+    Indices must lie in [0, n) and each (i, j) may appear only once.
+    """
+    if "entries" in value:
+        n = int(value["n"])
+        items = [((int(e[0]), int(e[1])), complex(e[2], e[3] if len(e) > 3 else 0.0)) for e in value["entries"]]
+    else:
+        items = [
+            ((int(i), int(j)), complex(*v) if isinstance(v, (tuple, list)) else complex(v))
+            for (i, j), v in value.items()
+        ]
+        n = 1 + max((max(ij) for ij, _ in items), default=-1)
+    mat = np.zeros((n, n), dtype=np.complex128)
+    seen: set[tuple[int, int]] = set()
+    for (i, j), v in items:
+        if not (0 <= i < n and 0 <= j < n):
+            raise ValueError(f"Sparse entry ({i}, {j}) lies outside the {n} x {n} matrix")
+        if (i, j) in seen:
+            raise ValueError(f"Duplicate sparse entry ({i}, {j})")
+        seen.add((i, j))
+        mat[i, j] = v
+    return mat
+
+
+def _as_complex_matrix(value: Any) -> NDArray[np.complex128]:
+    """Accepts (n,n,2) (re, im) pairs, a dense (n,n) array, or a sparse mapping."""
+    if isinstance(value, PairMatrix):
+        return value.root
+    if isinstance(value, Mapping):
+        mat = _sparse_to_dense(value)
+    else:
+        arr = np.asarray(value)
+        if arr.size == 0:
             raise ValueError("Matrix must be non-empty.")
-        if any(len(row) != n for row in mat):
-            raise ValueError("Matrix must be square (n x n).")
-        return self
-
-    def to_complex(self) -> np.ndarray:
-        arr = np.asarray(self.root, dtype=float)  # shape (n, n, 2)
-        if arr.ndim != 3 or arr.shape[-1] != 2:
-            raise ValueError(f"Expected shape (n,n,2), got {arr.shape}")
-        return arr[..., 0] + 1j * arr[..., 1]
\ No newline at end of file
+        if arr.dtype == object or not (np.issubdtype(arr.dtype, np.number) or arr.dtype == bool):
+            raise ValueError("Matrix entries must be numbers or (re, im) pairs.")
+        if arr.ndim == 3 and arr.shape[-1] == 2 and not np.iscomplexobj(arr):
+            mat = arr[..., 0].astype(np.float64) + 1j * arr[..., 1].astype(np.float64)
+        elif arr.ndim == 2:
+            mat = arr.astype(np.complex128)
+        else:
+            raise ValueError(f"Expected shape (n,n,2) or (n,n), got {arr.shape}")
+
+    n = mat.shape[0]
+    if n == 0:
+        raise ValueError("Matrix must be non-empty.")
+    if mat.shape != (n, n):
+        raise ValueError("Matrix must be square (n x n).")
+    mat = np.ascontiguousarray(mat, dtype=np.complex128)
+    mat.flags.writeable = False
+    return mat
+
+
+def _to_pairs(mat: NDArray[np.complex128]) -> PairMatrixData:
+    """Canonical (re, im) nested lists; keeps dumps and hashes identical to the list form."""
+    return np.stack([mat.real, mat.imag], axis=-1).tolist()
+
+
+ComplexMatrix = Annotated[
+    Any,
+    PlainValidator(_as_complex_matrix),
+    PlainSerializer(_to_pairs, return_type=list),
+]
+
+
+class PairMatrix(RootModel[ComplexMatrix]):
+    """
+    Square complex matrix stored once as a read-only complex128 array.
+    Serializes (and therefore hashes) as nested (re, im) pairs.
+    """
+
+    def to_complex(self) -> NDArray[np.complex128]:
+        return self.root
+
+    @property
+    def n(self) -> int:
+        return self.root.shape[0]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PairMatrix):
+            return NotImplemented
+        return np.array_equal(self.root, other.root)
+
+    def __hash__(self) -> int:
+        return hash(hashlib.sha256(self.root.tobytes()).digest()[:8])
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import ClassVar, Literal
+import numpy as np
+from numpy.typing import NDArray
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from ..linalg.core import PairMatrix
-from ..utils.core import stable_hash_from_dict, DEFAULT_HASH_LENGTH
+from ..utils.core import CachedHashModel
 from ..types.scalars import Seed
 from .types import BasisAxis
 
@@ -20,6 +22,15 @@ class LocalBasisConfig(BaseModel):
     def ndof(self) -> int:
         return self.n_orb * self.n_spin
 
+    def embed_spin(self, spin: NDArray[np.complex128]) -> NDArray[np.complex128]:
+        """Lift an (n_spin x n_spin) operator to the local (ndof x ndof) basis, honoring `order`."""
+        if spin.shape != (self.n_spin, self.n_spin):
+            raise ValueError(f"spin operator must be {self.n_spin}x{self.n_spin}, got {spin.shape}")
+        eye_orb = np.eye(self.n_orb, dtype=np.complex128)
+        if self.order == ("orb", "spin"):
+            return np.kron(eye_orb, spin).astype(np.complex128, copy=False)
+        return np.kron(spin, eye_orb).astype(np.complex128, copy=False)
+
     @model_validator(mode="after")
     def _check_order(self):
         if set(self.order) != {"orb", "spin"}:
@@ -73,12 +84,26 @@ class FieldConfig(BaseModel):
     ab_flux: ABFluxConfig | None = None
     zeeman: ZeemanConfig | None = None
 
-class PhysicsConfigBase(BaseModel):
+class DisorderConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    # onsite: +delta_i * identity on every site; bond: t_b -> (1 + delta_b) * t_b
+    kind: Literal["onsite", "bond"] = "onsite"
+    strength: float = Field(0.0, ge=0.0)                       # W
+    distribution: Literal["uniform", "gaussian"] = "uniform"   # uniform in [-W/2, W/2]; gaussian with std W
+    bond_kinds: tuple[str, ...] | None = None                  # bond disorder only; None = all hopping kinds
+
+    def sample(self, seed: int, n: int) -> NDArray[np.float64]:
+        """n disorder values of the realization `seed`."""
+        rng = np.random.default_rng(seed)
+        if self.distribution == "gaussian":
+            return rng.normal(0.0, self.strength, size=n)
+        return rng.uniform(-0.5 * self.strength, 0.5 * self.strength, size=n)
+
+
+class PhysicsConfigBase(CachedHashModel):
     model_config = ConfigDict(frozen=True)
     seed: Seed = 0
-
-    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
-        return stable_hash_from_dict(self.model_dump(mode="json", exclude=None), length)
  
 
 class TBPhysicsConfigBase(PhysicsConfigBase):
@@ -102,4 +127,16 @@ class TBPhysicsConfigBase(PhysicsConfigBase):
 
 class TBPhysics(TBPhysicsConfigBase):
     model: Literal["tb"]
-    fields: FieldConfig | None = None
\ No newline at end of file
+    fields: FieldConfig | None = None
+    disorder: DisorderConfig | None = None  # realization chosen by `seed`
+
+    hash_omit_if_none: ClassVar[tuple[str, ...]] = ("disorder",)
+
+    @model_validator(mode="after")
+    def _check_disorder(self):
+        d = self.disorder
+        if d is not None and d.bond_kinds is not None:
+            bad = set(d.bond_kinds) - set(self.params.hopping)
+            if bad:
+                raise ValueError(f"disorder.bond_kinds not in hopping: {sorted(bad)}")
+        return self
\ No newline at end of file
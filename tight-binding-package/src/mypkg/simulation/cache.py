@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 8 * 1024**3
+
+ArrayDict = dict[str, NDArray]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class ArtifactCache:
+    """
+    Content-addressed on-disk cache shared across runs.
+
+    Entries live at  root/<stage>/<key>.npz  where key hashes only the inputs
+    that stage depends on, e.g.
+      geometry     <- geometry hash
+      hamiltonian  <- geometry + physics hashes
+      spectra      <- geometry + physics + solver hashes (+ observable name)
+    so changing a solver field keeps geometry and assembly hits.
+
+    The total size is bounded by `max_bytes`; least recently used entries
+    (by mtime, refreshed on every hit) are evicted first.
+
+    With `refresh=True` (--force_rerun) every lookup misses, so each stage is
+    recomputed and its entry overwritten.
+    """
+
+    def __init__(self, root: Path, *, max_bytes: int = DEFAULT_CACHE_BYTES, refresh: bool = False) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.stats = CacheStats()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        return hashlib.sha256("/".join(parts).encode("utf-8")).hexdigest()[:32]
+
+    def path(self, stage: str, *parts: str) -> Path:
+        return self.root / stage / f"{self.key(*parts)}.npz"
+
+    def get_arrays(self, stage: str, *parts: str) -> ArrayDict | None:
+        path = self.path(stage, *parts)
+        if self.refresh:
+            self.stats.misses += 1
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+        except (FileNotFoundError, OSError, ValueError):
+            self.stats.misses += 1
+            return None
+        os.utime(path)  # LRU touch
+        self.stats.hits += 1
+        log.info(f"Cache hit: {stage} ({path.name})")
+        return arrays
+
+    def put_arrays(self, stage: str, parts: tuple[str, ...], arrays: ArrayDict) -> Path:
+        path = self.path(stage, *parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, allow_pickle=False, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.stats.writes += 1
+        self.evict()
+        return path
+
+    def get_or_compute_arrays(
+        self, stage: str, parts: tuple[str, ...], compute: Callable[[], ArrayDict]
+    ) -> ArrayDict:
+        arrays = self.get_arrays(stage, *parts)
+        if arrays is None:
+            arrays = compute()
+            self.put_arrays(stage, parts, arrays)
+        return arrays
+
+    def get_or_compute_sparse(
+        self, stage: str, parts: tuple[str, ...], compute: Callable[[], sp.spmatrix]
+    ) -> sp.csr_matrix:
+        import scipy.sparse as sp
+
+        def _compute() -> ArrayDict:
+            mat = sp.csr_matrix(compute())
+            return {
+                "data": mat.data,
+                "indices": mat.indices,
+                "indptr": mat.indptr,
+                "shape": np.asarray(mat.shape, dtype=np.int64),
+            }
+
+        a = self.get_or_compute_arrays(stage, parts, _compute)
+        return sp.csr_matrix((a["data"], a["indices"], a["indptr"]), shape=tuple(a["shape"]))
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*/*.npz"))
+
+    def evict(self) -> None:
+        entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.root.glob("*/*.npz")]
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, p in sorted(entries):
+            p.unlink(missing_ok=True)
+            self.stats.evictions += 1
+            total -= size
+            log.info(f"Cache evict: {p.parent.name}/{p.name}")
+            if total <= self.max_bytes:
+                break
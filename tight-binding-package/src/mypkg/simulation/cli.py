@@ -9,6 +9,7 @@ class SimArgs:
     config_file: str
     allow_dirty: bool
     force_rerun: bool
+    workers: int = 1
 
 
 def build_simulation_parser() -> argparse.ArgumentParser:
@@ -16,6 +17,7 @@ def build_simulation_parser() -> argparse.ArgumentParser:
     p.add_argument("--config", required=True, dest="config_file")
     p.add_argument("--allow_dirty", action="store_true")
     p.add_argument("--force_rerun", action="store_true")
+    p.add_argument("--workers", type=int, default=1, help="processes for energy sweeps")
     return p
 
 
@@ -25,4 +27,32 @@ def parse_simulation_args() -> SimArgs:
         config_file=ns.config_file,
         allow_dirty=ns.allow_dirty,
         force_rerun=ns.force_rerun,
-    )
\ No newline at end of file
+        workers=ns.workers,
+    )
+
+
+@dataclass(frozen=True)
+class SweepArgs:
+    sweep_file: str
+    allow_dirty: bool
+    force_rerun: bool
+    workers: int = 1
+
+
+def build_sweep_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser()
+    p.add_argument("--sweep", required=True, dest="sweep_file")
+    p.add_argument("--allow_dirty", action="store_true")
+    p.add_argument("--force_rerun", action="store_true")
+    p.add_argument("--workers", type=int, default=1, help="processes for geometry groups")
+    return p
+
+
+def parse_sweep_args() -> SweepArgs:
+    ns = build_sweep_parser().parse_args()
+    return SweepArgs(
+        sweep_file=ns.sweep_file,
+        allow_dirty=ns.allow_dirty,
+        force_rerun=ns.force_rerun,
+        workers=ns.workers,
+    )
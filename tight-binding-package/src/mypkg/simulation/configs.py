@@ -4,7 +4,10 @@ from pydantic import BaseModel, ConfigDict, model_validator
 from typing import Any
 
 from ..geometry.config_union import GeometryConfig
+from ..geometry.configs import DefectsConfig
+from ..geometry.ordering import SiteOrdering
 from ..geometry.types import FreezableGeometryLike  # 追加した Protocol
+from ..geometry.registry import TableStore, apply_site_ordering, get_geometry
 from ..physics.configs import TBPhysics
 from ..solver.configs import SolverConfig
 
@@ -16,24 +19,37 @@ class SimulationConfig(BaseModel):
     physics: TBPhysics
     solver: SolverConfig
 
-    defects: Any | None = None
+    defects: DefectsConfig | None = None
+    site_ordering: SiteOrdering = "natural"
     perturbations: Any | None = None
     
-    def build_geometry(self) -> FreezableGeometryLike:
-        geo = self.geometry.build(removed_sites=None)  # ✅ build は config が持つ
-        geo.freeze()                                   # ✅ Protocol にあるのでIDEもOK
-        return geo
+    def build_geometry(self, *, freeze: bool = True, store: TableStore | None = None) -> FreezableGeometryLike:
+        """
+        freeze=True: shared frozen geometry from the process-wide registry
+        (index maps and bond arrays precomputed, optionally via `store`).
+        freeze=False: a fresh, private, unfrozen geometry.
+        `defects` and `site_ordering` are applied in both cases.
+        """
+        if not freeze:
+            geo = self.geometry.build(removed_sites=None)  # ✅ build は config が持つ
+            if self.defects is not None:
+                self.defects.apply(geo)
+            if self.site_ordering != "natural":
+                apply_site_ordering(geo, self.site_ordering)
+            return geo
+        return get_geometry(self.geometry, None, defects=self.defects, ordering=self.site_ordering, store=store)
 
     @model_validator(mode="after")
     def _cross_check(self):
-        geo = self.geometry.build(removed_sites=None)
-
-        hop_keys = set(self.physics.params.hopping.keys())
-        provided = set(getattr(geo, "provided_bond_keys", set()))
-        bad = hop_keys - provided
+        hopping = self.physics.params.hopping
+        provided = set(self.geometry.provided_bond_keys)
+        bad = set(hopping) - provided
+        if "nn1" in provided:
+            # TBParams fills nn1x/nn1y from nn1 for square lattices; those aliases are not errors here.
+            bad = {k for k in bad if not (k in ("nn1x", "nn1y") and hopping[k] == hopping["nn1"])}
         if bad:
             raise ValueError(
-                f"Unsupported hopping keys for {type(geo).__name__}: {sorted(bad)}"
+                f"Unsupported hopping keys for {self.geometry.geometry_class().__name__}: {sorted(bad)}"
             )
 
         fields = getattr(self.physics, "fields", None)
@@ -1,27 +1,183 @@
+from __future__ import annotations
+
 import subprocess
+import zlib
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
 
-def repo_state() -> tuple[bool | None, str]:
+
+@dataclass(frozen=True)
+class GitSnapshot:
+    """
+    Provenance of the working tree, taken once per process (or per sweep and
+    handed to workers) instead of re-querying git for every run. The diffs
+    are only produced when first read (for dirty runs), then kept.
+    """
+    ok: bool
+    reason: str
+    commit: str | None = None
+    describe: str | None = None
+    dirty: bool | None = None
+    cwd: Path | None = None
+
+    @cached_property
+    def diff(self) -> str | None:
+        return _git_or_none("diff", cwd=self.cwd)
+
+    @cached_property
+    def diff_cached(self) -> str | None:
+        return _git_or_none("diff", "--cached", cwd=self.cwd)
+
+    def load_diffs(self) -> GitSnapshot:
+        """Read both diffs now, e.g. before the snapshot is shipped to workers."""
+        if self.ok and self.dirty:
+            _ = self.diff, self.diff_cached
+        return self
+
+
+def _git(*args: str, cwd: Path | None = None) -> str:
+    return subprocess.check_output(["git", *args], text=True, cwd=cwd, stderr=subprocess.DEVNULL)
+
+
+def _git_or_none(*args: str, cwd: Path | None = None) -> str | None:
+    try:
+        return _git(*args, cwd=cwd)
+    except Exception:
+        return None
+
+
+def _find_git_dirs(cwd: Path | None) -> tuple[Path, Path] | None:
+    """(git dir, common dir) of the repository containing `cwd`; linked worktrees share the latter."""
+    start = (cwd or Path.cwd()).resolve()
+    for d in (start, *start.parents):
+        dot_git = d / ".git"
+        if dot_git.is_dir():
+            git_dir = dot_git
+        elif dot_git.is_file():
+            text = dot_git.read_text(encoding="utf-8").strip()
+            if not text.startswith("gitdir:"):
+                return None
+            git_dir = (d / text[len("gitdir:"):].strip()).resolve()
+        else:
+            continue
+        common = git_dir / "commondir"
+        if common.is_file():
+            return git_dir, (git_dir / common.read_text(encoding="utf-8").strip()).resolve()
+        return git_dir, git_dir
+    return None
+
+
+def _packed_refs(common_dir: Path) -> dict[str, str]:
+    """ref -> commit from packed-refs; annotated tags map to the peeled commit."""
+    refs: dict[str, str] = {}
+    path = common_dir / "packed-refs"
+    if not path.is_file():
+        return refs
+    last = None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("#") or not line:
+            continue
+        if line.startswith("^") and last is not None:
+            refs[last] = line[1:].strip()
+            continue
+        oid, _, name = line.partition(" ")
+        refs[name] = oid
+        last = name
+    return refs
+
+
+def _peel_loose_tag(common_dir: Path, oid: str) -> str:
+    """Commit an annotated tag object points at, if the object is loose (else `oid`)."""
+    try:
+        raw = zlib.decompress((common_dir / "objects" / oid[:2] / oid[2:]).read_bytes())
+    except (OSError, zlib.error):
+        return oid
+    header, _, body = raw.partition(b"\0")
+    if header.startswith(b"tag ") and body.startswith(b"object "):
+        return body[len(b"object "):].split(b"\n", 1)[0].decode()
+    return oid
+
+
+def _read_head(git_dir: Path, common_dir: Path) -> tuple[str | None, dict[str, str]]:
+    """HEAD commit (None on an unborn branch) and the packed refs, straight from the git dir."""
+    packed = _packed_refs(common_dir)
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    if not head.startswith("ref:"):
+        return head, packed
+    ref = head[len("ref:"):].strip()
+    loose = common_dir / ref
+    if loose.is_file():
+        return loose.read_text(encoding="utf-8").strip(), packed
+    return packed.get(ref), packed
+
+
+def _tag_at(common_dir: Path, commit: str, packed: dict[str, str]) -> str | None:
+    """Name of a tag on `commit` (loose tags win, then packed; alphabetical)."""
+    tags_dir = common_dir / "refs" / "tags"
+    if tags_dir.is_dir():
+        for path in sorted(p for p in tags_dir.rglob("*") if p.is_file()):
+            if _peel_loose_tag(common_dir, path.read_text(encoding="utf-8").strip()) == commit:
+                return path.relative_to(tags_dir).as_posix()
+    for name, oid in sorted(packed.items()):
+        if name.startswith("refs/tags/") and oid == commit:
+            return name[len("refs/tags/"):]
+    return None
+
+
+def take_snapshot(cwd: Path | None = None) -> GitSnapshot:
+    """
+    HEAD and tags are read from the git dir; the dirty flag costs the one
+    `git status --porcelain` call. `describe` is the tag on HEAD (with
+    "-dirty" appended like `git describe --tags --dirty`), None when HEAD is
+    untagged. Diffs are deferred to first use.
+    """
     try:
-        out = subprocess.check_output(["git", "status", "--porcelain"], text=True)
-        return bool(out.strip()), "ok"
+        status = _git("status", "--porcelain", cwd=cwd)
     except Exception as e:
-        return None, f"git unavailable: {e}"
+        return GitSnapshot(ok=False, reason=f"git unavailable: {e}")
+    dirty = bool(status.strip())
+
+    commit = describe = None
+    dirs = _find_git_dirs(cwd)
+    try:
+        if dirs is None:
+            raise OSError("no .git found")
+        commit, packed = _read_head(*dirs)
+        tag = _tag_at(dirs[1], commit, packed) if commit else None
+        describe = None if tag is None else tag + ("-dirty" if dirty else "")
+    except (OSError, UnicodeDecodeError):
+        # unusual layouts (e.g. reftable): fall back to git itself
+        commit = (_git_or_none("rev-parse", "HEAD", cwd=cwd) or "").strip() or None
+
+    return GitSnapshot(ok=True, reason="ok", commit=commit, describe=describe, dirty=dirty, cwd=cwd)
+
+
+_SNAPSHOT: GitSnapshot | None = None
+
+
+def provenance_snapshot(*, refresh: bool = False) -> GitSnapshot:
+    global _SNAPSHOT
+    if _SNAPSHOT is None or refresh:
+        _SNAPSHOT = take_snapshot()
+    return _SNAPSHOT
+
+
+def install_snapshot(snapshot: GitSnapshot) -> None:
+    """Use a snapshot taken elsewhere (e.g. by the parent of a worker pool)."""
+    global _SNAPSHOT
+    _SNAPSHOT = snapshot
+
+
+def repo_state() -> tuple[bool | None, str]:
+    snap = provenance_snapshot()
+    return snap.dirty, snap.reason
     
 def git_commit() -> str | None:
-    try:
-        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
-    except Exception:
-        return None
+    return provenance_snapshot().commit
     
 def git_describe() -> str | None:
-    try:
-        return subprocess.check_output(
-            ["git", "describe", "--tags", "--dirty"],
-            text=True,
-            stderr=subprocess.DEVNULL,  # optional: silence Git’s message
-        ).strip()
-    except Exception:
-        return None
+    return provenance_snapshot().describe
     
 def ensure_git_clean(allow_dirty: bool) -> None:
     # Let the simulation run when either git is clean or --allow_dirty == True
@@ -29,4 +185,4 @@ def ensure_git_clean(allow_dirty: bool) -> None:
     if dirty is None and not allow_dirty:
         raise SystemExit(f"Cannot determine git status ({reason}). Use --allow-dirty to proceed.")
     if dirty and not allow_dirty:
-        raise SystemExit("Repo has uncommitted changes. Commit/stash or rerun with --allow-dirty.")
\ No newline at end of file
+        raise SystemExit("Repo has uncommitted changes. Commit/stash or rerun with --allow-dirty.")
@@ -4,14 +4,15 @@ import sys
 import yaml
 from pathlib import Path
 import platform
-import subprocess
 import importlib.metadata as md
 from importlib.metadata import PackageNotFoundError
+from functools import lru_cache
 from typing import Any
 
-from .git import git_commit, git_describe, repo_state
+from .git import provenance_snapshot
 
 
+@lru_cache(maxsize=None)
 def _pkg_version(name: str) -> str:
     try:
         return md.version(name)
@@ -20,12 +21,12 @@ def _pkg_version(name: str) -> str:
 
 
 def collect_metadata() -> dict[str, Any]:
-    dirty, _details = repo_state()
+    snap = provenance_snapshot()
 
     return {
-        "git_commit": git_commit() or "unknown",
-        "git_describe": git_describe() or "unknown",
-        "git_dirty": bool(dirty),
+        "git_commit": snap.commit or "unknown",
+        "git_describe": snap.describe or "unknown",
+        "git_dirty": bool(snap.dirty),
         "python_version": sys.version,
         "platform": platform.platform(),
         "packages": {
@@ -48,34 +49,16 @@ def save_metadata(p: Path, data: dict[str, Any]) -> None:
 
 
 def current_commit() -> str | None:
-    try:
-        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
-    except Exception:
-        return None
-
-import subprocess
-from pathlib import Path
+    return provenance_snapshot().commit
 
-def git_diff_text() -> str | None:
-    """Return `git diff` output, or None if git is unavailable."""
-    try:
-        return subprocess.check_output(["git", "diff"], text=True)
-    except Exception:
-        return None
-
-def git_diff_cached_text() -> str | None:
-    """Return staged diff (`git diff --cached`)."""
-    try:
-        return subprocess.check_output(["git", "diff", "--cached"], text=True)
-    except Exception:
-        return None
 
 def save_git_diff(run_dir: Path) -> None:
-    """Save working tree and staged diffs into run_dir."""
-    wd = git_diff_text()
+    """Save working tree and staged diffs (from the process snapshot) into run_dir."""
+    snap = provenance_snapshot()
+    wd = snap.diff
     if wd:
         (run_dir / "git_diff.patch").write_text(wd, encoding="utf-8")
 
-    st = git_diff_cached_text()
+    st = snap.diff_cached
     if st:
         (run_dir / "git_diff_cached.patch").write_text(st, encoding="utf-8")
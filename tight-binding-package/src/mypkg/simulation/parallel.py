@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import logging
+import sys
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+log = logging.getLogger(__name__)
+
+# kernel(ham, energies, ndof, eta) -> array with energies on axis 0
+SweepKernel = Callable[[sp.csr_matrix, NDArray[np.float64], int, float], NDArray[Any]]
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    name: str
+    dtype: str
+    shape: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class SharedCSR:
+    """Picklable handle to a CSR matrix whose arrays live in shared memory."""
+    shape: tuple[int, int]
+    data: SharedArraySpec
+    indices: SharedArraySpec
+    indptr: SharedArraySpec
+
+    @classmethod
+    def create(cls, mat: sp.spmatrix) -> tuple[SharedCSR, list[SharedMemory]]:
+        """Copy `mat` into new shared-memory blocks; the caller owns (and unlinks) them."""
+        mat = sp.csr_matrix(mat)
+        blocks: list[SharedMemory] = []
+        specs: list[SharedArraySpec] = []
+        for arr in (mat.data, mat.indices, mat.indptr):
+            shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            blocks.append(shm)
+            specs.append(SharedArraySpec(shm.name, arr.dtype.str, arr.shape))
+        return cls(mat.shape, *specs), blocks
+
+    def attach(self) -> tuple[sp.csr_matrix, list[SharedMemory]]:
+        """Zero-copy CSR view on the shared blocks (keep the blocks alive while in use)."""
+        blocks = [_attach(spec.name) for spec in (self.data, self.indices, self.indptr)]
+        arrays = [
+            np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+            for spec, shm in zip((self.data, self.indices, self.indptr), blocks)
+        ]
+        mat = sp.csr_matrix(tuple(arrays), shape=self.shape, copy=False)
+        return mat, blocks
+
+
+def _attach(name: str) -> SharedMemory:
+    # Pool workers share the parent's resource tracker, so re-registering the
+    # name is harmless; only the creating process unlinks.
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+# --- worker side (one attachment per process) ---
+_WORKER_STATE: dict[str, Any] = {}
+
+
+def _worker_init(handle: SharedCSR) -> None:
+    ham, blocks = handle.attach()
+    _WORKER_STATE["ham"] = ham
+    _WORKER_STATE["blocks"] = blocks
+
+
+def _run_chunk(
+    kernel: SweepKernel, k: int, energies: NDArray[np.float64], ndof: int, eta: float
+) -> tuple[int, NDArray[Any]]:
+    return k, kernel(_WORKER_STATE["ham"], energies, ndof, eta)
+
+
+class _NpyStream:
+    """
+    Writes chunk results into an .npy file as they arrive (rows in grid
+    order), so finished energies are on disk and off the heap. The file is
+    created from the first chunk's dtype/trailing shape and moved into place
+    when complete; abort() drops a partial file.
+    """
+
+    def __init__(self, path: Path, offsets: NDArray[np.intp]) -> None:
+        self.path = Path(path)
+        self.tmp = self.path.with_suffix(".npy.tmp")
+        self.offsets = offsets
+        self._out: np.memmap | None = None
+
+    def write(self, k: int, res: NDArray[Any]) -> None:
+        if self._out is None:
+            shape = (int(self.offsets[-1]),) + res.shape[1:]
+            self._out = np.lib.format.open_memmap(self.tmp, mode="w+", dtype=res.dtype, shape=shape)
+        self._out[self.offsets[k] : self.offsets[k + 1]] = res
+
+    def close(self) -> NDArray[Any]:
+        assert self._out is not None
+        self._out.flush()
+        del self._out
+        self._out = None
+        self.tmp.replace(self.path)
+        return np.load(self.path, mmap_mode="r", allow_pickle=False)
+
+    def abort(self) -> None:
+        """Close the memmap (if any) and remove the partial .tmp file."""
+        if self._out is not None:
+            del self._out
+            self._out = None
+        self.tmp.unlink(missing_ok=True)
+
+
+class ParallelEnergySweep:
+    """
+    Split an energy grid into chunks over a process pool.
+
+    The sparse Hamiltonian is placed in shared memory once; each worker maps
+    it at start-up instead of receiving a pickled copy per task. Results are
+    concatenated back in grid order, or streamed to an .npy file as chunks
+    finish. workers=1 runs in-process.
+    """
+
+    def __init__(self, workers: int = 1, *, chunks_per_worker: int = 4) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self.chunks_per_worker = chunks_per_worker
+
+    def run(
+        self,
+        kernel: SweepKernel,
+        ham: sp.spmatrix,
+        energies: NDArray[np.float64],
+        *,
+        ndof: int,
+        eta: float,
+        out: Path | None = None,
+    ) -> NDArray[Any]:
+        """
+        Kernel results over `energies`, energies on axis 0. With `out`, each
+        chunk is streamed into the .npy file at `out` as soon as it is done
+        (also in-process) and a read-only memmap of that file is returned.
+        """
+        energies = np.asarray(energies, dtype=np.float64)
+        if out is None and (self.workers == 1 or energies.size < 2):
+            return kernel(sp.csr_matrix(ham), energies, ndof, eta)
+
+        n_chunks = max(1, min(energies.size, self.workers * self.chunks_per_worker))
+        chunks = np.array_split(energies, n_chunks)
+        stream = None
+        if out is not None:
+            stream = _NpyStream(out, np.concatenate([[0], np.cumsum([c.size for c in chunks])]).astype(np.intp))
+
+        if self.workers == 1:
+            mat = sp.csr_matrix(ham)
+            assert stream is not None
+            try:
+                for k, c in enumerate(chunks):
+                    stream.write(k, kernel(mat, c, ndof, eta))
+            except BaseException:
+                stream.abort()
+                raise
+            return stream.close()
+
+        log.info(f"Energy sweep: {energies.size} points in {n_chunks} chunks on {self.workers} workers")
+        handle, blocks = SharedCSR.create(ham)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_worker_init, initargs=(handle,)
+            ) as pool:
+                futures = [pool.submit(_run_chunk, kernel, k, c, ndof, eta) for k, c in enumerate(chunks)]
+                results: dict[int, NDArray[Any]] = {}
+                for fut in as_completed(futures):
+                    k, res = fut.result()
+                    if stream is not None:
+                        stream.write(k, res)
+                    else:
+                        results[k] = res
+        except BaseException:
+            if stream is not None:
+                stream.abort()
+            raise
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+        if stream is not None:
+            return stream.close()
+        return np.concatenate([results[k] for k in range(n_chunks)], axis=0)
@@ -31,6 +31,11 @@ class RunLayout:
         root = project_root.resolve()
         return cls(configs_dir=root / "configs", results_dir=root / "results")
 
+    @property
+    def cache_dir(self) -> Path:
+        """Content-addressed artifact cache shared by all runs under results_dir."""
+        return self.results_dir / "_cache"
+
     def ensure_base_dirs(self) -> None:
         self.configs_dir.mkdir(parents=True, exist_ok=True)
         self.results_dir.mkdir(parents=True, exist_ok=True)
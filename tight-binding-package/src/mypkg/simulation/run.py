@@ -2,29 +2,45 @@ from __future__ import annotations
 
 import logging
 import yaml
-import pandas as pd
+import numpy as np
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from time import perf_counter
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from ..utils.core import load_raw
 from ..geometry.types import FreezableGeometryLike, Bond
 from .configs import SimulationConfig
 from .paths import RunLayout
+from .cache import ArtifactCache
 from .metadata import collect_metadata, save_metadata, load_metadata
 from .cli import SimArgs
 from .metadata import save_git_diff
 
+# Heavy dependencies (scipy, pandas, solver/builder stacks) are imported at
+# their point of use to keep CLI start-up cheap; see benchmarks/bench_startup.py.
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+    from numpy.typing import NDArray
+    from ..builder.tb_builder import TBBuilder
+    from .parallel import SweepKernel
+
 log = logging.getLogger(__name__)
 
+ARTIFACT_SUFFIXES: tuple[str, ...] = ("npy", "csv")
+
 
 @dataclass
 class Simulation:
     args: SimArgs
     layout: RunLayout
 
+    # Sweeps: config dict given directly (instead of args.config_file) and a
+    # shared, already frozen geometry for this config.
+    raw_config: dict[str, Any] | None = None
+    shared_geometry: FreezableGeometryLike | None = None
+
     started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     t0: float = field(default_factory=perf_counter)
 
@@ -32,6 +48,7 @@ class Simulation:
     cfg: SimulationConfig = field(init=False)
 
     geo: FreezableGeometryLike = field(init=False)
+    cache: ArtifactCache = field(init=False)
     run_dir: Path = field(init=False)
 
     meta_path: Path = field(init=False)
@@ -42,14 +59,19 @@ class Simulation:
         self.layout.ensure_base_dirs()
 
         # load config
-        cfg_path = self.layout.configs_dir / self.args.config_file
-        self.raw = load_raw(cfg_path)
+        if self.raw_config is not None:
+            self.raw = self.raw_config
+        else:
+            cfg_path = self.layout.configs_dir / self.args.config_file
+            self.raw = load_raw(cfg_path)
 
         # validate + cross-check
         self.cfg = SimulationConfig.model_validate(self.raw)
 
-        # build objects
-        self.geo = self.cfg.build_geometry()
+        # build objects (geometry tables come from the shared cache when possible,
+        # unless --force_rerun asks to recompute and overwrite every stage)
+        self.cache = ArtifactCache(self.layout.cache_dir, refresh=self.args.force_rerun)
+        self.geo = self.build_geometry()
         phys = self.cfg.physics
         solv = self.cfg.solver
 
@@ -61,21 +83,197 @@ class Simulation:
         self.meta_path = self.run_dir / "metadata.yaml"
         self.meta = collect_metadata()
         self.existing_meta = load_metadata(self.meta_path)
+        if self.cfg.site_ordering != "natural":
+            from ..geometry.ordering import ordering_report
+            report = ordering_report(self.geo)
+            log.info(f"Site ordering {self.cfg.site_ordering}: {report['before']} -> {report['after']}")
+            self.meta["site_ordering"] = {"method": self.cfg.site_ordering, **report}
+
+    def build_geometry(self) -> FreezableGeometryLike:
+        if self.shared_geometry is not None:
+            return self.shared_geometry
+        return self.cfg.build_geometry(store=self.cache)
 
-    def artifact_path(self, name: str, suffix: str = "csv") -> Path:
+    def builder(self) -> TBBuilder:
+        from ..builder.tb_builder import TBBuilder
+        return TBBuilder(self.geo, self.cfg.physics)
+
+    def build_hamiltonian(self) -> sp.csr_matrix:
+        """Sparse H, cached by geometry + physics hashes (solver changes keep the hit)."""
+        return self.cache.get_or_compute_sparse(
+            "hamiltonian",
+            (self.geo.get_hash(), self.cfg.physics.get_hash()),
+            lambda: self.builder().build_hamiltonian_sparse(),
+        )
+
+    def energy_sweep(self, kernel: SweepKernel, ham: sp.spmatrix, *, out: Path | None = None) -> Any:
+        """Run `kernel` over solver.energy_grid with --workers processes (streamed to `out` if given)."""
+        from .parallel import ParallelEnergySweep
+        sweep = ParallelEnergySweep(workers=self.args.workers)
+        return sweep.run(
+            kernel,
+            ham,
+            self.cfg.solver.energy_grid,
+            ndof=self.cfg.physics.basis.ndof,
+            eta=self.cfg.solver.eta,
+            out=out,
+        )
+
+    def artifact_path(self, name: str, suffix: str = "npy") -> Path:
         return self.run_dir / f"{name}.{suffix}"
 
+    def artifact_meta_path(self, name: str) -> Path:
+        return self.run_dir / f"{name}.meta.yaml"
+
+    def save_array(self, name: str, values, *, axes: list[str] | None = None, grids: dict[str, Any] | None = None) -> Path:
+        """
+        Raw .npy (dtype/shape in the header) plus a small <name>.meta.yaml
+        sidecar with axis names and grid metadata. Written atomically.
+        """
+        arr = np.ascontiguousarray(values)
+        path = self.artifact_path(name, "npy")
+        tmp = path.with_suffix(".npy.tmp")
+        with tmp.open("wb") as f:
+            np.save(f, arr, allow_pickle=False)
+        tmp.replace(path)
+        self.save_array_meta(name, arr, axes=axes, grids=grids)
+        log.info(f"Wrote {name} -> {path}")
+        return path
+
+    def save_array_meta(
+        self, name: str, arr: NDArray, *, axes: list[str] | None = None, grids: dict[str, Any] | None = None
+    ) -> None:
+        """<name>.meta.yaml sidecar (also for arrays streamed straight to <name>.npy)."""
+        meta = {
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "axes": axes or [f"axis_{k}" for k in range(arr.ndim)],
+            "grids": grids or {},
+        }
+        self.artifact_meta_path(name).write_text(yaml.safe_dump(meta), encoding="utf-8")
+
+    def load_array(self, name: str) -> np.memmap:
+        """Read-only memory map: slicing one site/energy touches only those pages."""
+        return np.load(self.artifact_path(name, "npy"), mmap_mode="r", allow_pickle=False)
+
+    def load_array_meta(self, name: str) -> dict[str, Any]:
+        return yaml.safe_load(self.artifact_meta_path(name).read_text(encoding="utf-8"))
+
+    def energy_grid_meta(self) -> dict[str, Any]:
+        solv = self.cfg.solver
+        return {"w": {"w_min": solv.w_min, "w_max": solv.w_max, "n_w": solv.n_w}}
+
     def save_series(self, name: str, values) -> None:
+        self.save_array(name, np.asarray(values))
+
+    def save_csv(self, name: str, values) -> None:
+        import pandas as pd
         path = self.artifact_path(name, "csv")
         pd.Series(values).to_csv(path, index=False)
         log.info(f"Wrote {name} -> {path}")
 
-    def should_skip(self, name: str, suffix: str = "csv") -> bool:
-        path = self.artifact_path(name, suffix)
-        skip = path.exists() and not self.args.force_rerun
-        if skip:
-            log.info(f"Skipping: {name} already exists at {path}")
-        return skip
+    def natural_site_order(self, values: NDArray) -> NDArray:
+        """Per-site values (last axis) in the natural active order, undoing any site_ordering."""
+        from ..geometry.ordering import to_natural_order
+        return to_natural_order(np.asarray(values), getattr(self.geo, "site_permutation", None))
+
+    def save_ldos(self, name: str, ldos) -> None:
+        """LDOS array of shape (n_w, n_sites): one column per active site, natural order."""
+        self.save_array(name, self.natural_site_order(ldos), axes=["w", "site"], grids=self.energy_grid_meta())
+
+    def run_ldos(self, name: str = "ldos") -> None:
+        """
+        LDOS observable over the energy grid, diag(G) only: block-tridiagonal
+        cyclic reduction for banded geometries (chains), selected inversion
+        of the sparse H otherwise.
+        """
+        if self.should_skip(name):
+            return
+        parts = (name, self.geo.get_hash(), self.cfg.physics.get_hash(), self.cfg.solver.get_hash())
+        arrays = self.cache.get_or_compute_arrays("spectra", parts, lambda: {"ldos": self._ldos_grid()})
+        self.save_ldos(name, arrays["ldos"])
+
+    def _ldos_grid(self) -> NDArray[np.float64]:
+        builder = self.builder()
+        if builder.supports_banded():
+            from ..solver.banded import BlockTridiagonalSolver
+            return BlockTridiagonalSolver.from_builder(builder, self.cfg.solver).ldos_grid()
+        from ..solver.selected import ldos_selected_kernel
+        return self.energy_sweep(ldos_selected_kernel, self.build_hamiltonian())
+
+    def run_disorder_ensemble(self, seeds: range, name: str = "ensemble") -> None:
+        """Disorder-averaged DOS/LDOS (mean and variance) over `seeds`."""
+        if self.should_skip(f"{name}_dos_mean"):
+            return
+        from ..solver.ensemble import DisorderEnsemble
+        res = DisorderEnsemble(self.builder(), self.cfg.solver, seeds).run()
+        grids = self.energy_grid_meta()
+        self.save_array(f"{name}_dos_mean", res.dos.mean, axes=["w"], grids=grids)
+        if res.dos.variance is not None:
+            self.save_array(f"{name}_dos_var", res.dos.variance, axes=["w"], grids=grids)
+        if res.ldos is not None and res.ldos.mean is not None:
+            self.save_array(f"{name}_ldos_mean", self.natural_site_order(res.ldos.mean), axes=["w", "site"], grids=grids)
+            if res.ldos.variance is not None:
+                self.save_array(f"{name}_ldos_var", self.natural_site_order(res.ldos.variance), axes=["w", "site"], grids=grids)
+        self.meta["ensemble"] = {"seeds": [seeds.start, seeds.stop, seeds.step], "n": res.dos.count}
+
+    def run_flux_sweep(self, phis: NDArray[np.float64], name: str = "flux") -> None:
+        """DOS over AB flux values phi/phi0 (rings): one symbolic analysis, phases rewritten in place."""
+        if self.should_skip(f"{name}_dos"):
+            return
+        from ..solver.flux import FluxSweep
+        res = FluxSweep(self.builder(), self.cfg.solver).run(phis)
+        grids = {"phi": res["phi"].tolist(), **self.energy_grid_meta()}
+        self.save_array(f"{name}_dos", res["dos"], axes=["phi", "w"], grids=grids)
+        self.meta["flux_sweep"] = {"n_phi": int(res["phi"].size)}
+
+    def run_field_sweep(self, points: list[dict[str, float]], name: str = "field") -> None:
+        """
+        DOS over Zeeman/chemical-potential values, e.g. [{"zeeman_z": b, "mu": m}, ...],
+        from one affine Hamiltonian; spin-decoupled B_z and all mu values share eigensystems.
+        """
+        if self.should_skip(f"{name}_dos"):
+            return
+        from ..solver.fields import FieldSweep
+        sweep = FieldSweep.from_builder(self.builder(), self.cfg.solver)
+        res = sweep.run(points)
+        grids = {"point": points, **self.energy_grid_meta()}
+        self.save_array(f"{name}_dos", res["dos"], axes=["point", "w"], grids=grids)
+        self.meta["field_sweep"] = {"n_points": len(points), "n_diagonalizations": sweep.n_diagonalizations}
+
+    def run_transport(self, name: str = "transport") -> None:
+        """
+        Landauer transmission T(w) between leads on the two x edges, computed
+        over --workers processes and streamed to <name>_transmission.npy
+        chunk by chunk; the conductance at solver.equilibrium goes to metadata.
+        """
+        if self.should_skip(f"{name}_transmission"):
+            return
+        from ..solver.transport import LandauerTransport, conductance
+        ham = self.build_hamiltonian()
+        transport = LandauerTransport.from_builder(self.builder(), self.cfg.solver, ham=ham)
+        t_name = f"{name}_transmission"
+        trans = self.energy_sweep(transport.kernel(), ham, out=self.artifact_path(t_name))
+        self.save_array_meta(t_name, trans, axes=["w"], grids=self.energy_grid_meta())
+        log.info(f"Wrote {t_name} -> {self.artifact_path(t_name)}")
+
+        eq = self.cfg.solver.equilibrium
+        self.meta["transport"] = {
+            "conductance_e2_over_h": conductance(self.cfg.solver.energy_grid, trans, eq),
+            "temperature": eq.temperature if eq is not None else 0.0,
+            "mu": eq.mu if eq is not None else 0.0,
+            "n_slices": len(transport.site_slices),
+        }
+
+    def should_skip(self, name: str, suffix: str | None = None) -> bool:
+        """suffix=None: any known artifact format (.npy or legacy .csv) counts."""
+        suffixes = [suffix] if suffix is not None else list(ARTIFACT_SUFFIXES)
+        for suf in suffixes:
+            path = self.artifact_path(name, suf)
+            if path.exists() and not self.args.force_rerun:
+                log.info(f"Skipping: {name} already exists at {path}")
+                return True
+        return False
 
     def guard_commits(self) -> None:
         stored = self.existing_meta.get("git_commit")
@@ -96,6 +294,7 @@ class Simulation:
             "geo_hash": self.geo.get_hash() if hasattr(self.geo, "get_hash") else None,
             "phys_hash": self.cfg.physics.get_hash(),
             "solver_hash": self.cfg.solver.get_hash(),
+            "cache": self.cache.stats.as_dict(),
         }
         save_metadata(self.meta_path, self.meta)
 
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import copy
+import itertools
+import logging
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Literal
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, field_validator
+
+from ..utils.core import load_raw, stable_hash_from_dict
+from .cli import SimArgs, SweepArgs
+from .configs import SimulationConfig
+from .git import GitSnapshot, install_snapshot, provenance_snapshot
+from .paths import RunLayout
+
+log = logging.getLogger(__name__)
+
+
+def axis_values(spec: Any) -> list[Any]:
+    """
+    One sweep axis: a plain list, {"range": [start, stop(, step)]} (ints,
+    e.g. seeds) or {"linspace": [start, stop, num]}.
+    """
+    if isinstance(spec, list):
+        return spec
+    if isinstance(spec, dict) and len(spec) == 1:
+        (kind, args), = spec.items()
+        if kind == "range":
+            return list(range(*args))
+        if kind == "linspace":
+            start, stop, num = args
+            return [float(v) for v in np.linspace(start, stop, int(num))]
+    raise ValueError(f"Bad sweep axis {spec!r}; use a list, {{range: [...]}} or {{linspace: [a, b, n]}}")
+
+
+def set_dotted(raw: dict[str, Any], path: str, value: Any) -> None:
+    """raw["a"]["b"]["c"] = value for path "a.b.c", creating missing/None sections."""
+    *parents, leaf = path.split(".")
+    node = raw
+    for key in parents:
+        if not isinstance(node.get(key), dict):
+            node[key] = {}
+        node = node[key]
+    node[leaf] = value
+
+
+class SweepSpec(BaseModel):
+    """
+    YAML sweep spec, e.g.
+
+        base: base_square_lattice.yaml        # relative to configs_dir
+        mode: product                         # or zip
+        task: run_ldos                        # Simulation method per run
+        axes:
+          solver.equilibrium.mu: {linspace: [-0.5, 0.5, 11]}
+          physics.seed: {range: [0, 8]}
+    """
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    base: str
+    mode: Literal["product", "zip"] = "product"
+    task: str = "run_ldos"
+    axes: dict[str, list[Any]]
+
+    @field_validator("axes", mode="before")
+    @classmethod
+    def _expand_axes(cls, v: Any) -> dict[str, list[Any]]:
+        if not isinstance(v, dict) or not v:
+            raise ValueError("axes must be a non-empty mapping of dotted paths to values")
+        return {path: axis_values(spec) for path, spec in v.items()}
+
+    def get_hash(self, length: int = 12) -> str:
+        return stable_hash_from_dict(self.model_dump(mode="json"), length)
+
+    def combinations(self) -> list[dict[str, Any]]:
+        paths = list(self.axes)
+        columns = [self.axes[p] for p in paths]
+        rows: Iterable[tuple[Any, ...]]
+        if self.mode == "zip":
+            if len({len(c) for c in columns}) != 1:
+                raise ValueError("zip sweep needs axes of equal length")
+            rows = zip(*columns)
+        else:
+            rows = itertools.product(*columns)
+        return [dict(zip(paths, row)) for row in rows]
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    values: dict[str, Any]
+    raw: dict[str, Any]
+    geo_hash: str
+    phys_hash: str
+    solver_hash: str
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return self.geo_hash, self.phys_hash, self.solver_hash
+
+
+def expand_sweep(spec: SweepSpec, base_raw: dict[str, Any]) -> list[SweepPoint]:
+    """Validate every combination; drop duplicates by (geo, phys, solver) hash."""
+    points: dict[tuple[str, str, str], SweepPoint] = {}
+    for values in spec.combinations():
+        raw = copy.deepcopy(base_raw)
+        for path, value in values.items():
+            set_dotted(raw, path, value)
+        cfg = SimulationConfig.model_validate(raw)
+        point = SweepPoint(
+            values=values,
+            raw=raw,
+            geo_hash=cfg.build_geometry(freeze=False).get_hash(),
+            phys_hash=cfg.physics.get_hash(),
+            solver_hash=cfg.solver.get_hash(),
+        )
+        if point.key in points:
+            log.info(f"Sweep: dropping duplicate point {values}")
+            continue
+        points[point.key] = point
+    return list(points.values())
+
+
+def _run_group(
+    layout: RunLayout, args: SimArgs, task: str, points: list[SweepPoint], snapshot: GitSnapshot
+) -> list[dict[str, Any]]:
+    """Build/freeze the shared geometry once, then run every point of the group."""
+    from .run import Simulation
+
+    install_snapshot(snapshot)  # provenance comes from the parent, no git calls here
+
+    rows: list[dict[str, Any]] = []
+    geo = None
+    for point in points:
+        t0 = perf_counter()
+        row: dict[str, Any] = {"geo_hash": point.geo_hash, "phys_hash": point.phys_hash,
+                               "solver_hash": point.solver_hash, **point.values}
+        try:
+            sim = Simulation(args, layout, raw_config=point.raw, shared_geometry=geo)
+            geo = sim.geo
+            getattr(sim, task)()
+            sim.save_config()
+            sim.save_metadata()
+            row.update(run_dir=str(sim.run_dir), status="ok")
+        except Exception as e:  # keep the rest of the group going
+            log.exception(f"Sweep point failed: {point.values}")
+            row.update(run_dir=None, status=f"error: {e}")
+        row["duration_sec"] = perf_counter() - t0
+        rows.append(row)
+    return rows
+
+
+class SweepEngine:
+    """
+    Expand a SweepSpec into SimulationConfigs, deduplicate, group by
+    geometry hash (each geometry built and frozen once per group) and run
+    the groups on a local process pool. Writes one summary index per sweep.
+    """
+
+    def __init__(self, layout: RunLayout, sweep_args: SweepArgs) -> None:
+        self.layout = layout
+        self.sweep_args = sweep_args
+        self.spec = SweepSpec.model_validate(load_raw(layout.configs_dir / sweep_args.sweep_file))
+        self.base_raw = load_raw(layout.configs_dir / self.spec.base)
+        self.points = expand_sweep(self.spec, self.base_raw)
+
+    def groups(self) -> list[list[SweepPoint]]:
+        by_geo: dict[str, list[SweepPoint]] = {}
+        for p in self.points:
+            by_geo.setdefault(p.geo_hash, []).append(p)
+        return list(by_geo.values())
+
+    @property
+    def summary_path(self) -> Path:
+        return self.layout.results_dir / "sweeps" / f"sweep_{self.spec.get_hash()}.csv"
+
+    def run(self) -> Path:
+        import pandas as pd
+
+        self.layout.ensure_base_dirs()
+        groups = self.groups()
+        # one process per group; runs inside a group stay serial
+        sim_args = SimArgs(
+            config_file=self.sweep_args.sweep_file,
+            allow_dirty=self.sweep_args.allow_dirty,
+            force_rerun=self.sweep_args.force_rerun,
+            workers=1,
+        )
+        log.info(f"Sweep: {len(self.points)} unique runs in {len(groups)} geometry groups")
+        snapshot = provenance_snapshot().load_diffs()  # workers must not call git for diffs
+
+        rows: list[dict[str, Any]] = []
+        if self.sweep_args.workers == 1 or len(groups) == 1:
+            for g in groups:
+                rows += _run_group(self.layout, sim_args, self.spec.task, g, snapshot)
+        else:
+            with ProcessPoolExecutor(max_workers=self.sweep_args.workers) as pool:
+                futures = [pool.submit(_run_group, self.layout, sim_args, self.spec.task, g, snapshot)
+                           for g in groups]
+                for fut in futures:
+                    rows += fut.result()
+
+        path = self.summary_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(rows).to_csv(path, index=False)
+        log.info(f"Wrote sweep summary -> {path}")
+        return path
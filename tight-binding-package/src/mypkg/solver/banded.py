@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .configs import SolverConfig
+from .green import spectral_weight
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import BlockTridiagonalHamiltonian, TBBuilder
+
+log = logging.getLogger(__name__)
+
+# Entries of G columns below this are dropped: they cannot matter next to
+# O(1/eta) diagonals, and letting them underflow into subnormals makes every
+# later operation on them ~100x slower.
+_FLUSH_BELOW = 1e-250
+
+BlockColumns = dict[int, tuple[NDArray[np.complex128], NDArray[np.complex128]]]
+
+
+def _mm(a: NDArray[np.complex128], b: NDArray[np.complex128]) -> NDArray[np.complex128]:
+    """Batched a @ b. For tiny blocks an unrolled sum beats matmul's per-matrix overhead."""
+    m = a.shape[-1]
+    if m > 3:
+        return a @ b
+    out = a[..., :, 0, None] * b[..., None, 0, :]
+    for k in range(1, m):
+        out += a[..., :, k, None] * b[..., None, k, :]
+    return out
+
+
+def _inv(a: NDArray[np.complex128]) -> NDArray[np.complex128]:
+    """Batched inverse with closed forms for 1x1 and 2x2 blocks."""
+    m = a.shape[-1]
+    if m == 1:
+        return 1.0 / a
+    if m == 2:
+        det = a[..., 0, 0] * a[..., 1, 1] - a[..., 0, 1] * a[..., 1, 0]
+        out = np.empty_like(a)
+        out[..., 0, 0], out[..., 1, 1] = a[..., 1, 1], a[..., 0, 0]
+        out[..., 0, 1], out[..., 1, 0] = -a[..., 0, 1], -a[..., 1, 0]
+        out /= det[..., None, None]
+        return out
+    return np.linalg.inv(a).astype(np.complex128, copy=False)
+
+
+def _flush(x: NDArray[np.complex128]) -> NDArray[np.complex128]:
+    parts = x.view(np.float64)
+    parts[np.abs(parts) < _FLUSH_BELOW] = 0.0
+    return x
+
+
+def _interleave(even: NDArray[np.complex128], odd: NDArray[np.complex128]) -> NDArray[np.complex128]:
+    out = np.empty((even.shape[0] + odd.shape[0],) + even.shape[1:], dtype=even.dtype)
+    out[0::2], out[1::2] = even, odd
+    return out
+
+
+def block_tridiagonal_inverse(
+    d: NDArray[np.complex128],
+    u: NDArray[np.complex128],
+    l: NDArray[np.complex128],
+    targets: tuple[int, ...] = (),
+) -> tuple[NDArray[np.complex128], NDArray[np.complex128], NDArray[np.complex128], BlockColumns]:
+    """
+    Selected blocks of A^-1 for block-tridiagonal A (d[k] = A[k, k],
+    u[k] = A[k, k+1], l[k] = A[k+1, k]) by cyclic reduction: eliminate the
+    odd blocks, recurse on the even Schur complement, back-substitute.
+    log2(n) levels, each a batched O(n * m^3) pass; nothing loops over
+    blocks in Python.
+
+    Returns (gd, gu, gl, cols) with gd[k] = G[k, k], gu[k] = G[k, k+1],
+    gl[k] = G[k+1, k], and for every block j in `targets` the full block
+    column and row, cols[j] = (G[:, j], G[j, :]), each of shape (n, m, m).
+    """
+    n = d.shape[0]
+    if n == 1:
+        g = _inv(d)
+        return g, u[:0], l[:0], {j: (g, g) for j in targets}
+
+    inv_o = _inv(d[1::2])
+    n_odd = inv_o.shape[0]
+    # odd block o = 2q+1 has left neighbour a = 2q and (for q < n_b) right neighbour b = 2q+2
+    a_oa, a_ao = l[0::2], u[0::2]
+    a_ob, a_bo = u[1::2], l[1::2]
+    n_b = a_ob.shape[0]
+
+    ao_io, io_oa = _mm(a_ao, inv_o), _mm(inv_o, a_oa)
+    bo_io, io_ob = _mm(a_bo, inv_o[:n_b]), _mm(inv_o[:n_b], a_ob)
+    d_even = d[0::2].copy()
+    d_even[:n_odd] -= _mm(ao_io, a_oa)
+    d_even[1 : n_b + 1] -= _mm(bo_io, a_ob)
+    u_even = -_mm(ao_io[:n_b], a_ob)
+    l_even = -_mm(bo_io, a_oa[:n_b])
+
+    # an odd target needs the columns of its two even neighbours one level up
+    reduced: set[int] = set()
+    for j in targets:
+        reduced.update((j // 2,) if j % 2 == 0 else ((j - 1) // 2, (j + 1) // 2))
+    reduced.discard(n_b + 1)
+    g_even, gu_even, gl_even, cols_even = block_tridiagonal_inverse(d_even, u_even, l_even, tuple(sorted(reduced)))
+
+    g_aa, g_bb = g_even[:n_odd], g_even[1 : n_b + 1]
+    g_oa = -_mm(io_oa, g_aa)
+    g_oa[:n_b] -= _mm(io_ob, gl_even)
+    g_ob = -(_mm(io_oa[:n_b], gu_even) + _mm(io_ob, g_bb))
+    g_ao = -_mm(g_aa, ao_io)
+    g_ao[:n_b] -= _mm(gu_even, bo_io)
+    g_bo = -(_mm(gl_even, ao_io[:n_b]) + _mm(g_bb, bo_io))
+    g_oo = inv_o - _mm(io_oa, g_ao)
+    g_oo[:n_b] -= _mm(io_ob, g_bo)
+
+    cols: BlockColumns = {}
+    for j in targets:
+        if j % 2 == 0:
+            c_even, r_even = cols_even[j // 2]
+        else:
+            q = (j - 1) // 2
+            c_a, r_a = cols_even[q]
+            c_even = -_mm(c_a, ao_io[q])
+            r_even = -_mm(io_oa[q], r_a)
+            if q < n_b:
+                c_b, r_b = cols_even[q + 1]
+                c_even -= _mm(c_b, bo_io[q])
+                r_even -= _mm(io_ob[q], r_b)
+        c_odd = -_mm(io_oa, c_even[:n_odd])
+        c_odd[:n_b] -= _mm(io_ob, c_even[1 : n_b + 1])
+        r_odd = -_mm(r_even[:n_odd], ao_io)
+        r_odd[:n_b] -= _mm(r_even[1 : n_b + 1], bo_io)
+        if j % 2 == 1:
+            c_odd[(j - 1) // 2] = r_odd[(j - 1) // 2] = g_oo[(j - 1) // 2]
+        cols[j] = (_flush(_interleave(c_even, c_odd)), _flush(_interleave(r_even, r_odd)))
+
+    gd = _interleave(g_even, g_oo)
+    gu, gl = np.empty_like(u), np.empty_like(l)
+    gu[0::2], gu[1::2] = g_ao, g_ob
+    gl[0::2], gl[1::2] = g_oa, g_bo
+    return gd, gu, gl, cols
+
+
+class BlockTridiagonalSolver:
+    """
+    Diagonal of G(w + i*eta) for Hamiltonians in block-tridiagonal storage
+    (chains and other banded geometries), O(n_blocks * m^3) per energy.
+
+    Entries outside the band (periodic wraps) are a low-rank correction E
+    on a few dofs P x Q; by Woodbury
+        G = G0 - G0[:, P] (1 + E G0[Q, P])^-1 E G0[Q, :],
+    where the G0 columns/rows come out of the same cyclic reduction as the
+    open-chain diagonal.
+    """
+
+    def __init__(self, ham: BlockTridiagonalHamiltonian, config: SolverConfig) -> None:
+        self.ham = ham
+        self.config = config
+        self.ndof = ham.ndof
+        self.n_sites = ham.n_sites
+
+        rows, cols, data = ham.outer
+        self.p_dofs = np.unique(rows)
+        self.q_dofs = np.unique(cols)
+        self.e_pq = np.zeros((self.p_dofs.size, self.q_dofs.size), dtype=np.complex128)
+        np.add.at(self.e_pq, (np.searchsorted(self.p_dofs, rows), np.searchsorted(self.q_dofs, cols)), -data)
+        m = ham.block_dim
+        self.targets = tuple(sorted(set((self.p_dofs // m).tolist()) | set((self.q_dofs // m).tolist())))
+        if self.p_dofs.size:
+            log.info(
+                f"BlockTridiagonalSolver: rank-{self.p_dofs.size} correction "
+                f"for out-of-band couplings (blocks {list(self.targets)})"
+            )
+
+    @classmethod
+    def from_builder(
+        cls, builder: TBBuilder, config: SolverConfig, *, seed: int | None = None
+    ) -> BlockTridiagonalSolver:
+        return cls(builder.build_hamiltonian_block_tridiagonal(seed=seed), config)
+
+    def _outer_correction(self, cols: BlockColumns) -> NDArray[np.complex128]:
+        """Diagonal of -G0[:, P] K G0[Q, :] over the padded dofs."""
+        m = self.ham.block_dim
+        g_cols = np.concatenate(
+            [cols[p // m][0][:, :, p % m].reshape(-1, 1) for p in self.p_dofs.tolist()], axis=1
+        )
+        g_rows = np.concatenate(
+            [cols[q // m][1][:, q % m, :].reshape(-1, 1) for q in self.q_dofs.tolist()], axis=1
+        )
+        k = np.linalg.solve(np.eye(self.p_dofs.size) + self.e_pq @ g_cols[self.q_dofs], self.e_pq)
+        return -((g_cols @ k) * g_rows).sum(axis=1)
+
+    def green_diagonal(self, w: float) -> NDArray[np.complex128]:
+        """G_ii(w + i*eta) for every dof."""
+        z = w + 1j * self.config.eta
+        d, u = self.ham.diag, self.ham.upper
+        a_diag = z * np.eye(d.shape[1]) - d
+        gd, _, _, cols = block_tridiagonal_inverse(a_diag, -u, -u.conj().transpose(0, 2, 1), self.targets)
+        g = np.diagonal(gd, axis1=1, axis2=2).reshape(-1)
+        if self.p_dofs.size:
+            g = g + self._outer_correction(cols)
+        return g[: self.ham.dim]
+
+    def ldos(self, w: float) -> NDArray[np.float64]:
+        """Local DOS per active site (dofs summed)."""
+        return spectral_weight(self.green_diagonal(w)).reshape(self.n_sites, self.ndof).sum(axis=1)
+
+    def dos(self, w: float) -> float:
+        return float(self.ldos(w).sum())
+
+    def ldos_grid(self) -> NDArray[np.float64]:
+        """LDOS on config.energy_grid, shape (n_w, n_sites)."""
+        return np.stack([self.ldos(w) for w in self.config.energy_grid])
+
+    def dos_grid(self) -> NDArray[np.float64]:
+        return np.array([self.dos(w) for w in self.config.energy_grid])
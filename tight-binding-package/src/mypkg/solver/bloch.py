@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .configs import SolverConfig
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import TBBuilder
+
+log = logging.getLogger(__name__)
+
+
+def k_mesh(nx: int, ny: int) -> NDArray[np.float64]:
+    """Allowed momenta of an nx x ny periodic lattice, shape (nx*ny, 2)."""
+    kx = 2.0 * np.pi * np.arange(nx) / nx
+    ky = 2.0 * np.pi * np.arange(ny) / ny
+    kxx, kyy = np.meshgrid(kx, ky, indexing="ij")
+    return np.column_stack([kxx.ravel(), kyy.ravel()])
+
+
+class BlochSolver:
+    """
+    k-space path for fully periodic, defect-free lattices: ndof x ndof H(k)
+    on a k-mesh, eigensolves batched over k. With the default mesh (the
+    lattice's own nx x ny momenta) DOS equals the real-space result.
+    """
+
+    def __init__(
+        self,
+        builder: TBBuilder,
+        config: SolverConfig,
+        *,
+        mesh: tuple[int, int] | None = None,
+        batch_size: int = 65536,
+    ) -> None:
+        if not builder.supports_bloch():
+            raise ValueError("BlochSolver requires a fully periodic geometry without removed sites")
+        self.builder = builder
+        self.config = config
+        self.batch_size = batch_size
+
+        geo_cfg = getattr(builder.geo, "config", None)
+        assert geo_cfg is not None  # supports_bloch() checked it
+        self.lattice_mesh = (geo_cfg.nx, geo_cfg.ny)
+        self.mesh = mesh or self.lattice_mesh
+        self.k = k_mesh(*self.mesh)
+        self._bands: NDArray[np.float64] | None = None
+
+    @classmethod
+    def applicable(cls, builder: TBBuilder) -> bool:
+        return builder.supports_bloch()
+
+    def bands(self) -> NDArray[np.float64]:
+        """Band energies, shape (nk, ndof)."""
+        if self._bands is None:
+            parts = [
+                np.linalg.eigvalsh(self.builder.bloch_hamiltonian(self.k[s : s + self.batch_size]))
+                for s in range(0, self.k.shape[0], self.batch_size)
+            ]
+            self._bands = np.concatenate(parts, axis=0)
+        return self._bands
+
+    def dos_grid(self) -> NDArray[np.float64]:
+        """
+        Lorentzian-broadened DOS on energy_grid, scaled to the lattice's
+        nx*ny*ndof states so it matches the real-space solvers.
+        """
+        grid = self.config.energy_grid
+        eta = self.config.eta
+        evals = self.bands().ravel()
+        out = np.zeros(grid.size, dtype=np.float64)
+        for s in range(0, evals.size, self.batch_size):
+            e = evals[s : s + self.batch_size]
+            out += ((eta / np.pi) / ((grid[:, None] - e[None, :]) ** 2 + eta**2)).sum(axis=1)
+        n_cells = self.lattice_mesh[0] * self.lattice_mesh[1]
+        return out * n_cells / self.k.shape[0]
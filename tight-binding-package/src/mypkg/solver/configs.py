@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+from typing import ClassVar, Literal
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 import numpy as np
 from numpy.typing import NDArray
 import logging
 
-from ..utils.core import DEFAULT_HASH_LENGTH, stable_hash_from_dict
+from ..utils.core import CachedHashModel
 
 log = logging.getLogger(__name__)
 
@@ -13,11 +14,21 @@ log = logging.getLogger(__name__)
 class EquilibriumConfig(BaseModel):
     model_config = ConfigDict(frozen=True)
 
-    temperature: float = Field(0.0, ge=0.0)  # energy units (k_B=1)
+    temperature: float = Field(default=0.0, ge=0.0)  # energy units (k_B=1)
     mu: float = 0.0                          # tune Fermi energy
 
 
-class SolverConfig(BaseModel):
+class KPMConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    n_moments: int = Field(default=256, ge=2)
+    n_random: int = Field(default=16, ge=1)               # random vectors for the stochastic trace
+    kernel: Literal["jackson", "lorentz"] = "jackson"
+    lorentz_lambda: float = Field(default=4.0, gt=0)
+    bound_padding: float = Field(default=0.01, gt=0, lt=1)  # keeps the rescaled spectrum inside (-1, 1)
+
+
+class SolverConfig(CachedHashModel):
     model_config = ConfigDict(frozen=True)
 
     eta: float = Field(..., gt=0)
@@ -26,6 +37,9 @@ class SolverConfig(BaseModel):
     n_w: int = Field(..., ge=2)
 
     equilibrium: EquilibriumConfig | None = None
+    kpm: KPMConfig | None = None
+
+    hash_omit_if_none: ClassVar[tuple[str, ...]] = ("kpm",)
 
     @model_validator(mode="after")
     def _check_ranges(self):
@@ -38,6 +52,3 @@ class SolverConfig(BaseModel):
     @property
     def energy_grid(self) -> NDArray[np.float64]:
         return np.linspace(self.w_min, self.w_max, self.n_w, dtype=np.float64)
-
-    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
-        return stable_hash_from_dict(self.model_dump(mode="json", exclude=None), length)
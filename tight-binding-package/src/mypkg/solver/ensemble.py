@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+from ..builder.tb_builder import bond_arrays, block_coo, site_dofs
+from .configs import SolverConfig
+from .green import spectral_weight
+from .selected import SelectedInverse, data_positions, fixed_order_pattern, sparse_lu
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import TBBuilder
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class RunningStats:
+    """Welford running mean/variance over realizations; O(1) memory in their number."""
+    count: int = 0
+    mean: NDArray[np.float64] | None = None
+    _m2: NDArray[np.float64] | None = field(default=None, repr=False)
+
+    def update(self, x: NDArray[np.float64]) -> None:
+        self.count += 1
+        if self.mean is None or self._m2 is None:
+            self.mean = np.array(x, dtype=np.float64)
+            self._m2 = np.zeros_like(self.mean)
+            return
+        d = x - self.mean
+        self.mean += d / self.count
+        self._m2 += d * (x - self.mean)
+
+    @property
+    def variance(self) -> NDArray[np.float64] | None:
+        if self._m2 is None or self.count < 2:
+            return None
+        return self._m2 / (self.count - 1)
+
+
+@dataclass
+class EnsembleResult:
+    seeds: list[int]
+    dos: RunningStats
+    ldos: RunningStats | None
+
+
+class DisorderEnsemble:
+    """
+    Disorder averages over a range of seeds with structure reuse.
+
+    Every realization has the sparsity pattern of the clean Hamiltonian
+    (plus its diagonal), so the fill-reducing ordering is computed once and
+    the matrix is stored already permuted. Per seed only the data array
+    changes: disorder values for a batch of seeds are sampled together and
+    scattered into precomputed data positions, then each energy needs a
+    numeric factorization in the fixed (NATURAL) order plus selected
+    inversion for diag(G). DOS/LDOS are streamed into running mean/variance.
+
+    Realization `seed` is identical to TBBuilder.build_hamiltonian_sparse(seed=seed).
+    """
+
+    def __init__(
+        self,
+        builder: TBBuilder,
+        config: SolverConfig,
+        seeds: Sequence[int],
+        *,
+        batch_size: int = 16,
+        ldos: bool = True,
+    ) -> None:
+        disorder = builder.phys.disorder
+        if disorder is None:
+            raise ValueError("DisorderEnsemble requires physics.disorder")
+        self.builder = builder
+        self.disorder = disorder
+        self.config = config
+        self.seeds = [int(s) for s in seeds]
+        self.batch_size = batch_size
+        self.with_ldos = ldos
+        self.ndof = builder.ndof
+        self.dim = builder.dim
+        self._prepare()
+
+    def _prepare(self) -> None:
+        n = self.dim
+        clean = self.builder.phys.model_copy(update={"disorder": None})
+        h0 = type(self.builder)(self.builder.geo, clean).build_hamiltonian_sparse()
+
+        # one symbolic analysis: fill-reducing order from a representative matrix
+        w0 = 0.5 * (self.config.w_min + self.config.w_max)
+        base, self.perm, inv = fixed_order_pattern(h0, w0 + 1j * self.config.eta)
+        self.indices, self.indptr = base.indices, base.indptr
+        self.h_data = base.data.copy()
+        eye = np.arange(n)
+        self.diag_pos = data_positions(base, inv[eye], inv[eye])
+
+        sites = np.arange(self.builder.geo.n_active, dtype=np.intp)
+        if self.disorder.kind == "onsite":
+            d = site_dofs(sites, self.ndof)
+            self.onsite_pos = data_positions(base, inv[d], inv[d]).reshape(sites.size, self.ndof)
+        else:
+            fwd, bwd, vals = [], [], []
+            for kind in self.builder.disordered_kinds():
+                t = self.builder.phys.params.hopping[kind].to_complex()
+                i, j = bond_arrays(self.builder.geo, kind)
+                r, c, v = block_coo(i, j, -t, self.ndof)
+                m = r.size // max(i.size, 1)
+                fwd.append(data_positions(base, inv[r], inv[c]).reshape(i.size, m))
+                bwd.append(data_positions(base, inv[c], inv[r]).reshape(i.size, m))
+                phases = self.builder.bond_phases(kind)
+                vals.append(v.reshape(i.size, m) * (1.0 if phases is None else phases[:, None]))
+            self.bond_fwd = fwd
+            self.bond_bwd = bwd
+            self.bond_vals = vals
+
+    def _realization_data(self, delta: NDArray[np.float64]) -> NDArray[np.complex128]:
+        """H data (permuted CSC order) for a batch of disorder vectors, shape (batch, nnz)."""
+        data = np.repeat(self.h_data[None, :], delta.shape[0], axis=0)
+        rows = np.arange(delta.shape[0])[:, None, None]
+        if self.disorder.kind == "onsite":
+            data[rows, self.onsite_pos[None]] += delta[:, :, None]
+            return data
+        offset = 0
+        for fwd, bwd, vals in zip(self.bond_fwd, self.bond_bwd, self.bond_vals):
+            nb = fwd.shape[0]
+            d = delta[:, offset : offset + nb, None]
+            np.add.at(data, (rows, fwd[None]), d * vals[None])
+            np.add.at(data, (rows, bwd[None]), d * vals.conj()[None])
+            offset += nb
+        return data
+
+    def _observe(self, h_data: NDArray[np.complex128]) -> NDArray[np.float64]:
+        """LDOS (n_w, n_sites) of one realization."""
+        grid = self.config.energy_grid
+        out = np.empty((grid.size, self.dim // self.ndof), dtype=np.float64)
+        g_diag = np.empty(self.dim, dtype=np.complex128)
+        for k, w in enumerate(grid):
+            a_data = -h_data
+            a_data[self.diag_pos] += w + 1j * self.config.eta
+            a = sp.csc_matrix((a_data, self.indices, self.indptr), shape=(self.dim, self.dim))
+            g_diag[self.perm] = SelectedInverse(sparse_lu(a, permc_spec="NATURAL")).diagonal()
+            out[k] = spectral_weight(g_diag).reshape(-1, self.ndof).sum(axis=1)
+        return out
+
+    def run(self) -> EnsembleResult:
+        n_values = self.builder.n_disorder_values()
+        dos = RunningStats()
+        ldos = RunningStats() if self.with_ldos else None
+        for start in range(0, len(self.seeds), self.batch_size):
+            batch = self.seeds[start : start + self.batch_size]
+            delta = np.stack([self.disorder.sample(s, n_values) for s in batch])
+            for h_data in self._realization_data(delta):
+                ld = self._observe(h_data)
+                dos.update(ld.sum(axis=1))
+                if ldos is not None:
+                    ldos.update(ld)
+            log.info(f"Disorder ensemble: {dos.count}/{len(self.seeds)} realizations")
+        return EnsembleResult(seeds=self.seeds, dos=dos, ldos=ldos)
+
+    def hamiltonian(self, seed: int) -> sp.csc_matrix:
+        """Realization `seed` in the original ordering (for checks)."""
+        data = self._realization_data(self.disorder.sample(seed, self.builder.n_disorder_values())[None])[0]
+        b = sp.csc_matrix((data, self.indices, self.indptr), shape=(self.dim, self.dim))
+        inv = np.empty(self.dim, dtype=np.intp)
+        inv[self.perm] = np.arange(self.dim)
+        return b[inv][:, inv].tocsc()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+from .configs import SolverConfig
+from .green import lorentzian
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import AffineHamiltonian, TBBuilder
+
+log = logging.getLogger(__name__)
+
+Spectrum = tuple[NDArray[np.float64], NDArray[np.float64]]
+
+
+class FieldSweep:
+    """
+    Dense DOS/LDOS over Zeeman fields and chemical potentials from one affine
+    decomposition H(B, mu) = H0 + sum_a B_a H_a - mu (see
+    TBBuilder.build_hamiltonian_affine), with as few eigendecompositions as
+    the sweep allows:
+
+    - mu only shifts the spectrum, so all mu values share one eigensystem.
+    - If H0 does not couple opposite sigma_z and B_x = B_y = 0, H is block
+      diagonal in sigma_z and H_z is a constant h_s on each sector, so one
+      diagonalization per sector of H0 serves every B_z: e_n -> e_n + B_z h_s.
+    - Otherwise H0 + sum_a B_a H_a is diagonalized once per distinct field
+      (the last `max_cached` are kept).
+
+    Coefficients not given fall back to the affine defaults (the configured
+    field, mu = 0); solver.equilibrium only sets the occupation in transport
+    and does not shift the spectrum here.
+    """
+
+    def __init__(self, affine: AffineHamiltonian, config: SolverConfig, *, max_cached: int = 8) -> None:
+        self.affine = affine
+        self.config = config
+        self.ndof = affine.ndof
+        self.n_sites = affine.dim // affine.ndof
+        self.max_cached = max_cached
+        self.defaults = dict(affine.defaults)
+
+        self._fields = tuple(t for t in affine.terms if t != "mu")
+        self._cache: dict[tuple[float, ...], Spectrum] = {}
+        self._sectors: tuple[Spectrum, NDArray[np.float64]] | None = None
+        self.n_diagonalizations = 0
+        self.decoupled = self._spin_decoupled()
+        log.info(f"FieldSweep: N={affine.dim}, spin-decoupled={self.decoupled}")
+
+    @classmethod
+    def from_builder(cls, builder: TBBuilder, config: SolverConfig, *, seed: int | None = None) -> FieldSweep:
+        return cls(builder.build_hamiltonian_affine(seed=seed), config)
+
+    def _rows(self) -> NDArray[np.intp]:
+        return np.repeat(np.arange(self.affine.dim, dtype=np.intp), np.diff(self.affine.indptr))
+
+    def _spin_decoupled(self) -> bool:
+        spin = self.affine.spin
+        if spin is None:
+            return False
+        cross = spin[self._rows()] != spin[self.affine.indices]
+        return not np.any(self.affine.base[cross])
+
+    def _h0(self) -> sp.csr_matrix:
+        a = self.affine
+        return sp.csr_matrix((a.base, a.indices, a.indptr), shape=(a.dim, a.dim))
+
+    def _site_weights(self, evecs: NDArray[np.complex128], dofs: NDArray[np.intp]) -> NDArray[np.float64]:
+        """|psi_n|^2 summed per site, shape (n_sites, n_states); `dofs` are the rows of evecs."""
+        out = np.zeros((self.n_sites, evecs.shape[1]), dtype=np.float64)
+        np.add.at(out, dofs // self.ndof, np.abs(evecs) ** 2)
+        return out
+
+    def _sector_spectra(self) -> tuple[Spectrum, NDArray[np.float64]]:
+        """Eigenvalues and site weights of H0 per sigma_z sector, plus h_s per state."""
+        if self._sectors is None:
+            a = self.affine
+            assert a.spin is not None
+            h0 = self._h0()
+            diag = np.flatnonzero(self._rows() == a.indices)
+            hz = np.zeros(a.dim, dtype=np.float64)
+            hz[a.indices[diag]] = a.stack[a.terms.index("zeeman_z")][diag].real
+            evals, weights, shifts = [], [], []
+            for s in (1, -1):
+                dofs = np.flatnonzero(a.spin == s)
+                e, v = np.linalg.eigh(h0[dofs][:, dofs].toarray())
+                self.n_diagonalizations += 1
+                evals.append(e)
+                weights.append(self._site_weights(v, dofs))
+                shifts.append(np.full(e.size, hz[dofs[0]] if dofs.size else 0.0))
+            self._sectors = (np.concatenate(evals), np.hstack(weights)), np.concatenate(shifts)
+        return self._sectors
+
+    def _field_spectrum(self, key: tuple[float, ...]) -> Spectrum:
+        cached = self._cache.get(key)
+        if cached is None:
+            a = self.affine
+            ham = a.matrix(**dict(zip(self._fields, key)), mu=0.0).toarray()
+            e, v = np.linalg.eigh(ham)
+            self.n_diagonalizations += 1
+            cached = e, self._site_weights(v, np.arange(a.dim, dtype=np.intp))
+            if len(self._cache) >= self.max_cached:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = cached
+        return cached
+
+    def spectrum(self, **coeffs: float) -> Spectrum:
+        """Eigenvalues of H(coeffs) and per-site weights, shape (N,) and (n_sites, N)."""
+        field = dict(zip(self.affine.terms, self.affine.coefficients(**{**self.defaults, **coeffs})))
+        shift = -field["mu"]  # H_mu = -identity
+        if self.decoupled and field["zeeman_x"] == 0.0 and field["zeeman_y"] == 0.0:
+            (evals, weights), hz = self._sector_spectra()
+            return evals + field["zeeman_z"] * hz + shift, weights
+        evals, weights = self._field_spectrum(tuple(field[t] for t in self._fields))
+        return evals + shift, weights
+
+    def ldos_grid(self, **coeffs: float) -> NDArray[np.float64]:
+        """LDOS on config.energy_grid for H(coeffs), shape (n_w, n_sites)."""
+        evals, weights = self.spectrum(**coeffs)
+        return lorentzian(self.config.energy_grid, evals, self.config.eta) @ weights.T
+
+    def dos_grid(self, **coeffs: float) -> NDArray[np.float64]:
+        evals, _ = self.spectrum(**coeffs)
+        return lorentzian(self.config.energy_grid, evals, self.config.eta).sum(axis=1)
+
+    def run(
+        self, points: Sequence[Mapping[str, float]], *, ldos: bool = False
+    ) -> dict[str, NDArray[np.float64]]:
+        """DOS (n_points, n_w) and optionally LDOS (n_points, n_w, n_sites) over coefficient sets."""
+        dos, ldos_all = [], []
+        for point in points:
+            if ldos:
+                ld = self.ldos_grid(**point)
+                ldos_all.append(ld)
+                dos.append(ld.sum(axis=1))
+            else:
+                dos.append(self.dos_grid(**point))
+        out = {"dos": np.stack(dos)}
+        if ldos:
+            out["ldos"] = np.stack(ldos_all)
+        log.info(f"FieldSweep: {len(points)} points, {self.n_diagonalizations} diagonalizations so far")
+        return out
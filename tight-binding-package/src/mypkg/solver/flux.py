@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+from ..builder.tb_builder import bond_arrays, block_coo
+from ..geometry.ab_ring import ABRingGeometry
+from .configs import SolverConfig
+from .green import spectral_weight
+from .selected import SelectedInverse, data_positions, fixed_order_pattern, sparse_lu
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import TBBuilder
+
+log = logging.getLogger(__name__)
+
+
+class FluxSweep:
+    """
+    Spectra over many Aharonov-Bohm flux values with structure reuse.
+
+    The flux only changes the phases of the Hamiltonian entries on bonds
+    that wind around the ring, so the zero-flux H is assembled once, stored
+    in a fixed fill-reducing order (one symbolic analysis for all flux and
+    energy values), and the data positions of the winding entries are
+    recorded. set_flux(phi) rewrites just those entries,
+        data[pos] = static[pos] + t0 * exp(2*pi*i * phi * winding),
+    after which each energy needs a numeric factorization in the fixed
+    (NATURAL) order plus selected inversion for diag(G).
+
+    hamiltonian(phi) is identical to TBBuilder.build_hamiltonian_sparse() with
+    fields.ab_flux.phi_over_phi0 = phi. Disorder, if configured, is the
+    phys.seed realization for every flux value.
+    """
+
+    def __init__(self, builder: TBBuilder, config: SolverConfig) -> None:
+        if not isinstance(builder.geo, ABRingGeometry):
+            raise ValueError(f"{type(builder.geo).__name__} has no flux-carrying bonds")
+        self.builder = builder
+        self.ring: ABRingGeometry = builder.geo
+        self.config = config
+        self.ndof = builder.ndof
+        self.dim = builder.dim
+        self._prepare()
+        self.phi: float | None = None
+
+    def _prepare(self) -> None:
+        n = self.dim
+        phys = self.builder.phys
+        if phys.fields is not None and phys.fields.ab_flux is not None:
+            phys = phys.model_copy(update={"fields": phys.fields.model_copy(update={"ab_flux": None})})
+        zero = type(self.builder)(self.builder.geo, phys)
+        h0 = zero.build_hamiltonian_sparse()
+
+        w0 = 0.5 * (self.config.w_min + self.config.w_max)
+        base, self.perm, inv = fixed_order_pattern(h0, w0 + 1j * self.config.eta)
+        self.indices, self.indptr = base.indices, base.indptr
+        eye = np.arange(n)
+        self.diag_pos = data_positions(base, inv[eye], inv[eye])
+
+        # zero-flux values of the winding entries: H[i, j] (winding w) and H[j, i] (-w)
+        delta = zero.disorder_sample(None)
+        bond_disorder = delta is not None and phys.disorder is not None and phys.disorder.kind == "bond"
+        disordered = zero.disordered_kinds()
+        pos, vals, wind = [], [], []
+        offset = 0
+        for kind in zero.hopping_kinds():
+            i, j = bond_arrays(zero.geo, kind)
+            scale = None
+            if bond_disorder and kind in disordered:
+                assert phys.disorder is not None and delta is not None
+                scale = 1.0 + delta[offset : offset + i.size]
+                offset += i.size
+            w = self.ring.bond_windings(kind)
+            on = w != 0
+            if not on.any():
+                continue
+            t = phys.params.hopping[kind].to_complex()
+            r, c, v = block_coo(i[on], j[on], -t, self.ndof)
+            per_bond = r.size // int(on.sum())
+            if scale is not None:
+                v = (v.reshape(-1, per_bond) * scale[on][:, None]).ravel()
+            w_entry = np.repeat(w[on], per_bond)
+            pos += [data_positions(base, inv[r], inv[c]), data_positions(base, inv[c], inv[r])]
+            vals += [v, v.conj()]
+            wind += [w_entry, -w_entry]
+
+        if pos:
+            self.flux_pos = np.concatenate(pos)
+            self.flux_vals = np.concatenate(vals)
+            self.flux_wind = np.concatenate(wind).astype(np.float64)
+        else:
+            self.flux_pos = np.empty(0, dtype=np.intp)
+            self.flux_vals = np.empty(0, dtype=np.complex128)
+            self.flux_wind = np.empty(0, dtype=np.float64)
+        self._unique = np.unique(self.flux_pos).size == self.flux_pos.size
+
+        # static part: H0 with the winding entries taken out
+        self.static = base.data.copy()
+        np.subtract.at(self.static, self.flux_pos, self.flux_vals)
+        self.data = base.data.copy()
+        log.info(f"FluxSweep: {self.flux_pos.size} of {self.data.size} stored entries carry flux")
+
+    def set_flux(self, phi_over_phi0: float) -> None:
+        """Rewrite the winding entries of H in place for flux phi/phi0."""
+        phased = self.flux_vals * np.exp(2j * np.pi * phi_over_phi0 * self.flux_wind)
+        if self._unique:
+            self.data[self.flux_pos] = self.static[self.flux_pos] + phased
+        else:
+            self.data[self.flux_pos] = self.static[self.flux_pos]
+            np.add.at(self.data, self.flux_pos, phased)
+        self.phi = phi_over_phi0
+
+    def factorize(self, w: float) -> SelectedInverse:
+        """Selected inverse of z - H(phi) for the current flux (stored, permuted order)."""
+        if self.phi is None:
+            raise RuntimeError("Call set_flux() first")
+        a_data = -self.data
+        a_data[self.diag_pos] += w + 1j * self.config.eta
+        a = sp.csc_matrix((a_data, self.indices, self.indptr), shape=(self.dim, self.dim))
+        return SelectedInverse(sparse_lu(a, permc_spec="NATURAL"))
+
+    def ldos(self, w: float) -> NDArray[np.float64]:
+        g_diag = np.empty(self.dim, dtype=np.complex128)
+        g_diag[self.perm] = self.factorize(w).diagonal()
+        return spectral_weight(g_diag).reshape(-1, self.ndof).sum(axis=1)
+
+    def ldos_grid(self) -> NDArray[np.float64]:
+        """LDOS on config.energy_grid for the current flux, shape (n_w, n_sites)."""
+        return np.stack([self.ldos(w) for w in self.config.energy_grid])
+
+    def dos_grid(self) -> NDArray[np.float64]:
+        return self.ldos_grid().sum(axis=1)
+
+    def run(self, phis: Sequence[float] | NDArray[np.float64], *, ldos: bool = False) -> dict[str, NDArray[np.float64]]:
+        """DOS (n_phi, n_w) and optionally LDOS (n_phi, n_w, n_sites) over `phis`."""
+        dos, ldos_all = [], []
+        for phi in phis:
+            self.set_flux(float(phi))
+            ld = self.ldos_grid()
+            dos.append(ld.sum(axis=1))
+            if ldos:
+                ldos_all.append(ld)
+        out = {"phi": np.asarray(phis, dtype=np.float64), "dos": np.stack(dos)}
+        if ldos:
+            out["ldos"] = np.stack(ldos_all)
+        return out
+
+    def hamiltonian(self, phi_over_phi0: float) -> sp.csc_matrix:
+        """H(phi) in the original ordering (for checks)."""
+        self.set_flux(phi_over_phi0)
+        b = sp.csc_matrix((self.data.copy(), self.indices, self.indptr), shape=(self.dim, self.dim))
+        inv = np.empty(self.dim, dtype=np.intp)
+        inv[self.perm] = np.arange(self.dim)
+        return b[inv][:, inv].tocsc()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+from ..builder.tb_builder import site_dofs
+from .configs import SolverConfig
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import TBBuilder
+
+log = logging.getLogger(__name__)
+
+DenseMethod = Literal["auto", "inverse", "eigen"]
+
+# Rough flop prefactors (units of N^3) for the dense kernels.
+_INV_FLOPS = 8.0 / 3.0   # LU + inverse, once per energy
+_EIGH_FLOPS = 9.0        # Hermitian eigendecomposition with vectors, once
+
+
+def spectral_weight(g_diag: NDArray[np.complex128]) -> NDArray[np.float64]:
+    """-1/pi * Im G_ii."""
+    return -g_diag.imag / np.pi
+
+
+def lorentzian(w: NDArray[np.float64], evals: NDArray[np.float64], eta: float) -> NDArray[np.float64]:
+    """-1/pi Im 1/(w + i*eta - e_n), shape (len(w), len(evals))."""
+    return (eta / np.pi) / ((w[:, None] - evals[None, :]) ** 2 + eta**2)
+
+
+def ldos_inverse_kernel(
+    ham: sp.spmatrix, energies: NDArray[np.float64], ndof: int, eta: float
+) -> NDArray[np.float64]:
+    """
+    Energy-sweep kernel: LDOS per site by dense inversion, shape (len(energies), n_sites).
+    Top-level so it can be shipped to worker processes.
+    """
+    dense = ham.toarray() if sp.issparse(ham) else np.asarray(ham)
+    eye = np.eye(dense.shape[0])
+    out = np.empty((len(energies), dense.shape[0] // ndof), dtype=np.float64)
+    for k, w in enumerate(energies):
+        g_diag = np.diagonal(np.linalg.inv((w + 1j * eta) * eye - dense))
+        out[k] = spectral_weight(g_diag).reshape(-1, ndof).sum(axis=1)
+    return out
+
+
+class RecursiveGreenSolver:
+    """
+    Recursive Green's function (RGF) for Hamiltonians that are block
+    tridiagonal in a sequence of slices (e.g. columns of a strip that is
+    open along the slicing axis).
+
+    Diagonal blocks of G(w + i*eta) cost O(n_slices * m^3) per energy, with
+    m the slice dimension, instead of O((n_slices * m)^3).
+    """
+
+    def __init__(
+        self,
+        ham: sp.spmatrix,
+        site_slices: Sequence[NDArray[np.intp]],
+        ndof: int,
+        config: SolverConfig,
+    ) -> None:
+        self.config = config
+        self.ndof = ndof
+        self.site_slices = [np.asarray(s, dtype=np.intp) for s in site_slices if len(s) > 0]
+        self.n_sites = int(sum(s.size for s in self.site_slices))
+
+        ham = sp.csr_matrix(ham)
+        ham.eliminate_zeros()
+        dofs = [site_dofs(s, ndof) for s in self.site_slices]
+        self.h_diag = [ham[d][:, d].toarray() for d in dofs]
+        self.h_up = [ham[d0][:, d1].toarray() for d0, d1 in zip(dofs[:-1], dofs[1:])]
+
+        nnz_blocks = sum(np.count_nonzero(b) for b in self.h_diag) + 2 * sum(
+            np.count_nonzero(b) for b in self.h_up
+        )
+        if nnz_blocks != ham.nnz:
+            msg = (
+                "Hamiltonian is not block tridiagonal in the given slices "
+                "(periodic boundary along the slicing axis?)"
+            )
+            log.error(msg)
+            raise ValueError(msg)
+
+    @classmethod
+    def from_builder(cls, builder: TBBuilder, config: SolverConfig) -> RecursiveGreenSolver:
+        column_sites = getattr(builder.geo, "column_sites", None)
+        if column_sites is None:
+            raise ValueError(f"{type(builder.geo).__name__} does not provide column slices for RGF")
+        return cls(builder.build_hamiltonian_sparse(), column_sites(), builder.ndof, config)
+
+    def diagonal_blocks(
+        self,
+        w: float,
+        *,
+        sigma_left: NDArray[np.complex128] | None = None,
+        sigma_right: NDArray[np.complex128] | None = None,
+    ) -> list[NDArray[np.complex128]]:
+        """
+        G_ii for every slice at energy w + i*eta.
+        Optional self-energies are added to the first/last slice (leads).
+        """
+        z = w + 1j * self.config.eta
+        n = len(self.h_diag)
+
+        h_diag = list(self.h_diag)
+        if sigma_left is not None:
+            h_diag[0] = h_diag[0] + sigma_left
+        if sigma_right is not None:
+            h_diag[-1] = h_diag[-1] + sigma_right
+
+        # forward sweep: left-connected g^L_i
+        g_left: list[NDArray[np.complex128]] = []
+        for i in range(n):
+            a = z * np.eye(h_diag[i].shape[0]) - h_diag[i]
+            if i > 0:
+                up = self.h_up[i - 1]
+                a -= up.conj().T @ g_left[i - 1] @ up
+            g_left.append(np.linalg.inv(a))
+
+        # backward sweep: fully connected G_ii
+        g_full: list[NDArray[np.complex128]] = [np.empty(0, dtype=np.complex128)] * n
+        g_full[-1] = g_left[-1]
+        for i in range(n - 2, -1, -1):
+            up = self.h_up[i]
+            g_full[i] = g_left[i] + g_left[i] @ up @ g_full[i + 1] @ up.conj().T @ g_left[i]
+        return g_full
+
+    def corner_block(
+        self,
+        w: float,
+        *,
+        sigma_left: NDArray[np.complex128] | None = None,
+        sigma_right: NDArray[np.complex128] | None = None,
+    ) -> NDArray[np.complex128]:
+        """
+        G_{N1} (last slice <- first slice) at w + i*eta from the forward sweep
+        alone, G_{i1} = g^L_i H_{i,i-1} G_{i-1,1}: no other block of G is formed.
+        """
+        z = w + 1j * self.config.eta
+        n = len(self.h_diag)
+
+        h_diag = list(self.h_diag)
+        if sigma_left is not None:
+            h_diag[0] = h_diag[0] + sigma_left
+        if sigma_right is not None:
+            h_diag[-1] = h_diag[-1] + sigma_right
+
+        g = g_n1 = np.linalg.inv(z * np.eye(h_diag[0].shape[0]) - h_diag[0])
+        for i in range(1, n):
+            down = self.h_up[i - 1].conj().T
+            a = z * np.eye(h_diag[i].shape[0]) - h_diag[i] - down @ g @ self.h_up[i - 1]
+            g = np.linalg.inv(a)
+            g_n1 = g @ down @ g_n1
+        return g_n1
+
+    def ldos(self, w: float) -> NDArray[np.float64]:
+        """Local DOS per active site (dofs summed)."""
+        out = np.zeros(self.n_sites, dtype=np.float64)
+        for sites, block in zip(self.site_slices, self.diagonal_blocks(w)):
+            weight = spectral_weight(np.diagonal(block)).reshape(sites.size, self.ndof)
+            out[sites] = weight.sum(axis=1)
+        return out
+
+    def dos(self, w: float) -> float:
+        return float(self.ldos(w).sum())
+
+    def ldos_grid(self) -> NDArray[np.float64]:
+        """LDOS on config.energy_grid, shape (n_w, n_sites)."""
+        return np.stack([self.ldos(w) for w in self.config.energy_grid])
+
+    def dos_grid(self) -> NDArray[np.float64]:
+        return self.ldos_grid().sum(axis=1)
+
+
+class DenseGreenSolver:
+    """
+    Dense G(w + i*eta) = (z - H)^-1 for moderate N, with two paths:
+
+    - "inverse": one O(N^3) inversion per energy.
+    - "eigen":   diagonalize H once; DOS/LDOS on the whole grid are one
+                 broadcast over eigenvalues, G(w) = U diag(1/(z - e)) U^H.
+
+    method="auto" compares n_w * inverse cost against one eigendecomposition
+    plus the O(n_w * N^2) broadcast; the resolved path is in `self.method`.
+    """
+
+    def __init__(
+        self,
+        ham: sp.spmatrix | NDArray[np.complex128],
+        ndof: int,
+        config: SolverConfig,
+        *,
+        method: DenseMethod = "auto",
+    ) -> None:
+        self.ham = sp.csr_matrix(ham).toarray() if sp.issparse(ham) else np.asarray(ham)
+        self.ndof = ndof
+        self.config = config
+        self.dim = self.ham.shape[0]
+        self.n_sites = self.dim // ndof
+        self.method: Literal["inverse", "eigen"] = (
+            self.choose_method(self.dim, config.n_w) if method == "auto" else method
+        )
+        log.info(f"DenseGreenSolver: N={self.dim}, n_w={config.n_w} -> method={self.method}")
+
+        self._evals: NDArray[np.float64] | None = None
+        self._evecs: NDArray[np.complex128] | None = None
+
+    @classmethod
+    def from_builder(
+        cls, builder: TBBuilder, config: SolverConfig, *, method: DenseMethod = "auto"
+    ) -> DenseGreenSolver:
+        return cls(builder.build_hamiltonian_sparse(), builder.ndof, config, method=method)
+
+    @staticmethod
+    def choose_method(dim: int, n_w: int) -> Literal["inverse", "eigen"]:
+        cost_inverse = n_w * _INV_FLOPS * dim**3
+        cost_eigen = _EIGH_FLOPS * dim**3 + n_w * dim**2
+        return "eigen" if cost_eigen < cost_inverse else "inverse"
+
+    def _eigensystem(self) -> tuple[NDArray[np.float64], NDArray[np.complex128]]:
+        if self._evals is None or self._evecs is None:
+            self._evals, self._evecs = np.linalg.eigh(self.ham)
+        return self._evals, self._evecs
+
+    def _site_weights(self) -> NDArray[np.float64]:
+        """|psi_n(i)|^2 summed over the dofs of site i, shape (n_sites, N)."""
+        _, evecs = self._eigensystem()
+        return (np.abs(evecs) ** 2).reshape(self.n_sites, self.ndof, self.dim).sum(axis=1)
+
+    def _lorentzian(self, w: NDArray[np.float64]) -> NDArray[np.float64]:
+        """-1/pi Im 1/(w + i*eta - e_n), shape (len(w), N)."""
+        evals, _ = self._eigensystem()
+        return lorentzian(w, evals, self.config.eta)
+
+    def green(self, w: float) -> NDArray[np.complex128]:
+        z = w + 1j * self.config.eta
+        if self.method == "eigen":
+            evals, evecs = self._eigensystem()
+            return (evecs / (z - evals)[None, :]) @ evecs.conj().T
+        return np.linalg.inv(z * np.eye(self.dim) - self.ham)
+
+    def ldos(self, w: float) -> NDArray[np.float64]:
+        if self.method == "eigen":
+            return self._ldos_eigen(np.array([w], dtype=np.float64))[0]
+        g_diag = np.diagonal(self.green(w))
+        return spectral_weight(g_diag).reshape(self.n_sites, self.ndof).sum(axis=1)
+
+    def dos(self, w: float) -> float:
+        return float(self.ldos(w).sum())
+
+    def _ldos_eigen(self, w: NDArray[np.float64]) -> NDArray[np.float64]:
+        return self._lorentzian(w) @ self._site_weights().T
+
+    def ldos_grid(self) -> NDArray[np.float64]:
+        """LDOS on config.energy_grid, shape (n_w, n_sites)."""
+        grid = self.config.energy_grid
+        if self.method == "eigen":
+            return self._ldos_eigen(grid)
+        return np.stack([self.ldos(w) for w in grid])
+
+    def dos_grid(self) -> NDArray[np.float64]:
+        if self.method == "eigen":
+            # eigenvector weights sum to 1 per state: DOS needs eigenvalues only
+            return self._lorentzian(self.config.energy_grid).sum(axis=1)
+        return self.ldos_grid().sum(axis=1)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+from .configs import KPMConfig, SolverConfig
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import TBBuilder
+
+log = logging.getLogger(__name__)
+
+
+def gershgorin_bounds(ham: sp.csr_matrix) -> tuple[float, float]:
+    """Cheap O(nnz) spectral bounds (e_min, e_max) of a Hermitian matrix."""
+    diag = ham.diagonal().real
+    radius = np.asarray(abs(ham).sum(axis=1)).ravel() - np.abs(diag)
+    return float((diag - radius).min()), float((diag + radius).max())
+
+
+def kernel_coefficients(cfg: KPMConfig) -> NDArray[np.float64]:
+    n_mom = cfg.n_moments
+    n = np.arange(n_mom, dtype=np.float64)
+    if cfg.kernel == "jackson":
+        q = np.pi / (n_mom + 1)
+        return ((n_mom - n + 1) * np.cos(q * n) + np.sin(q * n) / np.tan(q)) / (n_mom + 1)
+    lam = cfg.lorentz_lambda
+    return np.sinh(lam * (1.0 - n / n_mom)) / np.sinh(lam)
+
+
+class KPMSolver:
+    """
+    Kernel polynomial method: Chebyshev moments of the rescaled Hamiltonian
+    from sparse mat-vecs, DOS from a stochastic trace over random-phase
+    vectors, reconstructed with a Jackson/Lorentz kernel on energy_grid.
+
+    Cost O(nnz * n_moments * n_random); memory a few length-N vectors
+    (LDOS: a few (N, batch_size) blocks).
+    DOS is normalized like the other solvers (integrates to N dofs).
+    """
+
+    def __init__(
+        self, ham: sp.spmatrix, ndof: int, config: SolverConfig, *, seed: int = 0, batch_size: int = 64
+    ) -> None:
+        self.config = config
+        self.kpm = config.kpm or KPMConfig()
+        self.ndof = ndof
+        self.seed = seed
+        self.batch_size = batch_size
+
+        ham = sp.csr_matrix(ham)
+        self.dim = ham.shape[0]
+        self.n_sites = self.dim // ndof
+
+        e_min, e_max = gershgorin_bounds(ham)
+        self.center = 0.5 * (e_max + e_min)
+        self.half_width = 0.5 * (e_max - e_min) / (1.0 - self.kpm.bound_padding)
+        self.ham_scaled = (ham - self.center * sp.identity(self.dim, format="csr")) / self.half_width
+        self.ham_scaled = sp.csr_matrix(self.ham_scaled)
+
+    @classmethod
+    def from_builder(cls, builder: TBBuilder, config: SolverConfig) -> KPMSolver:
+        return cls(builder.build_hamiltonian_sparse(), builder.ndof, config, seed=int(builder.phys.seed))
+
+    def _moments(self, v0: NDArray[np.complex128]) -> NDArray[np.float64]:
+        """
+        mu_n = <v0|T_n(H)|v0> for each column of v0, via the doubling trick
+        (2 moments per mat-vec). Returns shape (n_moments, n_cols).
+        """
+        n_mom = self.kpm.n_moments
+        h = self.ham_scaled
+        mu = np.zeros((n_mom, v0.shape[1]), dtype=np.float64)
+
+        a0 = v0
+        a1 = h @ a0
+        mu[0] = np.einsum("ij,ij->j", v0.conj(), a0).real
+        if n_mom > 1:
+            mu[1] = np.einsum("ij,ij->j", v0.conj(), a1).real
+
+        for n in range(1, (n_mom + 1) // 2):
+            a2 = 2.0 * (h @ a1) - a0
+            if 2 * n < n_mom:
+                mu[2 * n] = 2.0 * np.einsum("ij,ij->j", a1.conj(), a1).real - mu[0]
+            if 2 * n + 1 < n_mom:
+                mu[2 * n + 1] = 2.0 * np.einsum("ij,ij->j", a2.conj(), a1).real - mu[1]
+            a0, a1 = a1, a2
+        return mu
+
+    def dos_moments(self) -> NDArray[np.float64]:
+        """Stochastic estimate of Tr T_n(H), seeded from the physics seed."""
+        rng = np.random.default_rng(self.seed)
+        acc = np.zeros(self.kpm.n_moments, dtype=np.float64)
+        for _ in range(self.kpm.n_random):
+            phase = rng.uniform(0.0, 2.0 * np.pi, size=self.dim)
+            acc += self._moments(np.exp(1j * phase)[:, None])[:, 0]
+        return acc / self.kpm.n_random
+
+    def ldos_moments(self, sites: NDArray[np.intp]) -> NDArray[np.float64]:
+        """
+        Exact per-site moments (dofs summed), shape (n_moments, len(sites)),
+        from unit vectors propagated batch_size sites at a time.
+        """
+        sites = np.asarray(sites, dtype=np.intp)
+        mu = np.zeros((self.kpm.n_moments, sites.size), dtype=np.float64)
+        for start in range(0, sites.size, self.batch_size):
+            batch = sites[start : start + self.batch_size]
+            cols = np.arange(batch.size)
+            for a in range(self.ndof):
+                v0 = np.zeros((self.dim, batch.size), dtype=np.complex128)
+                v0[batch * self.ndof + a, cols] = 1.0
+                mu[:, start : start + batch.size] += self._moments(v0)
+        return mu
+
+    def reconstruct(self, mu: NDArray[np.float64], w: NDArray[np.float64]) -> NDArray[np.float64]:
+        """Kernel-damped Chebyshev series on energies w; mu has moments on axis 0."""
+        mu = mu.reshape(mu.shape[0], -1)
+        g = kernel_coefficients(self.kpm)[:, None] * mu
+        g[1:] *= 2.0
+
+        x = (np.asarray(w, dtype=np.float64) - self.center) / self.half_width
+        inside = np.abs(x) < 1.0
+        theta = np.arccos(np.clip(x, -1.0, 1.0))
+        cheb = np.cos(np.arange(mu.shape[0])[:, None] * theta[None, :])  # (n_moments, n_w)
+
+        rho = (cheb.T @ g) / (np.pi * np.sqrt(np.where(inside, 1.0 - x**2, 1.0)))[:, None]
+        rho[~inside] = 0.0
+        return rho / self.half_width
+
+    def dos_grid(self) -> NDArray[np.float64]:
+        return self.reconstruct(self.dos_moments(), self.config.energy_grid)[:, 0]
+
+    def ldos_grid(self, sites: NDArray[np.intp]) -> NDArray[np.float64]:
+        """LDOS on energy_grid for selected sites, shape (n_w, len(sites))."""
+        return self.reconstruct(self.ldos_moments(sites), self.config.energy_grid)
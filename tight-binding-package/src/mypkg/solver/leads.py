@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..geometry.types import BoundaryCondition
+from ..utils.core import DEFAULT_HASH_LENGTH
+
+if TYPE_CHECKING:
+    from ..geometry.configs import GeometryConfigBase
+    from ..physics.configs import TBPhysics
+
+log = logging.getLogger(__name__)
+
+LeadSide = Literal["left", "right"]
+
+
+@dataclass(frozen=True, eq=False)
+class Lead:
+    """
+    Semi-infinite periodic lead: principal-layer Hamiltonian h0 and the
+    coupling h1 = H_{n, n+1} from one layer to the next (pointing +x).
+    """
+    h0: NDArray[np.complex128]
+    h1: NDArray[np.complex128]
+    _hash: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.h0.shape != self.h1.shape or self.h0.shape[0] != self.h0.shape[1]:
+            raise ValueError(f"Lead blocks must be square and equal in shape: {self.h0.shape}, {self.h1.shape}")
+        digest = hashlib.sha256()
+        for arr in (self.h0, self.h1):
+            a = np.ascontiguousarray(arr, dtype=np.complex128)
+            digest.update(repr(a.shape).encode())
+            digest.update(a.tobytes())
+        object.__setattr__(self, "_hash", digest.hexdigest())
+
+    @property
+    def dim(self) -> int:
+        return self.h0.shape[0]
+
+    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
+        return self._hash[:length]
+
+    @classmethod
+    def from_square(
+        cls,
+        phys: TBPhysics,
+        width: int,
+        boundary_y: BoundaryCondition = BoundaryCondition.OPEN,
+    ) -> Lead:
+        """Square-lattice lead `width` sites wide; see from_geometry."""
+        from ..geometry.configs import SquareGeometryConfig
+
+        cfg = SquareGeometryConfig(
+            lattice="square", nx=3, ny=width, boundary_x=BoundaryCondition.OPEN, boundary_y=boundary_y
+        )
+        return cls.from_geometry(cfg, phys)
+
+    @classmethod
+    def from_geometry(cls, config: GeometryConfigBase, phys: TBPhysics) -> Lead:
+        """
+        Lead continuing a column-sliced lattice (square, honeycomb) along x:
+        three clean columns of `config`'s lattice, open in x. h0 is the middle
+        column and h1 its coupling to the next; sites within a column are in
+        global-index order.
+        """
+        from ..builder.tb_builder import TBBuilder, site_dofs
+
+        cfg = type(config).model_validate(
+            {**config.model_dump(), "nx": 3, "boundary_x": BoundaryCondition.OPEN}
+        )
+        geo = cfg.build()
+        column_sites = getattr(geo, "column_sites", None)
+        if column_sites is None:
+            raise ValueError(f"{type(geo).__name__} does not provide column slices for leads")
+        ham = TBBuilder(geo, phys).build_hamiltonian_sparse()
+        ndof = phys.basis.ndof
+        cols = [site_dofs(s, ndof) for s in column_sites()]
+        return cls(h0=ham[cols[1]][:, cols[1]].toarray(), h1=ham[cols[1]][:, cols[2]].toarray())
+
+
+@dataclass
+class DecimationStats:
+    hits: int = 0
+    misses: int = 0
+    last_iterations: int = 0
+    total_iterations: int = 0
+    mode_fallbacks: int = 0
+
+
+class SanchoRubio:
+    """
+    Surface Green's functions of semi-infinite leads by Sancho-Rubio
+    decimation (the effective coupling halves the remaining chain each step,
+    so convergence takes O(log(decay length)) iterations).
+
+    Decimation stops once eps_s changes by less than `tol` relative to its
+    size, and the result must satisfy the surface Dyson equation
+    g_s = (z - h0 - alpha g_s alpha^H)^-1 to a relative `residual_tol`.
+    At small eta an energy on a level of a short lead segment (h0 itself,
+    or the 3, 7, ... layers folded into the first steps) makes those steps
+    nearly singular, and the cancellation that follows loses every digit.
+    Such energies are redone from the lead's Bloch modes: the solutions of
+    (alpha^H + (h0 - z) lambda + alpha lambda^2) u = 0 with |lambda| < 1
+    give the layer-to-layer propagator F into the bulk, and
+    g_s = (z - h0 - alpha F)^-1.
+
+    Results are memoized in an LRU keyed by (lead hash, side, w, eta), so
+    repeated sweeps and several identical leads share the work.
+    """
+
+    def __init__(
+        self, *, tol: float = 1e-12, residual_tol: float = 1e-10, max_iter: int = 200, cache_size: int = 8192
+    ) -> None:
+        self.tol = tol
+        self.residual_tol = residual_tol
+        self.max_iter = max_iter
+        self.cache_size = cache_size
+        self.stats = DecimationStats()
+        self._cache: OrderedDict[tuple[str, str, float, float], NDArray[np.complex128]] = OrderedDict()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def _decimate(
+        self, h0: NDArray[np.complex128], alpha: NDArray[np.complex128], z: complex
+    ) -> NDArray[np.complex128] | None:
+        """g_s by decimation; None when eps_s breaks down or has not settled within max_iter steps."""
+        eye = np.eye(h0.shape[0])
+        beta = alpha.conj().T
+        eps_s = h0.astype(np.complex128)
+        eps = eps_s.copy()
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            for it in range(1, self.max_iter + 1):
+                try:
+                    g = np.linalg.inv(z * eye - eps)
+                except np.linalg.LinAlgError:
+                    return None
+                agb = alpha @ g @ beta
+                eps_s = eps_s + agb
+                eps = eps + agb + beta @ g @ alpha
+                alpha = alpha @ g @ alpha
+                beta = beta @ g @ beta
+                if not np.isfinite(eps_s).all():
+                    return None
+                if np.abs(agb).max() <= self.tol * max(np.abs(eps_s).max(), 1.0):
+                    self.stats.last_iterations = it
+                    self.stats.total_iterations += it
+                    return np.linalg.inv(z * eye - eps_s).astype(np.complex128, copy=False)
+        return None
+
+    @staticmethod
+    def _from_modes(
+        h0: NDArray[np.complex128], alpha: NDArray[np.complex128], z: complex
+    ) -> NDArray[np.complex128] | None:
+        """g_s from the decaying Bloch modes; None when they do not span the layer."""
+        import scipy.linalg as sla
+
+        dim = h0.shape[0]
+        eye = np.eye(dim)
+        zero = np.zeros((dim, dim))
+        # linearized in x = (u, lambda u); alpha may be singular (infinite lambda).
+        # The ordered QZ puts the |lambda| < 1 subspace first, [u; F u] with u
+        # spanning the layer, which stays well defined at degenerate lambda.
+        *_, alpha_qz, beta_qz, _, right = sla.ordqz(
+            np.block([[zero, eye], [-alpha.conj().T, z * eye - h0]]),
+            np.block([[eye, zero], [zero, alpha]]).astype(np.complex128),
+            sort="iuc",
+            output="complex",
+        )
+        if np.count_nonzero(np.abs(alpha_qz) < np.abs(beta_qz)) != dim:
+            return None
+        try:
+            prop = np.linalg.solve(right[:dim, :dim].T, right[dim:, :dim].T).T
+            return np.linalg.inv(z * eye - h0 - alpha @ prop).astype(np.complex128, copy=False)
+        except np.linalg.LinAlgError:
+            return None
+
+    @staticmethod
+    def dyson_residual(
+        h0: NDArray[np.complex128], alpha: NDArray[np.complex128], z: complex, g_s: NDArray[np.complex128]
+    ) -> float:
+        """
+        Relative residual |M g_s - 1| / (|M| |g_s|) of the surface Dyson equation,
+        M = z - h0 - alpha g_s alpha^H (max-norms): ~1e-16 for an accurate g_s,
+        independent of how large g_s grows near flat bands at small eta.
+        """
+        eye = np.eye(h0.shape[0])
+        m = z * eye - h0 - alpha @ g_s @ alpha.conj().T
+        return float(np.abs(m @ g_s - eye).max() / (np.abs(m).max() * np.abs(g_s).max()))
+
+    def _surface(self, lead: Lead, z: complex, side: LeadSide) -> NDArray[np.complex128]:
+        # alpha couples the surface layer to the next layer into the bulk
+        alpha = lead.h1 if side == "right" else lead.h1.conj().T
+        h0 = lead.h0.astype(np.complex128)
+        g_s = self._decimate(h0, alpha, z)
+        if g_s is not None and self.dyson_residual(h0, alpha, z, g_s) <= self.residual_tol:
+            return g_s
+
+        self.stats.mode_fallbacks += 1
+        log.debug(f"Sancho-Rubio decimation inaccurate at z={z}; using the lead's Bloch modes")
+        g_s = self._from_modes(h0, alpha, z)
+        residual = np.inf if g_s is None else self.dyson_residual(h0, alpha, z, g_s)
+        if g_s is not None and residual <= self.residual_tol:
+            return g_s
+
+        msg = f"No surface Green's function satisfies the Dyson equation at z={z} (residual {residual:.2e})"
+        log.error(msg)
+        raise RuntimeError(msg)
+
+    def surface_green(self, lead: Lead, w: float, eta: float, side: LeadSide) -> NDArray[np.complex128]:
+        """
+        g_s(w + i*eta) of the lead's surface layer. side="right": the lead
+        extends to +x from the device; side="left": it extends to -x.
+        """
+        key = (lead.get_hash(64), side, float(w), float(eta))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats.hits += 1
+            return cached
+
+        self.stats.misses += 1
+        g_s = self._surface(lead, complex(w, eta), side)
+        g_s.flags.writeable = False
+        self._cache[key] = g_s
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return g_s
+
+    def self_energy(self, lead: Lead, w: float, eta: float, side: LeadSide) -> NDArray[np.complex128]:
+        """Sigma on the device edge slice, assuming it couples to the lead via h1."""
+        g_s = self.surface_green(lead, w, eta, side)
+        if side == "right":
+            return lead.h1 @ g_s @ lead.h1.conj().T
+        return lead.h1.conj().T @ g_s @ lead.h1
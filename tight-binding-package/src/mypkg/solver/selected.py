@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from numpy.typing import NDArray
+
+from .configs import SolverConfig
+from .green import spectral_weight
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import TBBuilder
+
+log = logging.getLogger(__name__)
+
+
+def sparse_lu(mat: sp.spmatrix, *, permc_spec: str = "MMD_AT_PLUS_A") -> spla.SuperLU:
+    """
+    Fill-reducing LU without row pivoting, so L and U^T share the symmetric
+    (chordal) pattern selected inversion relies on. Pass permc_spec="NATURAL"
+    for a matrix that is already in a fill-reducing order.
+    """
+    return spla.splu(
+        sp.csc_matrix(mat),
+        permc_spec=permc_spec,
+        diag_pivot_thresh=0.0,
+        options={"SymmetricMode": True},
+    )
+
+
+def data_positions(mat: sp.csc_matrix, rows: NDArray[np.intp], cols: NDArray[np.intp]) -> NDArray[np.intp]:
+    """Index into mat.data of entries (rows, cols); all must be stored (sorted CSC)."""
+    n = mat.shape[0]
+    col_of = np.repeat(np.arange(n, dtype=np.int64), np.diff(mat.indptr))
+    keys = col_of * n + mat.indices
+    want = cols.astype(np.int64) * n + rows
+    pos = np.searchsorted(keys, want)
+    if np.any(pos >= keys.size) or np.any(keys[np.minimum(pos, keys.size - 1)] != want):
+        raise RuntimeError("Requested entries are not in the matrix pattern")
+    return pos
+
+
+def fixed_order_pattern(
+    ham: sp.spmatrix, z0: complex
+) -> tuple[sp.csc_matrix, NDArray[np.intp], NDArray[np.intp]]:
+    """
+    One symbolic analysis for a family of matrices z - H(params) sharing the
+    pattern of `ham`: returns (base, perm, inv) where base = (pattern of H
+    plus an explicit diagonal)[perm][:, perm] holds ham's values in sorted
+    CSC order, perm is the fill-reducing order of z0 - ham, and inv its
+    inverse. Factor later members with sparse_lu(..., permc_spec="NATURAL").
+    """
+    n = ham.shape[0]
+    coo = sp.coo_matrix(ham)
+    eye = np.arange(n)
+    pattern = sp.coo_matrix(
+        (np.concatenate([coo.data, np.zeros(n, dtype=np.complex128)]),
+         (np.concatenate([coo.row, eye]), np.concatenate([coo.col, eye]))),
+        shape=(n, n),
+    ).tocsc()
+
+    lu0 = sparse_lu(z0 * sp.identity(n, format="csc") - pattern)
+    perm = np.argsort(lu0.perm_c)           # B = A[perm][:, perm]
+    inv = np.empty(n, dtype=np.intp)
+    inv[perm] = np.arange(n)
+
+    base = pattern[perm][:, perm].tocsc()
+    base.sort_indices()
+    return base, perm, inv
+
+
+def _takahashi(
+    indptr: NDArray[np.intp],
+    indices: NDArray[np.intp],
+    l_val: NDArray[np.complex128],
+    u_val: NDArray[np.complex128],
+    d_inv: NDArray[np.complex128],
+    row: NDArray[np.complex128],
+    col: NDArray[np.complex128],
+    diag: NDArray[np.complex128],
+) -> bool:
+    """
+    Takahashi recursion over the strict-upper pattern (indptr, indices),
+    last pivot first; fills row/col (Z[i, K], Z[K, i]) and diag in place.
+    Z[K, K] is read straight from the rows already done, by merging each
+    K_a's pattern with the rest of K. Returns False if the pattern is not
+    closed. Compiled with numba by _takahashi_kernel().
+    """
+    n = d_inv.size
+    width = 0
+    for i in range(n):
+        width = max(width, indptr[i + 1] - indptr[i])
+    z_row = np.empty(width, dtype=np.complex128)
+    z_col = np.empty(width, dtype=np.complex128)
+    for i in range(n - 1, -1, -1):
+        lo, hi = indptr[i], indptr[i + 1]
+        m = hi - lo
+        for a in range(m):
+            z_row[a] = 0.0
+            z_col[a] = 0.0
+        for a in range(m):
+            k = indices[lo + a]
+            z_col[a] -= diag[k] * l_val[lo + a]
+            z_row[a] -= u_val[lo + a] * diag[k]
+            p, p_end = indptr[k], indptr[k + 1]
+            for b in range(a + 1, m):
+                kb = indices[lo + b]
+                while p < p_end and indices[p] < kb:
+                    p += 1
+                if p == p_end or indices[p] != kb:
+                    return False
+                # Z[k, kb] = row[p], Z[kb, k] = col[p]
+                z_col[a] -= row[p] * l_val[lo + b]
+                z_col[b] -= col[p] * l_val[lo + a]
+                z_row[a] -= u_val[lo + b] * col[p]
+                z_row[b] -= u_val[lo + a] * row[p]
+        acc = d_inv[i]
+        for a in range(m):
+            row[lo + a] = z_row[a]
+            col[lo + a] = z_col[a]
+            acc -= u_val[lo + a] * z_col[a]
+        diag[i] = acc
+    return True
+
+
+@lru_cache(maxsize=None)
+def _takahashi_kernel() -> Callable[..., bool]:
+    """_takahashi compiled on first use, keeping numba off the import path."""
+    import numba
+
+    return numba.njit(cache=True, nogil=True)(_takahashi)
+
+
+class SelectedInverse:
+    """
+    Entries of Z = A^-1 on the pattern of the LU factors (Takahashi
+    recursion), computed from the last pivot upwards:
+
+        Z[i, K] = -U~[i, K] Z[K, K]
+        Z[K, i] = -Z[K, K] L[K, i]
+        Z[i, i] = 1/D_i - U~[i, K] Z[K, i]
+
+    with K the off-diagonal pattern of row/column i and U = D U~.
+    Memory follows the fill-in of the factors, not N^2; the recursion runs
+    compiled, so its cost tracks sum_i |K_i|^2.
+    """
+
+    def __init__(self, lu: spla.SuperLU) -> None:
+        self.lu = lu
+        n = lu.shape[0]
+        if not np.array_equal(lu.perm_r, lu.perm_c):
+            raise RuntimeError("Selected inversion needs a symmetric permutation (row pivoting occurred)")
+
+        lower = sp.coo_matrix(lu.L)
+        upper = sp.coo_matrix(lu.U)
+        diag = upper.diagonal()
+        keep_l = lower.row > lower.col
+        keep_u = upper.col > upper.row
+        # K_i = rows of L[:, i] below and columns of U[i, :] right of the diagonal, as (i, k)
+        l_i, l_k = lower.col[keep_l], lower.row[keep_l]
+        u_i, u_k = upper.row[keep_u], upper.col[keep_u]
+        i_all = np.concatenate([l_i, u_i])
+        k_all = np.concatenate([l_k, u_k])
+        pattern = sp.csr_matrix((np.ones(i_all.size), (i_all, k_all)), shape=(n, n))
+        pattern.sum_duplicates()
+        pattern.sort_indices()
+
+        self._indptr = pattern.indptr.astype(np.intp)
+        self._indices = pattern.indices.astype(np.intp)
+        self._keys = np.repeat(np.arange(n, dtype=np.int64), np.diff(self._indptr)) * n + self._indices
+        l_vec = np.zeros(self._indices.size, dtype=np.complex128)
+        u_vec = np.zeros(self._indices.size, dtype=np.complex128)
+        l_vec[np.searchsorted(self._keys, l_i.astype(np.int64) * n + l_k)] = lower.data[keep_l]
+        u_vec[np.searchsorted(self._keys, u_i.astype(np.int64) * n + u_k)] = upper.data[keep_u] / diag[u_i]
+
+        self._row = np.empty(self._indices.size, dtype=np.complex128)
+        self._col = np.empty(self._indices.size, dtype=np.complex128)
+        self._diag = np.empty(n, dtype=np.complex128)
+        d_inv = (1.0 / diag).astype(np.complex128)
+        closed = _takahashi_kernel()(self._indptr, self._indices, l_vec, u_vec, d_inv, self._row, self._col, self._diag)
+        if not closed:
+            raise RuntimeError("LU pattern is not closed; cannot run selected inversion")
+
+    def diagonal(self) -> NDArray[np.complex128]:
+        """diag(A^-1) in the original ordering."""
+        return self._diag[self.lu.perm_c]
+
+    def entries(self, rows: NDArray[np.intp], cols: NDArray[np.intp]) -> NDArray[np.complex128]:
+        """
+        A^-1[rows, cols]. Entries outside the factor pattern are filled by
+        triangular solves for the columns that need them.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        perm = self.lu.perm_c
+        n = self.lu.shape[0]
+        r, c = perm[rows], perm[cols]
+        lo, hi = np.minimum(r, c), np.maximum(r, c)
+        want = lo.astype(np.int64) * n + hi
+        pos = np.searchsorted(self._keys, want)
+        found = pos < self._keys.size
+        found[found] = self._keys[pos[found]] == want[found]
+
+        out = np.empty(rows.size, dtype=np.complex128)
+        on_diag = r == c
+        out[on_diag] = self._diag[r[on_diag]]
+        upper = found & (r < c)
+        lower = found & (r > c)
+        out[upper] = self._row[pos[upper]]
+        out[lower] = self._col[pos[lower]]
+
+        miss = np.flatnonzero(~(found | on_diag))
+        if miss.size:
+            need_cols, inverse = np.unique(cols[miss], return_inverse=True)
+            rhs = np.zeros((n, need_cols.size), dtype=np.complex128)
+            rhs[need_cols, np.arange(need_cols.size)] = 1.0
+            sol = self.lu.solve(rhs)
+            out[miss] = sol[rows[miss], inverse]
+        return out
+
+
+class SelectedInversionSolver:
+    """
+    diag(G(w + i*eta)) (or a chosen pattern of G) per energy from a sparse
+    LU of z - H plus selected inversion; no dense inverse is formed.
+    """
+
+    def __init__(self, ham: sp.spmatrix, ndof: int, config: SolverConfig) -> None:
+        self.ham = sp.csc_matrix(ham, dtype=np.complex128)
+        self.ndof = ndof
+        self.config = config
+        self.dim = self.ham.shape[0]
+        self.n_sites = self.dim // ndof
+
+    @classmethod
+    def from_builder(cls, builder: TBBuilder, config: SolverConfig) -> SelectedInversionSolver:
+        return cls(builder.build_hamiltonian_sparse(), builder.ndof, config)
+
+    def factorize(self, w: float) -> SelectedInverse:
+        z = w + 1j * self.config.eta
+        a = z * sp.identity(self.dim, dtype=np.complex128, format="csc") - self.ham
+        return SelectedInverse(sparse_lu(a))
+
+    def green_diagonal(self, w: float) -> NDArray[np.complex128]:
+        return self.factorize(w).diagonal()
+
+    def green_entries(self, w: float, rows: NDArray[np.intp], cols: NDArray[np.intp]) -> NDArray[np.complex128]:
+        return self.factorize(w).entries(rows, cols)
+
+    def ldos(self, w: float) -> NDArray[np.float64]:
+        return spectral_weight(self.green_diagonal(w)).reshape(self.n_sites, self.ndof).sum(axis=1)
+
+    def dos(self, w: float) -> float:
+        return float(self.ldos(w).sum())
+
+    def ldos_grid(self) -> NDArray[np.float64]:
+        """LDOS on config.energy_grid, shape (n_w, n_sites)."""
+        return np.stack([self.ldos(w) for w in self.config.energy_grid])
+
+    def dos_grid(self) -> NDArray[np.float64]:
+        return self.ldos_grid().sum(axis=1)
+
+
+def ldos_selected_kernel(
+    ham: sp.spmatrix, energies: NDArray[np.float64], ndof: int, eta: float
+) -> NDArray[np.float64]:
+    """Energy-sweep kernel (see ParallelEnergySweep): LDOS per site via selected inversion."""
+    ham = sp.csc_matrix(ham, dtype=np.complex128)
+    eye = sp.identity(ham.shape[0], dtype=np.complex128, format="csc")
+    out = np.empty((len(energies), ham.shape[0] // ndof), dtype=np.float64)
+    for k, w in enumerate(energies):
+        g_diag = SelectedInverse(sparse_lu((w + 1j * eta) * eye - ham)).diagonal()
+        out[k] = spectral_weight(g_diag).reshape(-1, ndof).sum(axis=1)
+    return out
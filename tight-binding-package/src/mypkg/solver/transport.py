@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+from functools import partial
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+from .configs import EquilibriumConfig, SolverConfig
+from .green import RecursiveGreenSolver
+from .leads import Lead, SanchoRubio
+
+if TYPE_CHECKING:
+    from ..builder.tb_builder import TBBuilder
+    from ..geometry.types import GeometryLike
+    from ..simulation.parallel import SweepKernel
+
+log = logging.getLogger(__name__)
+
+
+def fermi_window(w: NDArray[np.float64], mu: float, temperature: float) -> NDArray[np.float64]:
+    """-df/dE of the Fermi function at (mu, temperature > 0), k_B = 1."""
+    x = (np.asarray(w, dtype=np.float64) - mu) / (2.0 * temperature)
+    return 1.0 / (4.0 * temperature * np.cosh(np.clip(x, -350.0, 350.0)) ** 2)
+
+
+def conductance(
+    energies: NDArray[np.float64], transmission: NDArray[np.float64], equilibrium: EquilibriumConfig | None
+) -> float:
+    """
+    Linear-response Landauer conductance in units of e^2/h,
+        G = int T(E) (-df/dE) dE,
+    on the sampled grid (trapezoidal rule); T(mu) at zero temperature.
+    Spin is not summed implicitly: spinful bases carry it in T.
+    """
+    eq = equilibrium if equilibrium is not None else EquilibriumConfig()
+    energies = np.asarray(energies, dtype=np.float64)
+    transmission = np.asarray(transmission, dtype=np.float64)
+    if eq.temperature == 0.0:
+        if not energies[0] <= eq.mu <= energies[-1]:
+            raise ValueError(f"mu={eq.mu} lies outside the energy grid [{energies[0]}, {energies[-1]}]")
+        return float(np.interp(eq.mu, energies, transmission))
+    window = fermi_window(energies, eq.mu, eq.temperature)
+    # the window decays as exp(-|E - mu|/T); ~20 T on each side holds all but 1e-8 of it
+    if eq.mu - 20.0 * eq.temperature < energies[0] or eq.mu + 20.0 * eq.temperature > energies[-1]:
+        log.warning(f"Energy grid truncates the thermal window around mu={eq.mu}, T={eq.temperature}")
+    return float(np.trapezoid(transmission * window, energies))
+
+
+def lead_slices(geo: GeometryLike, lead_sites: int) -> list[NDArray[np.intp]]:
+    """
+    Column slices of the device with the two edge columns in global-index
+    order, i.e. site for site aligned with a Lead.from_geometry layer.
+    """
+    column_sites = getattr(geo, "column_sites", None)
+    active_to_global = getattr(geo, "active_to_global", None)
+    if column_sites is None or active_to_global is None:
+        raise ValueError(f"{type(geo).__name__} does not provide column slices for leads")
+    slices = [s for s in column_sites() if s.size]
+    for k in (0, -1):
+        if slices[k].size != lead_sites:
+            raise ValueError(
+                f"Edge column has {slices[k].size} active sites, the lead layer {lead_sites}: "
+                "leads need vacancy-free edge columns"
+            )
+        glob = np.array([active_to_global(i) for i in slices[k].tolist()], dtype=np.intp)
+        slices[k] = slices[k][np.argsort(glob)]
+    return slices
+
+
+class LandauerTransport:
+    """
+    Two-terminal transmission T(w) = Tr[Gamma_L G_{1N} Gamma_R G_{1N}^H]
+    between semi-infinite leads attached to the first and last column slice,
+    with Gamma = i (Sigma - Sigma^H) from Sancho-Rubio surface Green's
+    functions. Only the corner block G_{N1} is formed (RGF forward sweep),
+    O(n_slices * m^3) per energy.
+    """
+
+    def __init__(
+        self,
+        ham: sp.spmatrix,
+        site_slices: list[NDArray[np.intp]],
+        ndof: int,
+        lead_left: Lead,
+        lead_right: Lead,
+        config: SolverConfig,
+        *,
+        decimator: SanchoRubio | None = None,
+    ) -> None:
+        self.rgf = RecursiveGreenSolver(ham, site_slices, ndof, config)
+        self.site_slices = site_slices
+        self.ndof = ndof
+        self.lead_left = lead_left
+        self.lead_right = lead_right
+        self.config = config
+        self.decimator = decimator if decimator is not None else SanchoRubio()
+        for lead, block, side in ((lead_left, self.rgf.h_diag[0], "left"), (lead_right, self.rgf.h_diag[-1], "right")):
+            if lead.dim != block.shape[0]:
+                raise ValueError(f"{side} lead has dim {lead.dim}, the device edge slice {block.shape[0]}")
+
+    @classmethod
+    def from_builder(
+        cls, builder: TBBuilder, config: SolverConfig, *, ham: sp.spmatrix | None = None
+    ) -> LandauerTransport:
+        """Identical leads on both x edges continuing the device lattice (disorder-free)."""
+        phys = builder.phys.model_copy(update={"disorder": None}) if builder.phys.disorder is not None else builder.phys
+        geo_cfg = getattr(builder.geo, "config", None)
+        if geo_cfg is None:
+            raise ValueError(f"{type(builder.geo).__name__} has no lattice config to continue into leads")
+        lead = Lead.from_geometry(geo_cfg, phys)
+        slices = lead_slices(builder.geo, lead.dim // builder.ndof)
+        ham = builder.build_hamiltonian_sparse() if ham is None else ham
+        return cls(ham, slices, builder.ndof, lead, lead, config)
+
+    def transmission(self, w: float) -> float:
+        eta = self.config.eta
+        sigma_l = self.decimator.self_energy(self.lead_left, w, eta, "left")
+        sigma_r = self.decimator.self_energy(self.lead_right, w, eta, "right")
+        gamma_l = 1j * (sigma_l - sigma_l.conj().T)
+        gamma_r = 1j * (sigma_r - sigma_r.conj().T)
+        g_n1 = self.rgf.corner_block(w, sigma_left=sigma_l, sigma_right=sigma_r)
+        return float(np.trace(gamma_r @ g_n1 @ gamma_l @ g_n1.conj().T).real)
+
+    def transmission_grid(self, energies: NDArray[np.float64] | None = None) -> NDArray[np.float64]:
+        grid = self.config.energy_grid if energies is None else energies
+        return np.array([self.transmission(float(w)) for w in grid], dtype=np.float64)
+
+    def conductance(self, transmission: NDArray[np.float64] | None = None) -> float:
+        """Conductance (e^2/h) at config.equilibrium from T on config.energy_grid."""
+        t = self.transmission_grid() if transmission is None else transmission
+        return conductance(self.config.energy_grid, t, self.config.equilibrium)
+
+    def kernel(self) -> SweepKernel:
+        """Picklable ParallelEnergySweep kernel computing T(w) for this device and leads."""
+        return partial(
+            transmission_kernel,
+            site_slices=self.site_slices,
+            lead_left=self.lead_left,
+            lead_right=self.lead_right,
+            config=self.config,
+        )
+
+
+def transmission_kernel(
+    ham: sp.spmatrix,
+    energies: NDArray[np.float64],
+    ndof: int,
+    eta: float,
+    *,
+    site_slices: list[NDArray[np.intp]],
+    lead_left: Lead,
+    lead_right: Lead,
+    config: SolverConfig,
+) -> NDArray[np.float64]:
+    """
+    Energy-sweep kernel: T(w) for `energies`, shape (len(energies),).
+    Top-level so it can be shipped to worker processes; broadening comes
+    from `config` (the sweep passes the same eta).
+    """
+    transport = LandauerTransport(ham, site_slices, ndof, lead_left, lead_right, config)
+    return transport.transmission_grid(energies)
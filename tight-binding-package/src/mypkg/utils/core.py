@@ -1,8 +1,9 @@
 import hashlib
 import json
 import yaml
-from typing import Any, Mapping, Final
+from typing import Any, ClassVar, Mapping, Final
 from pathlib import Path
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 import logging
 log = logging.getLogger(__name__)
@@ -12,22 +13,32 @@ DEFAULT_HASH_LENGTH: Final[int] = 12
 
 # Functions
 
-def stable_hash_from_dict(
-    d: Mapping[str, Any],
-    length: int = DEFAULT_HASH_LENGTH,
-    verbose: bool = False
-) -> str:
-    
+def check_hash_length(length: int) -> None:
     if length < 6 or length > 32:
         raise ValueError("Hash length must be between 6 and 32.")
-    
-    payload = json.dumps(
+
+def _canonical_payload(d: Mapping[str, Any]) -> str:
+    return json.dumps(
         d,
         sort_keys=True,
         separators=(",", ":"),
         ensure_ascii=False,
         default=str,
     )
+
+def stable_digest_from_dict(d: Mapping[str, Any]) -> str:
+    """Full sha256 hex digest; stable_hash_from_dict(d, n) == stable_digest_from_dict(d)[:n]."""
+    return hashlib.sha256(_canonical_payload(d).encode("utf-8")).hexdigest()
+
+def stable_hash_from_dict(
+    d: Mapping[str, Any],
+    length: int = DEFAULT_HASH_LENGTH,
+    verbose: bool = False
+) -> str:
+    
+    check_hash_length(length)
+    
+    payload = _canonical_payload(d)
     payload_bytes = payload.encode("utf-8")
     digest_full_sha256 = hashlib.sha256(payload_bytes)
     digest_full_hex = digest_full_sha256.hexdigest()
@@ -45,6 +56,39 @@ def stable_hash_from_dict(
               
     return digest_short_hex
 
+class CachedHashModel(BaseModel):
+    """
+    Frozen pydantic model whose get_hash() is computed once per instance.
+    model_copy(update=...) returns a copy with the cache cleared.
+
+    Optional fields added after results were first keyed by these hashes go
+    in `hash_omit_if_none`: left unset they stay out of the payload, so
+    existing hashes (and run directories) remain valid.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    hash_omit_if_none: ClassVar[tuple[str, ...]] = ()
+
+    _digest: str | None = PrivateAttr(default=None)
+
+    def hash_state(self) -> dict[str, Any]:
+        state = self.model_dump(mode="json", exclude=None)
+        for name in self.hash_omit_if_none:
+            if state.get(name, 0) is None:
+                del state[name]
+        return state
+
+    def get_hash(self, length: int = DEFAULT_HASH_LENGTH) -> str:
+        check_hash_length(length)
+        if self._digest is None:
+            self._digest = stable_digest_from_dict(self.hash_state())
+        return self._digest[:length]
+
+    def model_copy(self, *, update: Mapping[str, Any] | None = None, deep: bool = False):
+        copied = super().model_copy(update=update, deep=deep)
+        copied._digest = None
+        return copied
+
 # Load from yaml, and output it as dict
 def load_raw(path: Path) -> dict[str, Any]:
     with path.open("r", encoding="utf-8") as file: